@@ -0,0 +1,198 @@
+# admission.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+
+class OverloadedError(RuntimeError):
+    """Raised when a lane's queue is full or a request waited too long for admission."""
+    def __init__(self, lane: str, retry_after: float, reason: str):
+        self.lane = lane
+        self.retry_after = retry_after
+        super().__init__(f"Server is busy ({lane} lane: {reason}). Retry after {retry_after:.1f}s.")
+
+
+class AdaptiveLane:
+    """
+    One admission lane with an AIMD concurrency limit.
+
+    - Completions faster than target_latency grow the limit additively (+1 per `limit` completions).
+    - Slow completions or timeouts shrink it multiplicatively (at most once per latency window),
+      so queueing happens here instead of inside the connection pool.
+    - Waiters are served FIFO; when the queue is deeper than max_queue or a waiter exceeds
+      max_wait, the request is rejected with a retry hint.
+    - Slots can also be held outside a call (e.g. by an open result stream that keeps its
+      connection between pages); held slots count against the limit until released, but at
+      least one call is always admitted beyond them so open streams cannot starve the lane
+      (at min_limit a single stream would otherwise block every call until it idled out).
+    """
+    def __init__(self, name: str, min_limit: int, max_limit: int, target_latency: float,
+                 max_queue: int, max_wait: float, backoff: float = 0.8):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(self.max_limit)
+        self.target_latency = target_latency
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.backoff = backoff
+        self.inflight = 0
+        self.held = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.latency_ewma = 0.0
+        self._queue_waits: Deque[float] = deque(maxlen=1024)
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_wait_timeout": 0,
+                      "limit_increases": 0, "limit_decreases": 0}
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def _has_capacity(self) -> bool:
+        # 보유 슬롯이 한도를 다 차지해도 호출 하나는 들어갈 수 있어야 AIMD 한도가 다시 커질 수 있음
+        return self.inflight + self.held < max(int(self.limit), self.held + 1)
+
+    def _retry_hint(self) -> float:
+        # 대기열을 비우는 데 걸릴 예상 시간 (관측 지연 x 대기열 깊이 / 동시 실행 한도)
+        latency = self.latency_ewma or self.target_latency
+        return round(max(0.1, latency * (len(self._waiters) + 1) / max(1, int(self.limit))), 1)
+
+    async def acquire(self) -> float:
+        """Waits for a slot and returns the time spent queued (seconds)."""
+        if self._has_capacity() and not self._waiters:
+            self.inflight += 1
+            self._record_wait(0.0)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise OverloadedError(self.name, self._retry_hint(), f"queue full ({len(self._waiters)} waiting)")
+
+        self.stats["queued"] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            # release()가 슬롯을 넘겨준 뒤 결과를 설정하므로 inflight는 이미 증가된 상태
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # 시간 초과와 동시에 슬롯을 넘겨받은 경우에는 반환
+                self._release_slot()
+            else:
+                waiter.cancel()
+            self._remove_waiter(waiter)
+            self.stats["rejected_wait_timeout"] += 1
+            raise OverloadedError(self.name, self._retry_hint(), f"waited {self.max_wait:g}s for a slot")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                waiter.cancel()
+            self._remove_waiter(waiter)
+            raise
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        return waited
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Returns a slot and adapts the limit from the observed latency (seconds)."""
+        self.latency_ewma = latency if not self.latency_ewma else 0.8 * self.latency_ewma + 0.2 * latency
+        now = time.monotonic()
+        if overloaded or latency > self.target_latency:
+            # 같은 지연 구간 안에서 여러 번 감소하지 않도록 제한
+            if now - self._last_decrease > max(self.target_latency, latency) and self.limit > self.min_limit:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+                self.stats["limit_decreases"] += 1
+        elif self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.stats["limit_increases"] += 1
+        self._release_slot()
+
+    def hold(self) -> None:
+        """Counts a connection held outside any call against the limit (no waiting, may exceed it)."""
+        self.held += 1
+
+    def release_hold(self) -> None:
+        self.held -= 1
+        self._wake_waiters()
+
+    def _release_slot(self) -> None:
+        self.inflight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        # 대기 중인 요청에 슬롯을 직접 넘겨 새로 도착한 요청이 끼어들지 못하게 함
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.inflight += 1
+            waiter.set_result(None)
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _record_wait(self, waited: float) -> None:
+        self.stats["admitted"] += 1
+        self._queue_waits.append(waited)
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self._queue_waits)
+        admitted = self.stats["admitted"]
+
+        def pct(q: float) -> float:
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            "limit": int(self.limit),
+            "limit_exact": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "inflight": self.inflight,
+            "held": self.held,
+            "queued_now": len(self._waiters),
+            "max_queue": self.max_queue,
+            "target_latency_ms": round(self.target_latency * 1000, 1),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 3),
+            "queue_wait_ms": {
+                "mean": round(self.queue_wait_total / admitted * 1000, 3) if admitted else 0.0,
+                "p50": pct(0.50),
+                "p99": pct(0.99),
+                "max": round(self.queue_wait_max * 1000, 3),
+            },
+            **self.stats,
+        }
+
+
+class AdmissionController:
+    """Routes work into named lanes, each with its own adaptive limit (e.g. 'metadata' and 'query')."""
+    def __init__(self, lanes: Dict[str, AdaptiveLane], enabled: bool = True):
+        self.enabled = enabled
+        self.lanes = lanes
+
+    @asynccontextmanager
+    async def admit(self, lane_name: str):
+        lane = self.lanes.get(lane_name) if self.enabled else None
+        if lane is None:
+            yield 0.0
+            return
+        waited = await lane.acquire()
+        started = time.monotonic()
+        overloaded = False
+        try:
+            yield waited
+        except (TimeoutError, OverloadedError):
+            overloaded = True
+            raise
+        finally:
+            lane.release(time.monotonic() - started, overloaded=overloaded)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "lanes": {name: lane.snapshot() for name, lane in self.lanes.items()}}
@@ -0,0 +1,66 @@
+# bench_cold_start.py - 콜드 스타트 측정: server 모듈 import 시간과 stdio 서버의 첫 도구 호출까지 걸리는 시간
+# 사용법: python bench_cold_start.py [반복 횟수] [도구 이름]
+# 첫 도구 호출(기본 list_databases)은 DB 연결이 필요하며, 실패해도 응답까지의 시간은 기록됨
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_SCRIPT = os.path.join(SRC_DIR, "server.py")
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    """Seconds to import server.py in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=SRC_DIR, capture_output=True,
+                            text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def measure_first_call(tool: str):
+    """(seconds until initialize completes, seconds until the first tool call returns, error or None)."""
+    started = time.perf_counter()
+    client = Client(PythonStdioTransport(SERVER_SCRIPT, args=["--transport", "stdio"]))
+    async with client:
+        initialized = time.perf_counter() - started
+        error = None
+        try:
+            await client.call_tool(tool, {})
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return initialized, time.perf_counter() - started, error
+
+
+def summarize(label: str, samples) -> None:
+    print(f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+async def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    tool = sys.argv[2] if len(sys.argv) > 2 else "list_databases"
+    print(f"🧊 repeat: {repeat}  tool: {tool}  EMBEDDING_PROVIDER: {os.getenv('EMBEDDING_PROVIDER') or '-'}")
+
+    summarize("import server", [measure_import() for _ in range(repeat)])
+
+    initialized, first_call, errors = [], [], set()
+    for _ in range(repeat):
+        init_s, call_s, error = await measure_first_call(tool)
+        initialized.append(init_s)
+        first_call.append(call_s)
+        if error:
+            errors.add(error)
+    summarize("spawn -> initialize", initialized)
+    summarize(f"spawn -> first {tool}", first_call)
+    for error in errors:
+        print(f"⚠️ 도구 호출 오류: {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+# bench_driver_throughput.py - 드라이버별 대용량 결과 읽기 처리량 비교 (DB 연결 필요)
+# 사용법: python bench_driver_throughput.py [행 수] [반복 횟수]
+# 설치된 드라이버(aiomysql, asyncmy)만 측정하며, 결과 생성에 테이블이 필요 없는 재귀 CTE를 사용
+import asyncio
+import sys
+import time
+
+from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
+from db_driver import DB_DRIVERS, get_driver
+from result_format import ResultSet
+
+# 정수/문자열/날짜/소수 컬럼이 섞인 n행 결과
+BENCH_SQL = """
+WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+SELECT n AS id,
+       CONCAT('job-', n) AS name,
+       REPEAT('x', 32) AS payload,
+       TIMESTAMP('2024-01-01') + INTERVAL n SECOND AS created_at,
+       n / 100 AS price
+FROM seq
+"""
+
+
+async def measure(driver, rows: int, repeat: int, streaming: bool) -> float:
+    """Best time (seconds) to fetch and convert the whole result."""
+    conn = await driver.connect(host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+    try:
+        async with await driver.cursor(conn) as cursor:
+            # 재귀 깊이 제한(기본 1000)을 행 수에 맞게 조정
+            await cursor.execute("SET SESSION max_recursive_iterations = %s", (rows + 1,))
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            async with await driver.cursor(conn, streaming=streaming) as cursor:
+                await cursor.execute(BENCH_SQL, (rows,))
+                fetched = []
+                while True:
+                    page = await cursor.fetchmany(5000)
+                    if not page:
+                        break
+                    fetched.extend(page)
+                result = ResultSet.from_cursor(cursor, fetched)
+            best = min(best, time.perf_counter() - start)
+            assert len(result) == rows, f"expected {rows} rows, got {len(result)}"
+        return best
+    finally:
+        conn.close()
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    print(f"📡 {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}  rows: {rows:,}  repeat: {repeat}")
+    baseline = None
+    for name in DB_DRIVERS:
+        try:
+            driver = get_driver(name)
+        except ImportError as e:
+            print(f"[{name}] 건너뜀: {e}")
+            continue
+        for streaming in (False, True):
+            elapsed = await measure(driver, rows, repeat, streaming)
+            label = f"{name} ({'SSCursor' if streaming else 'Cursor'})"
+            baseline = baseline or elapsed
+            print(f"  {label:<22}: {elapsed * 1000:9.1f} ms  {rows / elapsed:12,.0f} rows/s  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
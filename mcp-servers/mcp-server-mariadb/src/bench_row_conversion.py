@@ -0,0 +1,85 @@
+# bench_row_conversion.py - 행 변환 마이크로 벤치마크 (DB 연결 불필요)
+# 사용법: python bench_row_conversion.py [행 수]
+import sys
+import time
+import datetime
+from decimal import Decimal
+
+from result_format import compile_converters, apply_converters, ResultSet
+
+# (name, FIELD_TYPE code) — 날짜/소수 위주의 테이블
+MIXED_DESCRIPTION = [
+    ("id", 3), ("name", 253), ("created_at", 12), ("price", 246),
+    ("due_date", 10), ("payload", 252), ("views", 8),
+]
+# 정수/문자열 위주의 넓은 테이블 (JobMapRaws 같은 형태)
+WIDE_TEXT_DESCRIPTION = [("id", 3)] + [(f"col_{i}", 253) for i in range(10)] + [("score", 8)]
+
+
+class FakeCursor:
+    def __init__(self, description):
+        self.description = description
+
+
+def make_mixed_rows(n: int):
+    base = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        (i, f"job-{i}", base + datetime.timedelta(minutes=i), Decimal(i) / 100,
+         (base + datetime.timedelta(days=i % 365)).date(), b"raw-bytes" if i % 3 else None, i * 7)
+        for i in range(n)
+    ]
+
+
+def make_wide_text_rows(n: int):
+    return [(i,) + tuple(f"value-{i}-{c}" if (i + c) % 5 else None for c in range(10)) + (i % 100,)
+            for i in range(n)]
+
+
+def legacy_convert(dict_rows):
+    """The per-cell loop _execute_query used before converter plans (DictCursor rows)."""
+    converted_results = []
+    for row in dict_rows:
+        converted_row = {}
+        for key, value in row.items():
+            if hasattr(value, 'isoformat'):
+                converted_row[key] = value.isoformat()
+            elif isinstance(value, bytes):
+                converted_row[key] = value.decode('utf-8', errors='ignore')
+            else:
+                converted_row[key] = value
+        converted_results.append(converted_row)
+    return converted_results
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_scenario(label: str, description, rows) -> None:
+    columns = [col[0] for col in description]
+    # DictCursor가 반환하던 형태 (드라이버가 행마다 dict를 만들던 비용도 포함해 비교)
+    legacy = best_of(lambda: legacy_convert([dict(zip(columns, row)) for row in rows]))
+    plan_only = best_of(lambda: apply_converters(compile_converters(description, rows), rows))
+    plan_dicts = best_of(lambda: ResultSet.from_cursor(FakeCursor(description), rows).to_dicts())
+
+    print(f"[{label}] rows: {len(rows):,}  columns: {len(description)}")
+    print(f"  legacy DictCursor rows + per-cell loop : {legacy * 1000:8.1f} ms")
+    print(f"  converter plan -> dict rows            : {plan_dicts * 1000:8.1f} ms  ({legacy / plan_dicts:.1f}x)")
+    # 모든 컬럼이 변환 불필요(identity)하면 행을 그대로 재사용하므로 사실상 0ms
+    speedup = f"{legacy / plan_only:.1f}x" if plan_only > 1e-4 else "no-op"
+    print(f"  converter plan -> positional rows      : {plan_only * 1000:8.1f} ms  ({speedup})")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    run_scenario("temporal/decimal", MIXED_DESCRIPTION, make_mixed_rows(n))
+    run_scenario("wide text/int", WIDE_TEXT_DESCRIPTION, make_wide_text_rows(n))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 # config.py
 import os
+import atexit
+import copy
+import queue
+import random
 from dotenv import load_dotenv
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 # Load environment variables from .env file
@@ -13,6 +17,12 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FILE_PATH = os.getenv("LOG_FILE", "logs/mcp_server.log")
 LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
 LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+# Write logs from a background thread (handlers behind a queue) instead of the event loop thread
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+# Per-query INFO/DEBUG logs (query_logger): sampled fraction and per-second cap (0 = no cap).
+# Warnings and errors are never dropped.
+LOG_QUERY_SAMPLE_RATE = float(os.getenv("LOG_QUERY_SAMPLE_RATE", 1.0))
+LOG_QUERY_MAX_PER_SECOND = int(os.getenv("LOG_QUERY_MAX_PER_SECOND", 0))
 
 # Get the root logger
 root_logger = logging.getLogger()
@@ -28,7 +38,6 @@ for handler in root_logger.handlers[:]:
 # Console Handler
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(log_formatter)
-root_logger.addHandler(console_handler)
 
 # File Handler - Ensure log directory exists
 log_file = Path(LOG_FILE_PATH)
@@ -40,10 +49,71 @@ file_handler = RotatingFileHandler(
     backupCount=LOG_BACKUP_COUNT
 )
 file_handler.setFormatter(log_formatter)
-root_logger.addHandler(file_handler)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Merges the message and renders any traceback in the caller, like the stock QueueHandler, so
+    mutable arguments and exc_info are captured at logging time; line formatting and I/O are left
+    to the listener thread (the stock handler formats the whole line in the caller).
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # 트레이스백은 호출 시점에 문자열로 고정 (프레임/예외 객체를 다른 스레드로 넘기지 않음)
+            if not record.exc_text:
+                record.exc_text = log_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+if LOG_ASYNC:
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    log_listener.start()
+    # 종료 시 대기열에 남은 로그를 모두 기록
+    atexit.register(log_listener.stop)
+else:
+    root_logger.addHandler(console_handler)
+    root_logger.addHandler(file_handler)
+
+
+class SampledLogFilter(logging.Filter):
+    """Passes every WARNING+ record; lower levels are sampled and capped per second."""
+    def __init__(self, sample_rate: float = 1.0, max_per_second: int = 0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self._second = 0
+        self._count = 0
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return False
+        if self.max_per_second > 0:
+            second = int(record.created)
+            if second != self._second:
+                self._second, self._count = second, 0
+            if self._count >= self.max_per_second:
+                self.dropped += 1
+                return False
+            self._count += 1
+        return True
+
 
 # The specific logger used in server.py and elsewhere will inherit this configuration.
 logger = logging.getLogger(__name__)
+# Per-query/per-call lines on the hot path go through this child logger so they can be sampled
+query_logger = logger.getChild("query")
+query_log_filter = SampledLogFilter(LOG_QUERY_SAMPLE_RATE, LOG_QUERY_MAX_PER_SECOND)
+query_logger.addFilter(query_log_filter)
 
 # --- Database Configuration ---
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -51,11 +121,100 @@ DB_PORT = int(os.getenv("DB_PORT", 3306))
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
+# Read replicas: comma-separated host[:port] list (same credentials as the primary)
+DB_REPLICA_HOSTS = os.getenv("DB_REPLICA_HOSTS", "")
+# Replicas lagging more than this (seconds) are skipped; reads fall back to the primary
+MCP_REPLICA_MAX_LAG = float(os.getenv("MCP_REPLICA_MAX_LAG", 5))
+MCP_REPLICA_POLL_INTERVAL = float(os.getenv("MCP_REPLICA_POLL_INTERVAL", 5))
+# Route reads to hosts whose SHOW SLAVE STATUS is empty (e.g. a storage-level replica); off by default
+MCP_REPLICA_ALLOW_UNREPLICATED = os.getenv("MCP_REPLICA_ALLOW_UNREPLICATED", "false").lower() == "true"
+# Client library used for pools and cursors: "aiomysql" (pure Python) or "asyncmy" (Cython-accelerated)
+DB_DRIVER = os.getenv("MCP_DB_DRIVER", "aiomysql").lower()
 
 # --- MCP Server Configuration ---
 # Read-only mode
 MCP_READ_ONLY = os.getenv("MCP_READ_ONLY", "true").lower() == "true"
 MCP_MAX_POOL_SIZE = int(os.getenv("MCP_MAX_POOL_SIZE", 10))
+# Connections opened at startup (pool minsize), so the first burst does not pay connection setup
+MCP_POOL_WARM_SIZE = min(MCP_MAX_POOL_SIZE, int(os.getenv("MCP_POOL_WARM_SIZE", min(4, MCP_MAX_POOL_SIZE))))
+# Connections older than this (seconds) are closed and replaced on acquire (0 disables)
+MCP_POOL_MAX_CONN_AGE = float(os.getenv("MCP_POOL_MAX_CONN_AGE", 3600))
+# Connections idle longer than this (seconds) are pinged before use; dead ones are replaced (negative disables)
+MCP_POOL_PING_AFTER_IDLE = float(os.getenv("MCP_POOL_PING_AFTER_IDLE", 30))
+# Statement time budget in seconds (0 disables). Enforced on the server with max_statement_time;
+# per-call timeouts can only lower it.
+MCP_STATEMENT_TIMEOUT = float(os.getenv("MCP_STATEMENT_TIMEOUT", 30))
+# Result budgets for execute_sql/execute_batch (0 = off, the default); per-call values can only lower them.
+# Rows are fetched incrementally and the response is marked truncated once a budget is reached.
+MCP_MAX_RESULT_ROWS = int(os.getenv("MCP_MAX_RESULT_ROWS", 0))
+MCP_MAX_RESULT_BYTES = int(os.getenv("MCP_MAX_RESULT_BYTES", 0))
+# After truncation, keep counting (not storing) remaining rows for up to this many seconds
+MCP_TRUNCATION_COUNT_SECONDS = float(os.getenv("MCP_TRUNCATION_COUNT_SECONDS", 1.0))
+# execute_batch: max items per call and how many of them run at once
+MCP_BATCH_MAX_ITEMS = int(os.getenv("MCP_BATCH_MAX_ITEMS", 50))
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", max(1, MCP_MAX_POOL_SIZE // 2)))
+# Admission control in front of the pool: metadata tools get reserved connections,
+# the query lane adapts its limit (AIMD) to stay under its target latency.
+MCP_ADMISSION_ENABLED = os.getenv("MCP_ADMISSION_ENABLED", "true").lower() == "true"
+MCP_METADATA_LANE_SIZE = int(os.getenv("MCP_METADATA_LANE_SIZE", max(1, MCP_MAX_POOL_SIZE // 4)))
+MCP_QUERY_TARGET_LATENCY_MS = float(os.getenv("MCP_QUERY_TARGET_LATENCY_MS", 2000))
+MCP_METADATA_TARGET_LATENCY_MS = float(os.getenv("MCP_METADATA_TARGET_LATENCY_MS", 250))
+MCP_ADMISSION_MAX_QUEUE = int(os.getenv("MCP_ADMISSION_MAX_QUEUE", MCP_MAX_POOL_SIZE * 4))
+MCP_ADMISSION_MAX_WAIT = float(os.getenv("MCP_ADMISSION_MAX_WAIT", 10))
+# Streaming (server-side cursor) mode for execute_sql_stream
+MCP_STREAM_PAGE_SIZE = int(os.getenv("MCP_STREAM_PAGE_SIZE", 500))
+MCP_STREAM_MAX_PAGE_SIZE = int(os.getenv("MCP_STREAM_MAX_PAGE_SIZE", 5000))
+MCP_STREAM_IDLE_TIMEOUT = float(os.getenv("MCP_STREAM_IDLE_TIMEOUT", 60))
+# Each open stream holds a pooled connection, so keep this below MCP_MAX_POOL_SIZE
+MCP_MAX_OPEN_STREAMS = int(os.getenv("MCP_MAX_OPEN_STREAMS", max(1, MCP_MAX_POOL_SIZE // 2)))
+# Read-only query result cache (only active when MCP_READ_ONLY is true)
+MCP_QUERY_CACHE_ENABLED = os.getenv("MCP_QUERY_CACHE_ENABLED", "true").lower() == "true"
+MCP_QUERY_CACHE_TTL = float(os.getenv("MCP_QUERY_CACHE_TTL", 30))
+MCP_QUERY_CACHE_MAX_BYTES = int(os.getenv("MCP_QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# How often a cached entry is re-checked against information_schema.TABLES.UPDATE_TIME
+MCP_QUERY_CACHE_VALIDATE_INTERVAL = float(os.getenv("MCP_QUERY_CACHE_VALIDATE_INTERVAL", 2))
+# Schema metadata cache (list_databases, list_tables, get_table_schema, existence checks)
+MCP_SCHEMA_CACHE_ENABLED = os.getenv("MCP_SCHEMA_CACHE_ENABLED", "true").lower() == "true"
+MCP_SCHEMA_CACHE_TTL = float(os.getenv("MCP_SCHEMA_CACHE_TTL", 60))
+MCP_SCHEMA_CACHE_NEGATIVE_TTL = float(os.getenv("MCP_SCHEMA_CACHE_NEGATIVE_TTL", 10))
+# A table schema older than this is read again even if CREATE_TIME is unchanged (INSTANT/in-place ALTER TABLE)
+MCP_SCHEMA_CACHE_MAX_AGE = float(os.getenv("MCP_SCHEMA_CACHE_MAX_AGE", 600))
+# Stale database/table listings are served while they refresh in the background, up to this age (0 = no bound);
+# older ones (including an old snapshot after a restart) make the call wait for a fresh read
+MCP_SCHEMA_CACHE_MAX_STALE = float(os.getenv("MCP_SCHEMA_CACHE_MAX_STALE", 600))
+# Set to an empty string to disable the on-disk snapshot
+MCP_SCHEMA_SNAPSHOT_PATH = os.getenv("MCP_SCHEMA_SNAPSHOT_PATH", "cache/schema_snapshot.json")
+# Per-fingerprint statement statistics (query_stats tool)
+MCP_QUERY_STATS_MAX_ENTRIES = int(os.getenv("MCP_QUERY_STATS_MAX_ENTRIES", 500))
+MCP_QUERY_STATS_SAMPLE_SIZE = int(os.getenv("MCP_QUERY_STATS_SAMPLE_SIZE", 1000))
+# Pre-flight EXPLAIN cost guard for execute_sql/execute_batch: 'off', 'warn' or 'reject'
+# (threshold = estimated rows examined; plan assessments are cached per statement fingerprint)
+MCP_COST_GUARD_MODE = os.getenv("MCP_COST_GUARD_MODE", "off").lower()
+MCP_COST_GUARD_MAX_ROWS = int(os.getenv("MCP_COST_GUARD_MAX_ROWS", 1000000))
+MCP_COST_GUARD_PLAN_TTL = float(os.getenv("MCP_COST_GUARD_PLAN_TTL", 300))
+MCP_COST_GUARD_PLAN_CACHE_SIZE = int(os.getenv("MCP_COST_GUARD_PLAN_CACHE_SIZE", 1000))
+# OpenMetrics/Prometheus endpoint served next to the HTTP apps (--transport sse / streamable-http)
+MCP_METRICS_ENABLED = os.getenv("MCP_METRICS_ENABLED", "true").lower() == "true"
+MCP_METRICS_PATH = os.getenv("MCP_METRICS_PATH", "/metrics")
+# Phase timing traces of tool calls (recent_traces tool); sample rate 0 disables,
+# set MCP_TRACE_FILE to also append each trace as a JSON line
+MCP_TRACE_SAMPLE_RATE = float(os.getenv("MCP_TRACE_SAMPLE_RATE", 0.1))
+MCP_TRACE_BUFFER_SIZE = int(os.getenv("MCP_TRACE_BUFFER_SIZE", 200))
+MCP_TRACE_FILE = os.getenv("MCP_TRACE_FILE", "")
+# Multi-worker HTTP serving (--workers > 1, streamable-http only): worker processes share the port
+# through SO_REUSEPORT and split MCP_CONNECTION_BUDGET evenly as their MCP_MAX_POOL_SIZE
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", 1))
+MCP_CONNECTION_BUDGET = int(os.getenv("MCP_CONNECTION_BUDGET", MCP_MAX_POOL_SIZE))
+MCP_WORKER_HEALTH_INTERVAL = float(os.getenv("MCP_WORKER_HEALTH_INTERVAL", 5))
+# Crashed workers are restarted with exponential backoff; the supervisor exits after this many
+# consecutive exits within 30s of starting
+MCP_WORKER_MAX_FAST_FAILURES = int(os.getenv("MCP_WORKER_MAX_FAST_FAILURES", 5))
+# Run the event loop on uvloop when it is installed
+MCP_UVLOOP = os.getenv("MCP_UVLOOP", "false").lower() == "true"
+# Health endpoint served next to the HTTP apps (aggregated over all workers in multi-worker mode)
+MCP_HEALTH_PATH = os.getenv("MCP_HEALTH_PATH", "/health")
+# Log the table list of DB_NAME (and JobMapRaws sample rows) in the background after startup
+MCP_STARTUP_DIAGNOSTICS = os.getenv("MCP_STARTUP_DIAGNOSTICS", "false").lower() == "true"
 
 # --- Embedding Configuration ---
 # Provider selection ('openai' or 'gemini' or 'huggingface')
@@ -64,9 +223,31 @@ EMBEDDING_PROVIDER = EMBEDDING_PROVIDER.lower() if EMBEDDING_PROVIDER else None
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Gemini: texts per batch embedding request (1 disables batching) and concurrent requests per embed call
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", 100))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 4))
 # Open models from Huggingface
 HF_MODEL = os.getenv("HF_MODEL")
+# Local inference runs on a dedicated thread pool so it never blocks the event loop
+HF_ENCODE_THREADS = int(os.getenv("HF_ENCODE_THREADS", 1))
+# Multi-process mode: batches of at least HF_MULTIPROCESS_MIN_BATCH texts are split into chunks of
+# HF_MULTIPROCESS_CHUNK_SIZE and encoded by HF_ENCODE_PROCESSES worker processes (0 disables);
+# at most HF_MULTIPROCESS_MAX_PENDING chunks are queued on the workers at once
+HF_ENCODE_PROCESSES = int(os.getenv("HF_ENCODE_PROCESSES", 0))
+HF_MULTIPROCESS_MIN_BATCH = int(os.getenv("HF_MULTIPROCESS_MIN_BATCH", 256))
+HF_MULTIPROCESS_CHUNK_SIZE = int(os.getenv("HF_MULTIPROCESS_CHUNK_SIZE", 64))
+HF_MULTIPROCESS_MAX_PENDING = int(os.getenv("HF_MULTIPROCESS_MAX_PENDING", max(1, HF_ENCODE_PROCESSES) * 2))
+# Models loaded in the server process share this memory budget (least recently used models are unloaded;
+# each encode worker process holds one more model outside it);
+# HF_PRELOAD_MODELS (comma-separated, from the allowed list) are loaded in the background at startup
+HF_MODEL_MEMORY_BUDGET_MB = int(os.getenv("HF_MODEL_MEMORY_BUDGET_MB", 4096))
+HF_PRELOAD_MODELS = [m.strip() for m in os.getenv("HF_PRELOAD_MODELS", "").split(",") if m.strip()]
 
+# Embedding cache keyed by (provider, model, sha256(text)): in-memory LRU in front of a SQLite file
+# shared across restarts and worker processes (empty path = memory only)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", 10000))
 
 # --- Validation ---
 if not all([DB_USER, DB_PASSWORD]):
@@ -91,4 +272,5 @@ else:
     logger.info(f"No EMBEDDING_PROVIDER selected or it is set to None. Disabling embedding features.")
 
 logger.info(f"Read-only mode: {MCP_READ_ONLY}")
-logger.info(f"Logging to console and to file: {LOG_FILE_PATH} (Level: {LOG_LEVEL}, MaxSize: {LOG_MAX_BYTES}B, Backups: {LOG_BACKUP_COUNT})")
\ No newline at end of file
+logger.info("Logging to console and to file: %s (Level: %s, MaxSize: %sB, Backups: %s, Async: %s)",
+            LOG_FILE_PATH, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ASYNC)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# cost_guard.py
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import logger
+from query_stats import fingerprint
+
+COST_GUARD_MODES = ("off", "warn", "reject")
+# EXPLAIN을 실행할 문장 (그 외 문장은 검사하지 않음)
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH")
+
+
+class QueryCostError(ValueError):
+    """Raised in reject mode when a statement's estimated cost is above the threshold."""
+    def __init__(self, assessment: Dict[str, Any]):
+        self.assessment = assessment
+        super().__init__(assessment["message"])
+
+
+def _find_table(node: Any) -> Optional[Dict[str, Any]]:
+    """First 'table' object inside a nested_loop step (it may be wrapped, e.g. in 'block-nested-loop')."""
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict):
+            return table
+        for value in node.values():
+            found = _find_table(value)
+            if found is not None:
+                return found
+    elif isinstance(node, list):
+        for value in node:
+            found = _find_table(value)
+            if found is not None:
+                return found
+    return None
+
+
+def _table_rows(table: Dict[str, Any]) -> float:
+    # MariaDB는 'rows', MySQL은 'rows_examined_per_scan'
+    value = table.get("rows", table.get("rows_examined_per_scan", 0))
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _nested(table: Dict[str, Any]) -> float:
+    """Rows examined by subqueries/materializations attached to a table."""
+    return sum(_examined(value) for value in table.values() if isinstance(value, (dict, list)))
+
+
+def _examined(node: Any) -> float:
+    """Estimated rows examined by a plan node; joins multiply along the nested loop."""
+    if isinstance(node, list):
+        return sum(_examined(value) for value in node)
+    if not isinstance(node, dict):
+        return 0.0
+    total = 0.0
+    for key, value in node.items():
+        if key == "nested_loop" and isinstance(value, list):
+            prefix = 1.0
+            for step in value:
+                table = _find_table(step)
+                if table is None:
+                    total += _examined(step)
+                    continue
+                # 앞 테이블의 행마다 이 테이블을 읽으므로 누적 곱이 실제 검사 행 수
+                prefix *= max(1.0, _table_rows(table))
+                total += prefix + _nested(table)
+        elif key == "table" and isinstance(value, dict):
+            total += _table_rows(value) + _nested(value)
+        elif isinstance(value, (dict, list)):
+            total += _examined(value)
+    return total
+
+
+def _tables(node: Any, found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict):
+            found.append(table)
+        for value in node.values():
+            _tables(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _tables(value, found)
+    return found
+
+
+def assess_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarizes an EXPLAIN FORMAT=JSON plan: estimated rows examined, full scans and unindexed joins."""
+    tables = _tables(plan, [])
+    full_scans = [
+        {"table": t.get("table_name"), "rows": int(_table_rows(t))}
+        for t in tables if str(t.get("access_type", "")).upper() == "ALL"
+    ]
+    # 조인 버퍼(block-nested-loop, BNL/BNLH)를 쓰는 테이블은 인덱스 없이 조인되는 경우
+    join_buffer = [t.get("table_name") for t in tables if t.get("join_type") in ("BNL", "BNLH")]
+    join_buffer += [t.get("table_name") for t in _tables(_collect(plan, "block-nested-loop"), [])]
+    return {
+        "estimated_rows_examined": int(_examined(plan)),
+        "full_scans": full_scans,
+        "unindexed_joins": sorted({name for name in join_buffer if name}),
+    }
+
+
+def _collect(node: Any, key: str) -> List[Any]:
+    """All values stored under key anywhere in node."""
+    found: List[Any] = []
+    if isinstance(node, dict):
+        for k, value in node.items():
+            if k == key:
+                found.append(value)
+            found.extend(_collect(value, key))
+    elif isinstance(node, list):
+        for value in node:
+            found.extend(_collect(value, key))
+    return found
+
+
+def narrowing_hint(assessment: Dict[str, Any]) -> str:
+    hints = []
+    if assessment["unindexed_joins"]:
+        hints.append(f"add join conditions on indexed columns for {', '.join(assessment['unindexed_joins'])} "
+                     "(a missing ON clause produces a cartesian product)")
+    if assessment["full_scans"]:
+        scans = ", ".join(f"{s['table']} (~{s['rows']:,} rows)" for s in assessment["full_scans"])
+        hints.append(f"filter with WHERE conditions on indexed columns to avoid full scans of {scans}")
+    hints.append("aggregate on the server (COUNT/SUM/GROUP BY) or add LIMIT")
+    hints.append("check the table sizes with describe_database first")
+    return "; ".join(hints)
+
+
+class _PlanEntry:
+    __slots__ = ("assessment", "created_at")
+
+    def __init__(self, assessment: Dict[str, Any]):
+        self.assessment = assessment
+        self.created_at = time.monotonic()
+
+
+class CostGuard:
+    """
+    Pre-flight check that runs EXPLAIN FORMAT=JSON and warns about or rejects statements whose
+    estimated rows examined exceed max_rows. Assessments are cached per (database, fingerprint),
+    so repeated statements skip the EXPLAIN round trip.
+    """
+    def __init__(self, mode: str, max_rows: int, cache_ttl: float, max_entries: int = 1000):
+        if mode not in COST_GUARD_MODES:
+            raise ValueError(f"Unsupported cost guard mode '{mode}'. Choose from: {list(COST_GUARD_MODES)}")
+        self.mode = mode
+        self.max_rows = max_rows
+        self.cache_ttl = cache_ttl
+        self.max_entries = max(1, max_entries)
+        self._plans: "OrderedDict[Tuple[str, str], _PlanEntry]" = OrderedDict()
+        self.stats = {"checks": 0, "plan_cache_hits": 0, "explains": 0, "explain_errors": 0,
+                      "warnings": 0, "rejections": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    async def check(self, sql: str, database: Optional[str],
+                    explain: Callable[[str], Awaitable[Optional[str]]]) -> Optional[Dict[str, Any]]:
+        """
+        Returns None when the statement is within budget (or not checked), the assessment with a warning
+        message in warn mode, and raises QueryCostError in reject mode.
+        """
+        if not self.enabled or not sql.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+            return None
+        self.stats["checks"] += 1
+        key = (database or "", fingerprint(sql))
+        assessment = self._lookup(key)
+        if assessment is None:
+            self.stats["explains"] += 1
+            try:
+                plan_json = await explain(f"EXPLAIN FORMAT=JSON {sql}")
+                assessment = assess_plan(json.loads(plan_json)) if plan_json else None
+            except Exception as e:
+                # EXPLAIN 실패(문법 오류 등)는 실제 실행에서 보고되도록 검사만 건너뜀
+                self.stats["explain_errors"] += 1
+                logger.debug(f"비용 검사용 EXPLAIN 실패, 검사 생략: {e}")
+                return None
+            if assessment is None:
+                return None
+            self._store(key, assessment)
+
+        estimated = assessment["estimated_rows_examined"]
+        if estimated <= self.max_rows:
+            return None
+        message = (f"Estimated ~{estimated:,} rows examined, above the cost limit of {self.max_rows:,}. "
+                   f"To narrow the query: {narrowing_hint(assessment)}.")
+        result = {**assessment, "max_rows": self.max_rows, "message": message}
+        if self.mode == "reject":
+            self.stats["rejections"] += 1
+            logger.warning(f"🛡️ 비용 검사로 쿼리 거부: ~{estimated:,}행 (한도 {self.max_rows:,}) SQL: {sql[:100]}...")
+            raise QueryCostError({**result, "message": f"Query rejected by cost guard. {message}"})
+        self.stats["warnings"] += 1
+        logger.warning(f"🛡️ 비용 경고: ~{estimated:,}행 (한도 {self.max_rows:,}) SQL: {sql[:100]}...")
+        return result
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._plans.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.cache_ttl:
+            del self._plans[key]
+            return None
+        self._plans.move_to_end(key)
+        self.stats["plan_cache_hits"] += 1
+        return entry.assessment
+
+    def _store(self, key: Tuple[str, str], assessment: Dict[str, Any]) -> None:
+        self._plans[key] = _PlanEntry(assessment)
+        self._plans.move_to_end(key)
+        while len(self._plans) > self.max_entries:
+            self._plans.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "max_rows": self.max_rows, "cached_plans": len(self._plans), **self.stats}
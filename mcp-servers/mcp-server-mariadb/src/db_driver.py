@@ -0,0 +1,104 @@
+# db_driver.py
+import importlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple, Type
+
+# 선택 가능한 드라이버 이름 (MCP_DB_DRIVER)
+DB_DRIVERS = ("aiomysql", "asyncmy")
+
+
+class DatabaseDriver(ABC):
+    """
+    Pool and cursor handling for one async MySQL/MariaDB client library.
+    The driver module is imported lazily, so only the selected library has to be installed.
+    """
+    name = ""
+    module_name = ""
+
+    def __init__(self):
+        try:
+            self.module = importlib.import_module(self.module_name)
+        except ImportError as e:
+            raise ImportError(f"Database driver '{self.name}' is selected but '{self.module_name}' is not installed.") from e
+
+    def connect_kwargs(self, host: str, port: int, user: str, password: str, database: str,
+                       autocommit: bool, charset: str) -> Dict[str, Any]:
+        return dict(host=host, port=port, user=user, password=password, db=database,
+                    autocommit=autocommit, charset=charset)
+
+    async def create_pool(self, host: str, port: int, user: str, password: str, database: str,
+                          minsize: int, maxsize: int, autocommit: bool = True, charset: str = 'utf8mb4', **pool_kwargs):
+        return await self.module.create_pool(
+            minsize=minsize, maxsize=maxsize,
+            **self.connect_kwargs(host, port, user, password, database, autocommit, charset),
+            **pool_kwargs,
+        )
+
+    async def connect(self, host: str, port: int, user: str, password: str, database: str,
+                      autocommit: bool = True, charset: str = 'utf8mb4'):
+        """Opens a single connection outside the pool."""
+        return await self.module.connect(**self.connect_kwargs(host, port, user, password, database, autocommit, charset))
+
+    @abstractmethod
+    async def cursor(self, conn, streaming: bool = False):
+        """Opens a tuple cursor; streaming=True returns an unbuffered server-side cursor."""
+
+    def thread_id(self, conn) -> Optional[int]:
+        """Server-side connection id (the target of KILL QUERY)."""
+        thread_id = getattr(conn, "server_thread_id", None)
+        if isinstance(thread_id, (tuple, list)):
+            thread_id = thread_id[0] if thread_id else None
+        return thread_id
+
+    def endpoint(self, conn) -> Optional[Tuple[str, int]]:
+        """(host, port) the connection is connected to, so KILL QUERY reaches the same server."""
+        host, port = getattr(conn, "host", None), getattr(conn, "port", None)
+        return (host, int(port)) if host and port else None
+
+
+class AiomysqlDriver(DatabaseDriver):
+    """aiomysql: pure-Python protocol parsing."""
+    name = "aiomysql"
+    module_name = "aiomysql"
+
+    async def cursor(self, conn, streaming: bool = False):
+        return await conn.cursor(self.module.SSCursor if streaming else self.module.Cursor)
+
+
+class AsyncmyDriver(DatabaseDriver):
+    """asyncmy: Cython-accelerated packet parsing, same pool API as aiomysql."""
+    name = "asyncmy"
+    module_name = "asyncmy"
+
+    def __init__(self):
+        super().__init__()
+        self.cursors = importlib.import_module("asyncmy.cursors")
+
+    def connect_kwargs(self, host, port, user, password, database, autocommit, charset):
+        kwargs = super().connect_kwargs(host, port, user, password, database, autocommit, charset)
+        # asyncmy는 db 대신 database 인자를 사용
+        kwargs["database"] = kwargs.pop("db")
+        return kwargs
+
+    def endpoint(self, conn) -> Optional[Tuple[str, int]]:
+        # asyncmy 연결은 host/port를 _host/_port로만 보관
+        host, port = getattr(conn, "_host", None), getattr(conn, "_port", None)
+        return (host, int(port)) if host and port else None
+
+    async def cursor(self, conn, streaming: bool = False):
+        # asyncmy의 conn.cursor()는 awaitable이 아닌 커서 객체를 바로 반환
+        return conn.cursor(self.cursors.SSCursor if streaming else self.cursors.Cursor)
+
+
+_DRIVER_CLASSES: Dict[str, Type[DatabaseDriver]] = {
+    AiomysqlDriver.name: AiomysqlDriver,
+    AsyncmyDriver.name: AsyncmyDriver,
+}
+
+
+def get_driver(name: str) -> DatabaseDriver:
+    """Returns the driver implementation for name or raises ValueError."""
+    driver_class = _DRIVER_CLASSES.get((name or "").lower())
+    if driver_class is None:
+        raise ValueError(f"Unsupported database driver '{name}'. Choose from: {list(DB_DRIVERS)}")
+    return driver_class()
@@ -1,7 +1,7 @@
 # direct_db_test.py - MCP 없이 직접 DB 연결 테스트
 import asyncio
-import aiomysql
-from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
+from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_DRIVER
+from db_driver import get_driver
 
 async def test_direct_connection():
     """MCP 없이 직접 MariaDB 연결 테스트"""
@@ -9,14 +9,15 @@ async def test_direct_connection():
     print("🔗 MariaDB 직접 연결 테스트 시작...")
 
     try:
-        # 1. 연결 풀 생성
-        print(f"📡 연결 시도: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-        pool = await aiomysql.create_pool(
+        # 1. 연결 풀 생성 (MCP_DB_DRIVER로 선택한 드라이버 사용)
+        driver = get_driver(DB_DRIVER)
+        print(f"📡 연결 시도: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME} (드라이버: {driver.name})")
+        pool = await driver.create_pool(
             host=DB_HOST,
             port=DB_PORT,
             user=DB_USER,
             password=DB_PASSWORD,
-            db=DB_NAME,
+            database=DB_NAME,
             minsize=1,
             maxsize=5,
             autocommit=True,
@@ -26,31 +27,32 @@ async def test_direct_connection():
 
         # 2. 테이블 목록 조회
         async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cursor:
+            async with await driver.cursor(conn) as cursor:
                 print("\n📋 테이블 목록 조회 중...")
                 await cursor.execute("SHOW TABLES")
                 tables = await cursor.fetchall()
 
                 print(f"✅ 테이블 {len(tables)}개 발견:")
                 for table in tables:
-                    table_name = list(table.values())[0]
+                    table_name = table[0]
                     print(f"   - {table_name}")
 
         # 3. JobMapRows 테이블 데이터 확인
         if tables:
             async with pool.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                async with await driver.cursor(conn) as cursor:
                     print(f"\n📊 JobMapRaws 테이블 데이터 확인...")
                     await cursor.execute("SELECT COUNT(*) as total FROM JobMapRaws")
                     count_result = await cursor.fetchone()
-                    print(f"✅ JobMapRows 테이블 총 {count_result['total']}개 행")
+                    print(f"✅ JobMapRows 테이블 총 {count_result[0]}개 행")
 
                     # 샘플 데이터 조회
                     await cursor.execute("SELECT * FROM JobMapRaws LIMIT 3")
                     sample_data = await cursor.fetchall()
+                    columns = [col[0] for col in cursor.description]
                     print(f"📝 샘플 데이터 (처음 3개):")
                     for i, row in enumerate(sample_data, 1):
-                        print(f"   {i}. {dict(row)}")
+                        print(f"   {i}. {dict(zip(columns, row))}")
 
         # 4. 연결 종료
         pool.close()
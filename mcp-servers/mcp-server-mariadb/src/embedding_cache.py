@@ -0,0 +1,173 @@
+# embedding_cache.py
+import asyncio
+import hashlib
+import sqlite3
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import logger
+
+CacheKey = Tuple[str, str, str]  # (provider, model, sha256 of the text)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def unpack_vector(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (provider, model, sha256(text)): an in-memory LRU of
+    memory_entries vectors in front of an optional SQLite file shared across restarts and processes.
+    Vectors are stored on disk as float32. SQLite work runs on a single dedicated thread.
+    """
+    def __init__(self, path: Optional[str] = None, memory_entries: int = 10000):
+        self.path = path or None
+        self.memory_entries = max(0, memory_entries)
+        self._memory: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._db: Optional[sqlite3.Connection] = None
+        # 디스크 오류가 한 번 나면 이후 호출은 메모리 캐시만 사용 (매 호출마다 실패를 반복하지 않도록)
+        self.disk_enabled = bool(self.path)
+        self.stats = {"lookups": 0, "texts": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+                      "provider_calls_saved": 0, "stored": 0, "disk_errors": 0}
+        if self.path:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-cache")
+
+    # --- SQLite (cache thread only) ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            # WAL: 다른 프로세스(워커)가 읽는 동안에도 기록 가능
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " provider TEXT NOT NULL, model TEXT NOT NULL, text_hash TEXT NOT NULL,"
+                " dimension INTEGER NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (provider, model, text_hash)) WITHOUT ROWID"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _read(self, provider: str, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        db = self._connect()
+        found: Dict[str, List[float]] = {}
+        # SQLite 바인딩 변수 한도 아래로 나눠서 조회
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = db.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})",
+                (provider, model, *chunk),
+            )
+            for digest, blob in rows:
+                found[digest] = unpack_vector(blob)
+        return found
+
+    def _write(self, provider: str, model: str, items: List[Tuple[str, List[float]]]) -> None:
+        db = self._connect()
+        now = time.time()
+        db.executemany(
+            "INSERT OR REPLACE INTO embeddings (provider, model, text_hash, dimension, vector, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(provider, model, digest, len(vector), pack_vector(vector), now) for digest, vector in items],
+        )
+        db.commit()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _disk_error(self, action: str, error: Exception) -> None:
+        self.stats["disk_errors"] += 1
+        if self.disk_enabled:
+            self.disk_enabled = False
+            logger.warning(f"⚠️ 임베딩 캐시 {action} 실패 ({self.path}), 디스크 캐시를 끄고 메모리 캐시만 사용합니다: {error}")
+
+    # --- Memory LRU ---
+    def _remember(self, key: CacheKey, vector: List[float]) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, provider: str, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached vectors in input order, None for misses."""
+        self.stats["lookups"] += 1
+        self.stats["texts"] += len(texts)
+        hashes = [text_hash(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for index, digest in enumerate(hashes):
+            key = (provider, model, digest)
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                results[index] = vector
+                self.stats["memory_hits"] += 1
+            else:
+                pending.setdefault(digest, []).append(index)
+
+        if pending and self.disk_enabled:
+            try:
+                found = await self._run(self._read, provider, model, list(pending))
+            except (sqlite3.Error, OSError) as e:
+                self._disk_error("조회", e)
+                found = {}
+            for digest, vector in found.items():
+                self._remember((provider, model, digest), vector)
+                for index in pending.pop(digest):
+                    results[index] = vector
+                    self.stats["disk_hits"] += 1
+
+        self.stats["misses"] += sum(len(indexes) for indexes in pending.values())
+        if not pending:
+            self.stats["provider_calls_saved"] += 1
+        return results
+
+    async def put_many(self, provider: str, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        items = {text_hash(text): vector for text, vector in zip(texts, vectors)}
+        for digest, vector in items.items():
+            self._remember((provider, model, digest), vector)
+        self.stats["stored"] += len(items)
+        if self.disk_enabled:
+            try:
+                await self._run(self._write, provider, model, list(items.items()))
+            except (sqlite3.Error, OSError) as e:
+                self._disk_error("기록", e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        texts = self.stats["texts"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            "path": self.path,
+            "disk_enabled": self.disk_enabled,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self.memory_entries,
+            "hit_ratio": round(hits / texts, 4) if texts else 0.0,
+            **self.stats,
+        }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            if self._db is not None:
+                self._executor.submit(self._db.close).result()
+                self._db = None
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -2,46 +2,76 @@ import logging
 import sys
 import os
 import asyncio
+import time
 from typing import List, Optional, Dict, Any, Union, Awaitable
-import numpy as np
 
 # Import configuration variables and the logger instance
 from config import (
     EMBEDDING_PROVIDER,
     OPENAI_API_KEY,
     GEMINI_API_KEY,
+    GEMINI_BATCH_SIZE, GEMINI_MAX_CONCURRENCY,
     HF_MODEL,
+    HF_ENCODE_THREADS, HF_ENCODE_PROCESSES,
+    HF_MULTIPROCESS_MIN_BATCH, HF_MULTIPROCESS_CHUNK_SIZE, HF_MULTIPROCESS_MAX_PENDING,
+    HF_MODEL_MEMORY_BUDGET_MB,
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_ENTRIES,
     logger
 )
+from embedding_cache import EmbeddingCache
+from gemini_batch import EmbeddingBatchError, GeminiBatcher
+from hf_encoder import HuggingFaceEncoder
+from model_registry import ModelRegistry
+from metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_DURATION
 
-# Import specific client libraries
-try:
-    from openai import AsyncOpenAI, OpenAIError
-except ImportError:
-    logger.warning("OpenAI library not installed. OpenAI provider will not be available.")
-    AsyncOpenAI = None # type: ignore
-    OpenAIError = Exception # type: ignore # Generic exception if library missing
-
-# Ensure site-packages is in path for google-genai
-site_packages_paths = [
-    os.path.join(os.path.dirname(sys.executable), 'Lib', 'site-packages'),
-    os.path.join(os.path.dirname(os.path.dirname(sys.executable)), 'Lib', 'site-packages')
-]
-for path in site_packages_paths:
-    if path not in sys.path and os.path.exists(path):
-        logger.info(f"Adding path to sys.path: {path}")
-        sys.path.append(path)
-
-# Import Google Genai SDK
-try:
-    import google.genai as genai
-    from google.api_core import exceptions as GoogleAPICoreExceptions
-    logger.info("Successfully imported google.genai")
-except ImportError as e:
-    logger.warning(f"Google Generative AI SDK ('google-genai' package) not installed. Gemini provider will not be available. Error: {e}")
-    logger.info(f"Current sys.path: {sys.path}")
-    genai = None # type: ignore
-    GoogleAPICoreExceptions = None # type: ignore
+# Provider SDKs are imported on first use (see _load_openai/_load_genai) so that importing this
+# module, and server.py with it, stays cheap when EMBEDDING_PROVIDER is unset or another provider is used.
+class _SDKNotLoadedError(Exception):
+    """Stands in for SDK exception classes that have not been imported; never raised."""
+
+
+AsyncOpenAI = None
+OpenAIError: type = _SDKNotLoadedError
+genai = None
+GoogleAPIError: type = _SDKNotLoadedError
+
+
+def _load_openai():
+    """Imports the OpenAI SDK on first use; returns AsyncOpenAI or None if the library is missing."""
+    global AsyncOpenAI, OpenAIError
+    if AsyncOpenAI is None:
+        try:
+            from openai import AsyncOpenAI as async_openai, OpenAIError as openai_error
+        except ImportError:
+            logger.warning("OpenAI library not installed. OpenAI provider will not be available.")
+            return None
+        AsyncOpenAI, OpenAIError = async_openai, openai_error
+    return AsyncOpenAI
+
+
+def _load_genai():
+    """Imports the Google Genai SDK on first use; returns the module or None if it is missing."""
+    global genai, GoogleAPIError
+    if genai is None:
+        # Ensure site-packages is in path for google-genai
+        site_packages_paths = [
+            os.path.join(os.path.dirname(sys.executable), 'Lib', 'site-packages'),
+            os.path.join(os.path.dirname(os.path.dirname(sys.executable)), 'Lib', 'site-packages')
+        ]
+        for path in site_packages_paths:
+            if path not in sys.path and os.path.exists(path):
+                logger.info(f"Adding path to sys.path: {path}")
+                sys.path.append(path)
+        try:
+            import google.genai as genai_module
+            from google.api_core import exceptions as google_api_exceptions
+            logger.info("Successfully imported google.genai")
+        except ImportError as e:
+            logger.warning(f"Google Generative AI SDK ('google-genai' package) not installed. Gemini provider will not be available. Error: {e}")
+            logger.info(f"Current sys.path: {sys.path}")
+            return None
+        genai, GoogleAPIError = genai_module, google_api_exceptions.GoogleAPIError
+    return genai
 
 # --- Model Definitions ---
 # Define allowed models and defaults for each provider
@@ -78,15 +108,19 @@ class EmbeddingService:
         Sets up the appropriate asynchronous client for OpenAI or configures Gemini.
         """
         self.provider = EMBEDDING_PROVIDER
-        self.openai_client: Optional[AsyncOpenAI] = None
+        self.openai_client = None
         self.gemini_client = None
+        self.gemini_batcher: Optional[GeminiBatcher] = None
+        self.hf_encoder: Optional[HuggingFaceEncoder] = None
+        self.model_registry: Optional[ModelRegistry] = None
+        self.cache: Optional[EmbeddingCache] = None
         self.allowed_models: List[str] = []
         self.default_model: str = ""
 
         logger.info(f"Initializing EmbeddingService with provider: {self.provider}")
 
         if self.provider == "openai":
-            if not AsyncOpenAI:
+            if not _load_openai():
                 logger.error("OpenAI provider selected, but 'openai' library is not installed.")
                 raise ImportError("OpenAI library not found. Please install it.")
             if not OPENAI_API_KEY:
@@ -104,10 +138,15 @@ class EmbeddingService:
             if not GEMINI_API_KEY:
                 logger.error("Gemini API key is missing.")
                 raise ValueError("Gemini API key is required for the Gemini provider.")
+            if not _load_genai():
+                logger.error("Gemini provider selected, but 'google-genai' library is not installed.")
+                raise ImportError("Google Genai library not found. Please install it.")
             try:
-                import google.genai as genai
                 genai.configure(api_key=GEMINI_API_KEY) # Ensure API key is configured
                 self.gemini_client = genai # Keeping self.gemini_client = genai based on previous structure for embed_content
+                # Batched requests (GEMINI_BATCH_SIZE texts each) with bounded concurrency on a dedicated thread pool
+                self.gemini_batcher = GeminiBatcher(self._gemini_embed_content, batch_size=GEMINI_BATCH_SIZE,
+                                                    concurrency=GEMINI_MAX_CONCURRENCY)
                 self.allowed_models = ALLOWED_GEMINI_MODELS
                 self.default_model = DEFAULT_GEMINI_MODEL
                 logger.info(f"Gemini client initialized. Default model: {self.default_model}. Allowed: {self.allowed_models}")
@@ -129,6 +168,17 @@ class EmbeddingService:
                 logger.info(f"Initializing SentenceTransformer with configured HF_MODEL: {self.default_model}")
                 self.huggingface_client = SentenceTransformer(self.default_model) 
                 # self.huggingface_client now holds the loaded model instance for config.HF_MODEL
+                # Inference runs on a dedicated executor (and optionally worker processes), never on the event loop
+                self.hf_encoder = HuggingFaceEncoder(
+                    threads=HF_ENCODE_THREADS,
+                    processes=HF_ENCODE_PROCESSES,
+                    min_batch=HF_MULTIPROCESS_MIN_BATCH,
+                    chunk_size=HF_MULTIPROCESS_CHUNK_SIZE,
+                    max_pending=HF_MULTIPROCESS_MAX_PENDING,
+                )
+                # Other allowed models are loaded once on first use and shared; the default model is never evicted
+                self.model_registry = ModelRegistry(self._load_hf_model, memory_budget=HF_MODEL_MEMORY_BUDGET_MB * 2**20)
+                self.model_registry.add(self.default_model, self.huggingface_client, pinned=True)
 
                 logger.info(f"HuggingFace provider initialized. Default model (from config.HF_MODEL): '{self.default_model}'. Client loaded. Allowed models for override: {self.allowed_models}")
 
@@ -144,6 +194,61 @@ class EmbeddingService:
             logger.error(f"Unsupported embedding provider configured: {self.provider}")
             raise ValueError(f"Unsupported embedding provider: {self.provider}")
 
+        # Content-addressed cache: repeated texts skip the provider (also across restarts and processes)
+        if EMBEDDING_CACHE_ENABLED:
+            self.cache = EmbeddingCache(EMBEDDING_CACHE_PATH, memory_entries=EMBEDDING_CACHE_MEMORY_ENTRIES)
+
+    def _gemini_embed_content(self, model: str, content: Union[str, List[str]]):
+        """Blocking embed_content call for one text or a batch of texts (runs on the Gemini thread pool)."""
+        return genai.embed_content(model=model, content=content, task_type="RETRIEVAL_DOCUMENT")
+
+    async def _load_hf_model(self, model_name: str):
+        """Loads a SentenceTransformer on the inference thread pool (used by the model registry)."""
+        from sentence_transformers import SentenceTransformer
+        return await self.hf_encoder.run(SentenceTransformer, model_name)
+
+    async def _get_registry_model(self, model_name: str):
+        """A non-default HuggingFace model from the registry, loading it on first use."""
+        try:
+            return await self.model_registry.get(model_name)
+        except Exception as e:
+            logger.error(f"Failed to load dynamically specified HuggingFace model '{model_name}': {e}", exc_info=True)
+            raise RuntimeError(f"Error with HuggingFace model '{model_name}': {e}")
+
+    async def preload_models(self, model_names: List[str]) -> None:
+        """Loads the given allowed HuggingFace models into the registry ahead of the first embed call."""
+        if self.model_registry is None:
+            return
+        for model_name in model_names:
+            if model_name != self.default_model and model_name not in self.allowed_models:
+                logger.warning(f"Skipping preload of '{model_name}': not in allowed models {self.allowed_models}.")
+                continue
+            try:
+                await self.model_registry.get(model_name)
+            except Exception as e:
+                logger.error(f"Failed to preload HuggingFace model '{model_name}': {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Provider, default model, cache hit ratio and provider-specific executor/registry statistics."""
+        stats: Dict[str, Any] = {"provider": self.provider, "default_model": self.default_model}
+        if self.model_registry is not None:
+            stats["model_registry"] = self.model_registry.snapshot()
+        if self.hf_encoder is not None:
+            stats["encoder"] = self.hf_encoder.snapshot()
+        if self.gemini_batcher is not None:
+            stats["gemini"] = self.gemini_batcher.snapshot()
+        stats["cache"] = self.cache.snapshot() if self.cache is not None else {"enabled": False}
+        return stats
+
+    def close(self) -> None:
+        """Shuts down the inference/request executors, worker processes and the cache database, if any."""
+        if self.hf_encoder is not None:
+            self.hf_encoder.close()
+        if self.gemini_batcher is not None:
+            self.gemini_batcher.close()
+        if self.cache is not None:
+            self.cache.close()
+
     def get_allowed_models(self) -> List[str]:
         """Returns the list of allowed model names for the current provider."""
         return self.allowed_models
@@ -181,7 +286,8 @@ class EmbeddingService:
                         logger.warning(f"get_sentence_embedding_dimension() returned None for '{model_to_check}'. Attempting dummy embed to get dimension.")
                         # Note: encode() might return a list of embeddings if input is a list.
                         # We need to ensure we get a single embedding's dimension.
-                        dummy_embeddings_np = self.huggingface_client.encode("test") # encode a single string
+                        import numpy as np
+                        dummy_embeddings_np = await self.hf_encoder.run(self.huggingface_client.encode, "test") # encode a single string, off the event loop
                         # Result of encode for single string might be 1D array or 2D array with 1 row
                         if isinstance(dummy_embeddings_np, np.ndarray) and dummy_embeddings_np.ndim == 1:
                             dimension = len(dummy_embeddings_np)
@@ -253,6 +359,34 @@ class EmbeddingService:
 
         logger.debug(f"Requesting embedding using model '{target_model}' for {len(texts)} text(s). Example (first 50 chars): '{texts[0][:50]}...'")
 
+        if self.cache is None:
+            embeddings = await self._embed_with_provider(texts, target_model)
+            return embeddings[0] if single_input else embeddings
+
+        # Only texts missing from the cache (memory LRU, then disk) go to the provider, each distinct text once
+        embeddings = await self.cache.get_many(self.provider, target_model, texts)
+        missing = list(dict.fromkeys(t for t, vector in zip(texts, embeddings) if vector is None))
+        if missing:
+            try:
+                fresh = dict(zip(missing, await self._embed_with_provider(missing, target_model)))
+            except EmbeddingBatchError as e:
+                # 오류 위치는 캐시 미스 목록 기준이므로 호출자의 texts 위치로 되돌림 (중복 텍스트는 모든 위치)
+                positions: Dict[str, List[int]] = {}
+                for index, t in enumerate(texts):
+                    positions.setdefault(t, []).append(index)
+                errors = {index: message for miss_index, message in e.errors.items()
+                          for index in positions[missing[miss_index]]}
+                raise EmbeddingBatchError(dict(sorted(errors.items())), len(texts)) from e
+            await self.cache.put_many(self.provider, target_model, missing, [fresh[t] for t in missing])
+            embeddings = [vector if vector is not None else fresh[t] for t, vector in zip(texts, embeddings)]
+        else:
+            logger.debug(f"All {len(texts)} embedding(s) served from cache for model '{target_model}'.")
+        return embeddings[0] if single_input else embeddings
+
+    async def _embed_with_provider(self, texts: List[str], target_model: str) -> List[List[float]]:
+        """Embeds validated texts with the configured provider; one vector per text, in input order."""
+        EMBEDDING_BATCH_SIZE.observe(len(texts), provider=self.provider)
+        started = time.perf_counter()
         try:
             if self.provider == "openai":
                 if not self.openai_client:
@@ -266,7 +400,7 @@ class EmbeddingService:
                 if response.data and len(response.data) == len(texts):
                     embeddings = [d.embedding for d in response.data]
                     logger.debug(f"OpenAI embedding(s) received. Count: {len(embeddings)}, Dimension: {len(embeddings[0]) if embeddings else 'N/A'}")
-                    return embeddings[0] if single_input else embeddings
+                    return embeddings
                 else:
                     logger.error("OpenAI embedding API response did not contain expected data or count mismatch.")
                     raise RuntimeError("Invalid response structure from OpenAI embedding API.")
@@ -275,82 +409,52 @@ class EmbeddingService:
                     logger.critical("Gemini client not initialized during embed call.")
                     raise RuntimeError("Gemini client not initialized.")
                 
-                # Since Gemini doesn't have an async API yet, we'll use asyncio.to_thread
-                embeddings = []
-                for t in texts:
-                    embedding_result = await asyncio.to_thread(
-                        genai.embed_content, # Changed from self.gemini_client.models.embed_content
-                        model=f'models/{target_model}', # Gemini models often need 'models/' prefix
-                        content=t,
-                        task_type="RETRIEVAL_DOCUMENT" # Or other relevant task_type
-                    )
-                    # The structure of embedding_result might vary. Common is embedding_result['embedding']
-                    # Based on previous structure: embedding_result.embeddings[0].values
-                    # Let's assume embedding_result directly contains the list of floats or has a clear path
-                    # For 'text-embedding-004', it's usually result['embedding'] which is a list of floats.
-                    if isinstance(embedding_result, dict) and 'embedding' in embedding_result:
-                        embeddings.append(embedding_result['embedding'])
-                    elif hasattr(embedding_result, 'embedding') and isinstance(embedding_result.embedding, list): # For some client versions
-                         embeddings.append(embedding_result.embedding)
-                    elif hasattr(embedding_result, 'embeddings') and embedding_result.embeddings and hasattr(embedding_result.embeddings[0], 'values'): # Original assumption
-                        embeddings.append(embedding_result.embeddings[0].values)
-                    else:
-                        logger.error(f"Unexpected Gemini embedding result structure: {embedding_result}")
-                        raise RuntimeError("Failed to parse Gemini embedding result.")
-            
+                # Since Gemini doesn't have an async API yet, requests run on the batcher's thread pool
+                embeddings = await self.gemini_batcher.embed(texts, f'models/{target_model}') # Gemini models often need 'models/' prefix
                 logger.debug(f"Gemini embedding(s) received. Count: {len(embeddings)}, Dimension: {len(embeddings[0]) if embeddings else 'N/A'}")
                 
-                return embeddings[0] if single_input else embeddings
+                return embeddings
             elif self.provider == "huggingface":
                 if not self.huggingface_client: # This client is now pre-loaded with config.HF_MODEL
                     logger.critical("HuggingFace client (SentenceTransformer) not properly initialized.")
                     raise RuntimeError("HuggingFace client (SentenceTransformer) not initialized. Check service setup.")
 
                 # target_model is already determined: model_name if valid, else self.default_model (which is config.HF_MODEL)
-                
-                embeddings_np: np.ndarray
                 effective_model_name = target_model
 
+                load_model = None
                 if target_model == self.default_model:
                     logger.debug(f"Using pre-loaded HuggingFace model '{self.default_model}' for embedding.")
-                    embeddings_np = self.huggingface_client.encode(texts)
+                    model = self.huggingface_client
                 else:
-                    # A different model was requested via model_name, and it's valid (already checked in pre-amble of embed)
-                    logger.info(f"Dynamically loading HuggingFace model '{target_model}' for this embed call (different from pre-loaded '{self.default_model}').")
-                    try:
-                        # Ensure sentence_transformers is available for dynamic loading too
-                        from sentence_transformers import SentenceTransformer 
-                        dynamic_model_loader = SentenceTransformer(target_model)
-                        embeddings_np = dynamic_model_loader.encode(texts)
-                    except Exception as e:
-                        logger.error(f"Failed to load or use dynamically specified HuggingFace model '{target_model}': {e}", exc_info=True)
-                        raise RuntimeError(f"Error with HuggingFace model '{target_model}': {e}")
-            
-                # Convert numpy array to list of lists of floats (or list of floats)
-                embeddings_list: Union[List[float], List[List[float]]]
-                if isinstance(embeddings_np, np.ndarray):
-                    embeddings_list = embeddings_np.tolist()
-                else: # Should ideally not happen with sentence-transformers if encode ran
-                    logger.warning("HuggingFace encode did not return a numpy array as expected.")
-                    embeddings_list = texts # Fallback, though likely incorrect
+                    # A different model was requested via model_name, and it's valid (already checked in pre-amble of embed).
+                    # The registry loads it once and shares it with concurrent and later calls; it is only
+                    # fetched when the batch is encoded in this process (worker processes load their own copy).
+                    logger.debug(f"Using HuggingFace model '{target_model}' from the model registry (different from pre-loaded '{self.default_model}').")
+                    model = None
+                    load_model = lambda: self._get_registry_model(target_model)
+
+                # Encoding and the numpy -> list conversion run off the event loop
+                embeddings_list: List[List[float]] = await self.hf_encoder.encode(model, target_model, texts, load_model=load_model)
 
                 logger.debug(f"HuggingFace embedding(s) with model '{effective_model_name}' received. Count: {len(embeddings_list)}, Dimension: {len(embeddings_list[0]) if embeddings_list and isinstance(embeddings_list[0], list) and embeddings_list[0] else (len(embeddings_list) if embeddings_list and not isinstance(embeddings_list[0], list) else 'N/A')}")
                 
-                # Adjust return for single_input
-                if single_input:
-                    return embeddings_list[0] if embeddings_list and isinstance(embeddings_list, list) and embeddings_list[0] else embeddings_list
-                else:
-                    return embeddings_list
+                return embeddings_list
             else:
                 logger.error(f"Embed called with unsupported provider: {self.provider}")
                 raise RuntimeError(f"Unsupported embedding provider: {self.provider}")
             
+        except EmbeddingBatchError as e:
+            logger.error(f"Gemini embedding failed for {len(e.errors)} of {e.total} texts: {e}")
+            raise
         except OpenAIError as e:
             logger.error(f"OpenAI API error during embedding: {e}", exc_info=True)
             raise RuntimeError(f"OpenAI API error: {e}") from e
-        except GoogleAPICoreExceptions.GoogleAPIError as e: # type: ignore
+        except GoogleAPIError as e:
             logger.error(f"Gemini API error during embedding: {e}", exc_info=True)
             raise RuntimeError(f"Gemini API error: {e}") from e
         except Exception as e:
             logger.error(f"Unexpected error during embedding with {self.provider} model {target_model}: {e}", exc_info=True)
             raise RuntimeError(f"Embedding generation failed: {e}")
+        finally:
+            EMBEDDING_DURATION.observe(time.perf_counter() - started, provider=self.provider, model=target_model)
@@ -0,0 +1,102 @@
+# gemini_batch.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from config import logger
+
+
+class EmbeddingBatchError(RuntimeError):
+    """Some items of a batch could not be embedded; errors maps input index -> error message."""
+    def __init__(self, errors: Dict[int, str], total: int):
+        self.errors = errors
+        self.total = total
+        shown = ", ".join(f"[{index}] {message}" for index, message in list(errors.items())[:5])
+        more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+        super().__init__(f"{len(errors)} of {total} texts failed to embed: {shown}{more}")
+
+
+def parse_gemini_vectors(result: Any, expected: int) -> List[List[float]]:
+    """Embedding vectors from an embed_content result for single or batched content, checked against the input count."""
+    # For 'text-embedding-004' the result is usually {'embedding': [...]} (one text) or {'embedding': [[...], ...]} (list)
+    if isinstance(result, dict) and 'embedding' in result:
+        vectors = result['embedding']
+    elif hasattr(result, 'embedding') and isinstance(result.embedding, list):  # For some client versions
+        vectors = result.embedding
+    elif hasattr(result, 'embeddings') and result.embeddings and hasattr(result.embeddings[0], 'values'):
+        vectors = [embedding.values for embedding in result.embeddings]
+    else:
+        raise ValueError(f"Unexpected Gemini embedding result structure: {type(result).__name__}")
+    if vectors and not isinstance(vectors[0], (list, tuple)):
+        vectors = [vectors]
+    if len(vectors) != expected:
+        raise ValueError(f"Gemini returned {len(vectors)} embeddings for {expected} texts")
+    return [list(vector) for vector in vectors]
+
+
+class GeminiBatcher:
+    """
+    Embeds texts with a blocking embed_call(model, content). Texts are sent in chunks of batch_size per request
+    (batch embedding); chunks run concurrently on a dedicated thread pool, at most `concurrency` at a time.
+    A chunk whose batch request fails is retried item by item, so one bad text only fails itself;
+    if the SDK does not accept a list of contents, batching is switched off for later calls.
+    """
+    def __init__(self, embed_call: Callable[[str, Any], Any], batch_size: int = 100, concurrency: int = 4):
+        self.embed_call = embed_call
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.batching = self.batch_size > 1
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="gemini-embed")
+        self.stats = {"texts": 0, "batch_requests": 0, "item_requests": 0, "batch_fallbacks": 0, "item_errors": 0}
+
+    async def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        """Embeddings in input order; raises EmbeddingBatchError listing every failed item."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.stats["texts"] += len(texts)
+
+        async def call(content: Any) -> Any:
+            async with semaphore:
+                return await loop.run_in_executor(self._executor, self.embed_call, model, content)
+
+        async def embed_item(text: str) -> List[float]:
+            self.stats["item_requests"] += 1
+            return parse_gemini_vectors(await call(text), 1)[0]
+
+        async def embed_chunk(start: int, chunk: List[str]) -> List[Any]:
+            if self.batching and len(chunk) > 1:
+                self.stats["batch_requests"] += 1
+                try:
+                    return parse_gemini_vectors(await call(chunk), len(chunk))
+                except (TypeError, ValueError) as e:
+                    # 이 SDK/모델이 목록 입력을 지원하지 않음 -> 이후 호출은 항목별로
+                    logger.warning(f"Gemini batch embedding unavailable, falling back to per-text requests: {e}")
+                    self.batching = False
+                    self.stats["batch_fallbacks"] += 1
+                except Exception as e:
+                    logger.warning(f"Gemini batch request for texts {start}-{start + len(chunk) - 1} failed, "
+                                   f"retrying per text: {e}")
+                    self.stats["batch_fallbacks"] += 1
+            return await asyncio.gather(*(embed_item(text) for text in chunk), return_exceptions=True)
+
+        chunk_size = self.batch_size if self.batching else 1
+        starts = range(0, len(texts), chunk_size)
+        chunk_results = await asyncio.gather(*(embed_chunk(start, texts[start:start + chunk_size]) for start in starts))
+
+        embeddings: List[List[float]] = []
+        errors: Dict[int, str] = {}
+        for item in (item for chunk in chunk_results for item in chunk):
+            if isinstance(item, BaseException):
+                errors[len(embeddings)] = f"{type(item).__name__}: {item}"
+            embeddings.append(item)
+        if errors:
+            self.stats["item_errors"] += len(errors)
+            raise EmbeddingBatchError(errors, len(texts))
+        return embeddings
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"batch_size": self.batch_size, "concurrency": self.concurrency, "batching": self.batching,
+                **self.stats}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,129 @@
+# hf_encoder.py
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import logger
+
+# 워커 프로세스에 로드된 모델 (모델 이름 -> SentenceTransformer), 워커마다 가장 최근 모델 하나만 유지
+_worker_models: Dict[str, Any] = {}
+
+
+def _encode_to_list(model: Any, texts: List[str]) -> List[List[float]]:
+    """Encodes on the calling (executor) thread and converts to plain lists there, not on the event loop."""
+    embeddings = model.encode(texts)
+    return embeddings.tolist() if hasattr(embeddings, "tolist") else list(embeddings)
+
+
+def _encode_chunk(model_name: str, texts: List[str]) -> List[List[float]]:
+    """
+    Runs in a worker process: loads model_name on first use and encodes one chunk.
+    Only the most recently used model is kept, so a worker holds at most one model at a time.
+    """
+    model = _worker_models.get(model_name)
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        # 다른 모델로 바뀌면 이전 모델을 먼저 해제 (워커 메모리는 모델 레지스트리 예산 밖)
+        _worker_models.clear()
+        model = _worker_models[model_name] = SentenceTransformer(model_name)
+    return _encode_to_list(model, texts)
+
+
+def split_chunks(texts: List[str], chunk_size: int) -> List[Tuple[int, List[str]]]:
+    """[(start offset, texts)] in input order."""
+    chunk_size = max(1, chunk_size)
+    return [(start, texts[start:start + chunk_size]) for start in range(0, len(texts), chunk_size)]
+
+
+class HuggingFaceEncoder:
+    """
+    Runs SentenceTransformer inference off the event loop. Small batches go to a dedicated thread pool
+    with the already loaded model; batches of at least min_batch texts are split into chunks that
+    worker processes encode in parallel, and the results are reassembled in input order.
+    Worker processes load their own copy of the model, outside the parent's model registry budget.
+    """
+    def __init__(self, threads: int = 1, processes: int = 0, min_batch: int = 256,
+                 chunk_size: int = 64, max_pending: int = 2):
+        self.threads = max(1, threads)
+        self.processes = max(0, processes)
+        self.min_batch = max(1, min_batch)
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="hf-encode")
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Optional[asyncio.Semaphore] = None
+        self.stats = {"thread_calls": 0, "process_calls": 0, "process_chunks": 0, "texts": 0,
+                      "process_fallbacks": 0}
+
+    async def run(self, func, *args):
+        """Runs a blocking call (model load, encode) on the inference thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _uses_processes(self, texts: List[str]) -> bool:
+        return self.processes > 0 and len(texts) >= self.min_batch
+
+    async def encode(self, model: Any, model_name: str, texts: List[str],
+                     load_model: Optional[Callable[[], Awaitable[Any]]] = None) -> List[List[float]]:
+        """
+        Embeddings for texts as lists of floats, in input order.
+        When model is None, load_model is awaited only if the batch is encoded on the thread pool;
+        batches sent to the worker processes never load the model in this process.
+        """
+        self.stats["texts"] += len(texts)
+        if self._uses_processes(texts):
+            try:
+                return await self._encode_in_processes(model_name, texts)
+            except BrokenProcessPool as e:
+                # 워커가 죽으면(예: 메모리 부족) 풀을 버리고 이번 호출은 스레드에서 처리
+                logger.warning(f"⚠️ 임베딩 워커 프로세스 풀 손상, 스레드 모드로 처리합니다: {e}")
+                self.stats["process_fallbacks"] += 1
+                self._shutdown_process_pool()
+        if model is None:
+            model = await load_model()
+        self.stats["thread_calls"] += 1
+        return await self.run(_encode_to_list, model, texts)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # spawn: torch/tokenizer 스레드 상태를 fork로 복제하지 않음
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            self._pending = asyncio.Semaphore(self.max_pending)
+            logger.info(f"🧮 임베딩 워커 프로세스 풀 시작 (프로세스 {self.processes}개, 청크 {self.chunk_size}개, "
+                        f"대기 한도 {self.max_pending})")
+        return self._process_pool
+
+    async def _encode_in_processes(self, model_name: str, texts: List[str]) -> List[List[float]]:
+        pool = self._get_process_pool()
+        loop = asyncio.get_running_loop()
+        chunks = split_chunks(texts, self.chunk_size)
+        started = time.perf_counter()
+
+        async def encode_chunk(chunk: List[str]) -> List[List[float]]:
+            # 세마포어로 워커에 제출된 청크 수를 제한 (큰 배치가 다른 호출의 청크를 밀어내지 않도록)
+            async with self._pending:
+                return await loop.run_in_executor(pool, _encode_chunk, model_name, chunk)
+
+        results = await asyncio.gather(*(encode_chunk(chunk) for _, chunk in chunks))
+        self.stats["process_calls"] += 1
+        self.stats["process_chunks"] += len(chunks)
+        logger.debug(f"Encoded {len(texts)} texts in {len(chunks)} chunks across {self.processes} processes "
+                     f"in {time.perf_counter() - started:.2f}s")
+        return [embedding for chunk_result in results for embedding in chunk_result]
+
+    def _shutdown_process_pool(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"threads": self.threads, "processes": self.processes, "min_batch": self.min_batch,
+                "chunk_size": self.chunk_size, "process_pool_started": self._process_pool is not None,
+                **self.stats}
+
+    def close(self) -> None:
+        self._shutdown_process_pool()
+        self._executor.shutdown(wait=False, cancel_futures=True)
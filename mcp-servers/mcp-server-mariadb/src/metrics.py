@@ -0,0 +1,212 @@
+# metrics.py
+import bisect
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import logger
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 히스토그램 구간 상한
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ACQUIRE_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+BYTE_BUCKETS = (256, 1024, 16 * 1024, 128 * 1024, 1024 * 1024, 8 * 1024 * 1024, 64 * 1024 * 1024)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], *extra: str) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    parts.extend(e for e in extra if e)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {_escape(self.documentation)}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter; exposed as <name>_total."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self, const: str = "") -> List[str]:
+        return self.header() + [f"{self.name}_total{_labels(self.labelnames, key, const)} {_number(value)}"
+                                for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; exposed as cumulative <name>_bucket plus _count and _sum."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합별 [구간별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def render(self, const: str = "") -> List[str]:
+        lines = self.header()
+        for key, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, const, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key, const)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key, const)} {_number(self._sums[key])}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time; the callback yields (label_values, value) pairs."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[Sequence[Any], float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self, const: str = "") -> List[str]:
+        return self.header() + [f"{self.name}{_labels(self.labelnames, key, const)} {_number(value)}"
+                                for key, value in self.callback()]
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them in the OpenMetrics text format."""
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str],
+              callback: Callable[[], Iterable[Tuple[Sequence[Any], float]]]) -> Gauge:
+        """Registers (or replaces) a callback gauge."""
+        return self._register(Gauge(name, documentation, labelnames, callback))
+
+    def families(self, const_labels: Optional[Dict[str, Any]] = None) -> List[List[str]]:
+        """Rendered lines per metric family (TYPE and HELP first), with const_labels added to every sample."""
+        const = ",".join(f'{name}="{_escape(value)}"' for name, value in (const_labels or {}).items())
+        families: List[List[str]] = []
+        for metric in self._metrics.values():
+            try:
+                families.append(metric.render(const))
+            except Exception as e:
+                # 콜백 게이지 하나의 오류로 전체 수집이 실패하지 않도록 건너뜀
+                logger.warning(f"⚠️ 메트릭 {metric.name} 수집 실패: {e}")
+        return families
+
+    def render(self, const_labels: Optional[Dict[str, Any]] = None) -> str:
+        return merge_families([self.families(const_labels)])
+
+
+def merge_families(sources: Iterable[List[List[str]]]) -> str:
+    """
+    OpenMetrics text for families rendered by several processes (e.g. one list per worker, each with a
+    distinct worker label): each family's TYPE/HELP is written once, followed by the samples of every source.
+    """
+    merged: Dict[str, List[str]] = {}
+    for families in sources:
+        for lines in families:
+            if len(lines) < 2:
+                continue
+            key = lines[0]
+            if key not in merged:
+                merged[key] = list(lines)
+            else:
+                merged[key].extend(lines[2:])
+    out = [line for lines in merged.values() for line in lines]
+    out.append("# EOF")
+    return "\n".join(out) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+TOOL_CALLS = METRICS.counter("mcp_tool_calls", "MCP tool calls by tool and outcome.", ("tool", "status"))
+TOOL_DURATION = METRICS.histogram("mcp_tool_duration_seconds", "MCP tool call latency.", ("tool",))
+TOOL_ERRORS = METRICS.counter("mcp_tool_errors", "Failed MCP tool calls by exception class.", ("tool", "exception"))
+POOL_ACQUIRE_WAIT = METRICS.histogram("mcp_pool_acquire_wait_seconds", "Time spent acquiring a pooled connection.",
+                                      buckets=ACQUIRE_WAIT_BUCKETS)
+RESULT_ROWS = METRICS.histogram("mcp_result_rows", "Rows returned per query result.", ("tool",), buckets=ROW_BUCKETS)
+RESULT_BYTES = METRICS.histogram("mcp_result_bytes", "Approximate JSON bytes returned per query result.", ("tool",),
+                                 buckets=BYTE_BUCKETS)
+EMBEDDING_DURATION = METRICS.histogram("mcp_embedding_duration_seconds", "Embedding provider call latency.",
+                                       ("provider", "model"))
+EMBEDDING_BATCH_SIZE = METRICS.histogram("mcp_embedding_batch_size", "Texts per embedding call.", ("provider",),
+                                         buckets=BATCH_SIZE_BUCKETS)
+
+
+def instrumented(func):
+    """Decorator recording call count, latency and exception class of an async tool."""
+    tool = func.__name__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            TOOL_CALLS.inc(tool=tool, status="error")
+            TOOL_ERRORS.inc(tool=tool, exception=type(e).__name__)
+            raise
+        else:
+            TOOL_CALLS.inc(tool=tool, status="ok")
+            return result
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=tool)
+    return wrapper
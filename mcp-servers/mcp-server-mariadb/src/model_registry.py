@@ -0,0 +1,110 @@
+# model_registry.py
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from config import logger
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Parameter and buffer memory of a torch module (e.g. SentenceTransformer); 0 if it cannot be measured."""
+    total = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    except (AttributeError, TypeError):
+        return 0
+    return total
+
+
+class ModelRegistry:
+    """
+    Loaded models by name, shared by all callers. Each model is loaded once: concurrent requests for a
+    model that is still loading wait for the same load. When the estimated memory of the loaded models
+    exceeds memory_budget bytes, least recently used models are evicted (pinned models never are).
+    """
+    def __init__(self, loader: Callable[[str], Awaitable[Any]], memory_budget: int,
+                 size_of: Callable[[Any], int] = estimate_model_bytes):
+        self.loader = loader
+        self.memory_budget = max(0, memory_budget)
+        self.size_of = size_of
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._pinned: Set[str] = set()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self.memory_used = 0
+        self.stats = {"hits": 0, "loads": 0, "shared_loads": 0, "load_failures": 0, "evictions": 0,
+                      "load_seconds_total": 0.0}
+
+    def add(self, name: str, model: Any, pinned: bool = False) -> None:
+        """Registers an already loaded model (e.g. the default model loaded at startup)."""
+        if pinned:
+            self._pinned.add(name)
+        self._store(name, model)
+
+    async def get(self, name: str) -> Any:
+        model = self._models.get(name)
+        if model is not None:
+            self._models.move_to_end(name)
+            self.stats["hits"] += 1
+            return model
+        loading = self._loading.get(name)
+        if loading is not None:
+            # 같은 모델을 이미 로드 중이면 그 결과를 함께 기다림
+            self.stats["shared_loads"] += 1
+            return await asyncio.shield(loading)
+        # 호출자가 취소되어도 로드는 계속되어 다른 대기자와 다음 호출이 결과를 사용
+        loading = self._loading[name] = asyncio.get_running_loop().create_task(self._load(name))
+        return await asyncio.shield(loading)
+
+    async def _load(self, name: str) -> Any:
+        started = time.perf_counter()
+        try:
+            model = await self.loader(name)
+        except Exception:
+            self.stats["load_failures"] += 1
+            self._loading.pop(name, None)
+            raise
+        elapsed = time.perf_counter() - started
+        self.stats["loads"] += 1
+        self.stats["load_seconds_total"] += elapsed
+        self._store(name, model)
+        self._loading.pop(name, None)
+        logger.info(f"📦 임베딩 모델 로드: {name} ({self._sizes[name] / 2**20:.0f} MB, {elapsed:.1f}s, "
+                    f"사용 중 {self.memory_used / 2**20:.0f}/{self.memory_budget / 2**20:.0f} MB)")
+        return model
+
+    def _store(self, name: str, model: Any) -> None:
+        if name in self._models:
+            self.memory_used -= self._sizes.pop(name)
+        size = self.size_of(model)
+        self._models[name] = model
+        self._sizes[name] = size
+        self.memory_used += size
+        self._evict(keep=name)
+
+    def _evict(self, keep: str) -> None:
+        # 방금 로드한 모델은 예산보다 커도 유지 (호출자가 바로 사용), 나머지는 오래된 순으로 제거
+        for name in list(self._models):
+            if self.memory_used <= self.memory_budget:
+                break
+            if name == keep or name in self._pinned:
+                continue
+            del self._models[name]
+            self.memory_used -= self._sizes.pop(name)
+            self.stats["evictions"] += 1
+            logger.info(f"♻️ 임베딩 모델 해제 (LRU): {name}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "memory_budget_mb": round(self.memory_budget / 2**20, 1),
+            "memory_used_mb": round(self.memory_used / 2**20, 1),
+            "models": [{"name": name, "memory_mb": round(self._sizes[name] / 2**20, 1), "pinned": name in self._pinned}
+                       for name in reversed(self._models)],
+            "loading": sorted(self._loading),
+            **{key: round(value, 3) if isinstance(value, float) else value for key, value in self.stats.items()},
+        }
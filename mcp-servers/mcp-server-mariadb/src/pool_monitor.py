@@ -0,0 +1,66 @@
+# pool_monitor.py
+import bisect
+import time
+import weakref
+from typing import Any, Dict, List
+
+# 연결 획득 지연 히스토그램 구간 상한 (ms)
+ACQUIRE_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class PoolMonitor:
+    """
+    Tracks pooled connections' age and idle time, decides when a connection must be recycled
+    or liveness-checked before use, and keeps acquire-latency statistics.
+    """
+    def __init__(self, max_age: float, ping_after_idle: float):
+        self.max_age = max_age
+        self.ping_after_idle = ping_after_idle
+        self._created: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        self._last_used: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+        self.acquire_buckets = [0] * (len(ACQUIRE_BUCKETS_MS) + 1)
+        self.acquire_count = 0
+        self.acquire_total_ms = 0.0
+        self.acquire_max_ms = 0.0
+        self.waiting = 0
+        self.stats = {"warmed": 0, "pings": 0, "ping_failures": 0, "recycled_age": 0, "recycled_dead": 0}
+
+    def needs_recycle(self, conn, now: float) -> bool:
+        """True if the connection is older than max_age (it is then closed and replaced by the pool)."""
+        created = self._created.setdefault(conn, now)
+        return self.max_age > 0 and now - created > self.max_age
+
+    def needs_ping(self, conn, now: float) -> bool:
+        """True if the connection sat idle long enough that the server may have dropped it (wait_timeout)."""
+        last_used = self._last_used.get(conn)
+        return last_used is not None and self.ping_after_idle >= 0 and now - last_used > self.ping_after_idle
+
+    def forget(self, conn) -> None:
+        self._created.pop(conn, None)
+        self._last_used.pop(conn, None)
+
+    def mark_released(self, conn) -> None:
+        self._last_used[conn] = time.monotonic()
+
+    def record_acquire(self, elapsed_ms: float) -> None:
+        self.acquire_count += 1
+        self.acquire_total_ms += elapsed_ms
+        self.acquire_max_ms = max(self.acquire_max_ms, elapsed_ms)
+        self.acquire_buckets[bisect.bisect_left(ACQUIRE_BUCKETS_MS, elapsed_ms)] += 1
+
+    def histogram(self) -> Dict[str, int]:
+        labels = [f"le_{int(b)}ms" for b in ACQUIRE_BUCKETS_MS] + ["gt_5000ms"]
+        return dict(zip(labels, self.acquire_buckets))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "acquire_count": self.acquire_count,
+            "acquire_mean_ms": round(self.acquire_total_ms / self.acquire_count, 3) if self.acquire_count else 0.0,
+            "acquire_max_ms": round(self.acquire_max_ms, 3),
+            "acquire_histogram": self.histogram(),
+            "waiting": self.waiting,
+            "tracked_connections": len(self._created),
+            "max_age_seconds": self.max_age,
+            "ping_after_idle_seconds": self.ping_after_idle,
+            **self.stats,
+        }
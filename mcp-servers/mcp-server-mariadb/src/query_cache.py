@@ -0,0 +1,195 @@
+# query_cache.py
+import asyncio
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import logger
+from result_format import ResultSet
+
+TableRef = Tuple[str, str]
+TableVersions = Dict[TableRef, Any]
+
+# 문자열 리터럴/식별자 인용은 보존하고 그 밖의 공백만 정규화
+_QUOTED_OR_SPACE_RE = re.compile(r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|\s+""", re.S)
+_STRING_LITERAL_RE = re.compile(r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*\"""", re.S)
+_NON_DETERMINISTIC_RE = re.compile(
+    r"\b(NOW|CURDATE|CURTIME|SYSDATE|CURRENT_(?:DATE|TIME|TIMESTAMP|USER)|UTC_(?:DATE|TIME|TIMESTAMP)|"
+    r"UNIX_TIMESTAMP|RAND|UUID|UUID_SHORT|CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|USER|SLEEP|"
+    r"NEXTVAL|LASTVAL)\b|@|\bFOR\s+UPDATE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b",
+    re.I,
+)
+_TABLE_REF_RE = re.compile(r"`?([\w$]+)`?(?:\s*\.\s*`?([\w$]+)`?)?")
+# 별칭 자리에 다음 절의 키워드(JOIN, WHERE 등)가 잡히지 않도록 제외
+_CLAUSE_KEYWORDS = r"(?:JOIN|INNER|LEFT|RIGHT|CROSS|NATURAL|STRAIGHT_JOIN|ON|USING|WHERE|GROUP|ORDER|HAVING|LIMIT|UNION|WINDOW|FOR|LOCK)\b"
+_TABLE_ITEM = r"`?[\w$]+`?(?:\s*\.\s*`?[\w$]+`?)?(?:\s+(?:AS\s+)?(?!" + _CLAUSE_KEYWORDS + r")`?[\w$]+`?)?"
+_FROM_CLAUSE_RE = re.compile(r"\b(?:FROM|JOIN)\s+(" + _TABLE_ITEM + r"(?:\s*,\s*" + _TABLE_ITEM + r")*)", re.I)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapses whitespace outside quotes and strips a trailing semicolon."""
+    normalized = _QUOTED_OR_SPACE_RE.sub(lambda m: m.group(1) or " ", sql.strip())
+    return normalized.rstrip("; ")
+
+
+def is_cacheable(sql: str) -> bool:
+    """Only deterministic plain SELECTs are cached."""
+    stripped = _STRING_LITERAL_RE.sub("''", sql).strip()
+    if not stripped[:6].upper() == "SELECT":
+        return False
+    return _NON_DETERMINISTIC_RE.search(stripped) is None
+
+
+def referenced_tables(sql: str, default_database: Optional[str]) -> List[TableRef]:
+    """Best-effort list of (schema, table) pairs named in FROM/JOIN clauses."""
+    stripped = _STRING_LITERAL_RE.sub("''", sql)
+    tables: List[TableRef] = []
+    for clause in _FROM_CLAUSE_RE.finditer(stripped):
+        for segment in clause.group(1).split(","):
+            ref = _TABLE_REF_RE.search(segment)
+            if not ref:
+                continue
+            schema, table = (ref.group(1), ref.group(2)) if ref.group(2) else (default_database, ref.group(1))
+            if schema and (schema, table) not in tables:
+                tables.append((schema, table))
+    return tables
+
+
+class _CacheEntry:
+    __slots__ = ("result", "size", "created_at", "validated_at", "tables", "versions")
+
+    def __init__(self, result: ResultSet, size: int, tables: List[TableRef], versions: TableVersions):
+        self.result = result
+        self.size = size
+        self.created_at = self.validated_at = time.monotonic()
+        self.tables = tables
+        self.versions = versions
+
+
+class QueryResultCache:
+    """
+    In-process cache for read-only query results with TTL and LRU eviction under a byte budget.
+    Identical concurrent queries share one in-flight execution (single-flight), and entries are
+    revalidated against information_schema.TABLES.UPDATE_TIME of the tables they read.
+    """
+    def __init__(self, ttl: float, max_bytes: int, validate_interval: float):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # 단일 항목이 예산 대부분을 차지하지 않도록 제한
+        self.max_entry_bytes = max(1, max_bytes // 4)
+        self.validate_interval = validate_interval
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.current_bytes = 0
+        self.stats = {
+            "hits": 0, "misses": 0, "coalesced": 0, "stores": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0, "uncacheable_size": 0,
+        }
+
+    @staticmethod
+    def make_key(database: Optional[str], sql: str, params: Optional[Iterable[Any]], budget: Tuple = ()) -> Tuple:
+        # budget(행/바이트 한도)가 다르면 잘린 결과도 다르므로 키에 포함
+        return (database or "", normalize_sql(sql), json.dumps(list(params or ()), default=str, sort_keys=True), tuple(budget))
+
+    async def get_or_load(self, key: Tuple, tables: List[TableRef],
+                          loader: Callable[[], Awaitable[ResultSet]],
+                          fetch_versions: Callable[[List[TableRef]], Awaitable[TableVersions]]) -> ResultSet:
+        while True:
+            entry = await self._lookup(key, fetch_versions)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry.result
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 선행 실행이 취소된 경우에만 다시 시도 (자신이 취소된 경우는 전파)
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # 실행 전에 버전을 읽어 두어야 실행 중 변경도 다음 검증에서 감지됨
+            versions = await fetch_versions(tables) if tables else {}
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 대기자가 없을 때 'never retrieved' 경고 방지
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        self._store(key, result, tables, versions)
+        return result
+
+    async def _lookup(self, key: Tuple, fetch_versions) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry.created_at > self.ttl:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        if entry.tables and now - entry.validated_at > self.validate_interval:
+            versions = await fetch_versions(entry.tables)
+            if versions != entry.versions:
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+                self.stats["invalidations"] += 1
+                logger.debug(f"🧹 쿼리 캐시 무효화 (테이블 변경 감지): {entry.tables}")
+                return None
+            entry.validated_at = now
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Tuple, result: ResultSet, tables: List[TableRef], versions: TableVersions) -> None:
+        size = result.estimated_bytes()
+        if size > self.max_entry_bytes:
+            self.stats["uncacheable_size"] += 1
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(result, size, tables, versions)
+        self.current_bytes += size
+        self.stats["stores"] += 1
+        while self.current_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "hit_ratio": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "inflight": len(self._inflight),
+        }
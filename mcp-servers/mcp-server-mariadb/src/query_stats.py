@@ -0,0 +1,158 @@
+# query_stats.py
+import random
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# 주석, 문자열 리터럴, 숫자 리터럴, IN 목록 정규화용 패턴
+# 주석·문자열·백틱 식별자는 한 번의 왼쪽→오른쪽 스캔으로 구분 (주석 안의 따옴표, 문자열 안의 -- 를 오인하지 않도록)
+_TOKEN_RE = re.compile(
+    r"""(?P<comment>/\*.*?\*/|--[^\n]*|#[^\n]*)"""
+    r"""|(?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.)*")"""
+    r"""|(?P<ident>`(?:[^`]|``)*`)""",
+    re.S,
+)
+_NUMBER_RE = re.compile(r"(?<![\w$.`])[-+]?(?:0x[0-9a-f]+|\d+(?:\.\d*)?(?:e[-+]?\d+)?|\.\d+)\b", re.I)
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_LIST_RE = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.I)
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s")
+_SPACE_RE = re.compile(r"\s+")
+
+STATS_ORDER_KEYS = ("calls", "total_ms", "mean_ms", "p50_ms", "p99_ms", "max_ms", "rows", "errors")
+
+
+def _replace_token(match: "re.Match[str]") -> str:
+    if match.group("comment") is not None:
+        return " "
+    if match.group("string") is not None:
+        return "?"
+    return match.group(0)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """
+    Normalizes a statement so that queries differing only in literal values share one entry:
+    comments are dropped, literals and driver placeholders become '?', IN/VALUES lists collapse.
+    """
+    text = _TOKEN_RE.sub(_replace_token, sql)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("IN (...)", text)
+    text = _VALUES_LIST_RE.sub("VALUES (...)", text)
+    return _SPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+
+
+class _StatementStats:
+    __slots__ = ("query", "calls", "errors", "rows", "total_ms", "min_ms", "max_ms", "samples", "first_seen", "last_seen")
+
+    def __init__(self, query: str):
+        self.query = query
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self.samples: List[float] = []
+        self.first_seen = self.last_seen = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        calls = self.calls or 1
+        return {
+            "query": self.query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "rows_per_call": round(self.rows / calls, 2),
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / calls, 3),
+            "min_ms": round(self.min_ms, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(_percentile(samples, 0.50), 3),
+            "p99_ms": round(_percentile(samples, 0.99), 3),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class QueryStats:
+    """
+    Bounded per-fingerprint statement statistics (calls, latency percentiles, rows, errors).
+    Holds at most max_entries fingerprints, evicting the least recently executed one;
+    latency percentiles come from a per-fingerprint reservoir of sample_size timings.
+    """
+    def __init__(self, max_entries: int = 500, sample_size: int = 1000):
+        self.max_entries = max(1, max_entries)
+        self.sample_size = max(1, sample_size)
+        self._entries: "OrderedDict[str, _StatementStats]" = OrderedDict()
+        self.evicted = 0
+        self.reset_at = time.time()
+
+    def record(self, sql: str, elapsed_ms: float, rows: int = 0, error: bool = False) -> None:
+        key = fingerprint(sql)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _StatementStats(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._entries.move_to_end(key)
+        entry.calls += 1
+        entry.last_seen = time.time()
+        entry.total_ms += elapsed_ms
+        entry.min_ms = min(entry.min_ms, elapsed_ms)
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+        if error:
+            entry.errors += 1
+        else:
+            entry.rows += rows
+        # 저장소 샘플링(reservoir sampling)으로 메모리를 고정한 채 분위수 추정
+        if len(entry.samples) < self.sample_size:
+            entry.samples.append(elapsed_ms)
+        else:
+            slot = random.randrange(entry.calls)
+            if slot < self.sample_size:
+                entry.samples[slot] = elapsed_ms
+
+    def top(self, limit: int = 20, order_by: str = "total_ms", query_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns up to limit fingerprints sorted descending by order_by."""
+        if order_by not in STATS_ORDER_KEYS:
+            raise ValueError(f"Unsupported order_by '{order_by}'. Choose from: {list(STATS_ORDER_KEYS)}")
+        needle = query_filter.lower() if query_filter else None
+        items = [entry.to_dict() for entry in self._entries.values()
+                 if needle is None or needle in entry.query.lower()]
+        items.sort(key=lambda item: item[order_by], reverse=True)
+        return items[:max(0, limit)]
+
+    def reset(self) -> int:
+        """Drops all statistics. Returns how many fingerprints were removed."""
+        removed = len(self._entries)
+        self._entries.clear()
+        self.evicted = 0
+        self.reset_at = time.time()
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "fingerprints": len(self._entries),
+            "max_entries": self.max_entries,
+            "evicted": self.evicted,
+            "total_calls": sum(entry.calls for entry in self._entries.values()),
+            "total_errors": sum(entry.errors for entry in self._entries.values()),
+            "since": self.reset_at,
+        }
@@ -0,0 +1,177 @@
+# replicas.py
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import logger
+
+
+def parse_replica_hosts(value: Optional[str], default_port: int) -> List[Tuple[str, int]]:
+    """Parses 'host1:3307,host2' into [(host, port), ...]."""
+    endpoints: List[Tuple[str, int]] = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if item.count(":") == 1 else (item, "", "")
+        endpoints.append((host, int(port)) if port else (item, default_port))
+    return endpoints
+
+
+class Replica:
+    """One read replica endpoint with its own pool and the health/lag seen by the last poll."""
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.pool = None
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.acquiring = 0
+        self.routed = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def load(self) -> float:
+        """Fraction of the replica pool that is in use or being acquired (open streams included)."""
+        pool = self.pool
+        in_use = pool.size - pool.freesize if pool is not None else 0
+        return (in_use + self.acquiring) / ((getattr(pool, "maxsize", 0) or 1))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "load": round(self.load(), 3),
+            "routed": self.routed,
+            "pool_size": getattr(self.pool, "size", 0),
+            "pool_free": getattr(self.pool, "freesize", 0),
+            "last_checked_ago": round(time.monotonic() - self.last_checked, 1) if self.last_checked else None,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """
+    Keeps a pool per replica, polls replication lag in the background and picks the
+    least-loaded replica whose lag is under max_lag. Returns None when no replica qualifies,
+    in which case the caller uses the primary. A host that reports no replication at all (empty
+    SHOW SLAVE STATUS) is unhealthy unless allow_unreplicated is set, since its lag is unknown.
+    """
+    def __init__(self, driver, endpoints: List[Tuple[str, int]], max_lag: float, poll_interval: float,
+                 pool_options: Dict[str, Any], allow_unreplicated: bool = False):
+        self.driver = driver
+        self.replicas = [Replica(host, port) for host, port in endpoints]
+        self.max_lag = max_lag
+        self.allow_unreplicated = allow_unreplicated
+        self.poll_interval = poll_interval
+        self.pool_options = pool_options
+        self.fallbacks = 0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    async def start(self) -> None:
+        if not self.replicas:
+            return
+        await self.poll_once()
+        self._poll_task = asyncio.get_running_loop().create_task(self._poll_loop())
+        healthy = [r.name for r in self.replicas if r.healthy]
+        logger.info(f"✅ 읽기 복제본 {len(self.replicas)}개 등록, 정상: {healthy}")
+
+    def pick(self) -> Optional[Replica]:
+        candidates = [r for r in self.replicas if r.healthy and r.pool is not None]
+        if not candidates:
+            if self.replicas:
+                self.fallbacks += 1
+            return None
+        # 사용률이 가장 낮은 복제본, 같으면 지연이 적은 쪽
+        return min(candidates, key=lambda r: (r.load(), r.lag or 0.0))
+
+    def mark_failed(self, replica: Replica, error: Exception) -> None:
+        """Takes a replica out of rotation until the next successful poll."""
+        if replica.healthy:
+            logger.warning(f"⚠️ 복제본 {replica.name} 오류로 라우팅 제외: {error}")
+        replica.healthy = False
+        replica.last_error = str(error)
+
+    async def poll_once(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica) -> None:
+        replica.last_checked = time.monotonic()
+        try:
+            if replica.pool is None:
+                replica.pool = await self.driver.create_pool(host=replica.host, port=replica.port, **self.pool_options)
+            lag = await self._read_lag(replica)
+        except Exception as e:
+            if replica.healthy or replica.last_error is None:
+                logger.warning(f"⚠️ 복제본 {replica.name} 상태 확인 실패: {e}")
+            replica.healthy = False
+            replica.last_error = str(e)
+            return
+        replica.lag = lag
+        replica.last_error = None
+        was_healthy = replica.healthy
+        # 복제 정보 없이 허용된 호스트(lag=None)는 연결 가능 여부만으로 판단
+        replica.healthy = lag is None or lag <= self.max_lag
+        if was_healthy and not replica.healthy:
+            logger.warning(f"⚠️ 복제본 {replica.name} 지연 {lag}s > {self.max_lag}s, 라우팅 제외")
+        elif replica.healthy and not was_healthy:
+            logger.info(f"✅ 복제본 {replica.name} 라우팅 재개 (지연: {lag}s)")
+
+    async def _read_lag(self, replica: Replica) -> Optional[float]:
+        """
+        Seconds_Behind_Master from SHOW SLAVE STATUS. A host that reports no replication raises
+        (it may be a misconfigured endpoint or a primary), or returns None with allow_unreplicated.
+        """
+        async with replica.pool.acquire() as conn:
+            async with await self.driver.cursor(conn) as cursor:
+                await cursor.execute("SHOW SLAVE STATUS")
+                row = await cursor.fetchone()
+                if row is None:
+                    if self.allow_unreplicated:
+                        return None
+                    raise RuntimeError("host reports no replication (SHOW SLAVE STATUS is empty)")
+                columns = [col[0] for col in cursor.description]
+                status = dict(zip(columns, row))
+        if status.get("Slave_IO_Running") != "Yes" or status.get("Slave_SQL_Running") != "Yes":
+            raise RuntimeError(f"replication is not running (IO: {status.get('Slave_IO_Running')}, "
+                               f"SQL: {status.get('Slave_SQL_Running')})")
+        lag = status.get("Seconds_Behind_Master")
+        if lag is None:
+            raise RuntimeError("Seconds_Behind_Master is NULL")
+        return float(lag)
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"❌ 복제본 상태 폴링 오류: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        for replica in self.replicas:
+            if replica.pool is not None:
+                replica.pool.close()
+                await replica.pool.wait_closed()
+                replica.pool = None
+            replica.healthy = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "allow_unreplicated": self.allow_unreplicated,
+            "poll_interval_seconds": self.poll_interval,
+            "primary_fallbacks": self.fallbacks,
+            "replicas": [replica.snapshot() for replica in self.replicas],
+        }
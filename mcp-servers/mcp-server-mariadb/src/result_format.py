@@ -0,0 +1,202 @@
+# result_format.py
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Output shapes understood by the row-returning tools
+OUTPUT_FORMATS = ("rows", "columnar", "ndjson")
+DEFAULT_OUTPUT_FORMAT = "rows"
+
+# MySQL/MariaDB protocol column type codes (FIELD_TYPE) as reported in cursor.description
+FIELD_TYPE_NAMES: Dict[int, str] = {
+    0: "decimal", 1: "tinyint", 2: "smallint", 3: "int", 4: "float", 5: "double",
+    6: "null", 7: "timestamp", 8: "bigint", 9: "mediumint", 10: "date", 11: "time",
+    12: "datetime", 13: "year", 14: "date", 15: "varchar", 16: "bit", 245: "json",
+    246: "decimal", 247: "enum", 248: "set", 249: "tinyblob", 250: "mediumblob",
+    251: "longblob", 252: "blob", 253: "varchar", 254: "char", 255: "geometry",
+}
+
+
+def validate_output_format(output_format: Optional[str]) -> str:
+    """Returns a normalized output format name or raises ValueError."""
+    fmt = (output_format or DEFAULT_OUTPUT_FORMAT).lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output_format '{output_format}'. Choose from: {list(OUTPUT_FORMATS)}")
+    return fmt
+
+
+def column_names(cursor) -> List[str]:
+    """
+    Column names for the current result, disambiguated the same way DictCursor does
+    (a repeated name is prefixed with its table name, e.g. 'b.id').
+    """
+    description = cursor.description or ()
+    # 드라이버 결과의 필드 메타데이터(테이블명)를 사용할 수 있으면 사용
+    fields = getattr(getattr(cursor, "_result", None), "fields", None)
+    names: List[str] = []
+    for i, col in enumerate(description):
+        name = col[0]
+        if name in names:
+            table = getattr(fields[i], "table_name", "") if fields and i < len(fields) else ""
+            name = f"{table}.{name}" if table else f"{name}_{i}"
+        names.append(name)
+    return names
+
+
+def column_types(cursor) -> List[str]:
+    """Readable column type names for the current result."""
+    return [FIELD_TYPE_NAMES.get(col[1], str(col[1])) for col in (cursor.description or ())]
+
+
+# 아래 변환기는 NULL(None)을 그대로 통과시키므로 컬럼 전체에 map()으로 적용 가능
+def _to_iso(value):
+    try:
+        return value.isoformat()
+    except AttributeError:
+        # NULL 또는 '0000-00-00' 처럼 드라이버가 문자열로 반환한 값
+        return value
+
+
+def _format_time(value):
+    """TIME columns arrive as timedelta; render them as MariaDB does ('[-]HH:MM:SS[.ffffff]')."""
+    try:
+        total_us = (value.days * 86400 + value.seconds) * 1_000_000 + value.microseconds
+    except AttributeError:
+        return value
+    sign = "-" if total_us < 0 else ""
+    seconds, micros = divmod(abs(total_us), 1_000_000)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    text = f"{sign}{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{text}.{micros:06d}" if micros else text
+
+
+def _decimal_to_str(value):
+    # Decimal은 정밀도 손실 없이 문자열로 변환
+    return None if value is None else str(value)
+
+
+def _decode(value):
+    return value.decode('utf-8', errors='ignore') if value.__class__ is bytes else value
+
+
+def _convert_value(value):
+    """Per-cell fallback for column types without a dedicated converter (the original loop body)."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    return value
+
+
+# None means the driver value is already JSON-serializable and is passed through as-is
+_NUMERIC_TYPES = {1, 2, 3, 4, 5, 6, 8, 9, 13}
+_TEXT_TYPES = {15, 16, 245, 247, 248, 249, 250, 251, 252, 253, 254, 255}
+_TYPE_CONVERTERS: Dict[int, Callable[[Any], Any]] = {
+    7: _to_iso, 10: _to_iso, 12: _to_iso, 14: _to_iso,
+    11: _format_time,
+    0: _decimal_to_str, 246: _decimal_to_str,
+}
+
+
+def compile_converters(description, sample_rows: Sequence[Sequence[Any]] = ()) -> List[Optional[Callable[[Any], Any]]]:
+    """
+    Builds one converter per column from cursor.description, once per result set.
+    Text/blob columns are sampled: if the driver already returned str, no conversion is needed.
+    """
+    plan: List[Optional[Callable[[Any], Any]]] = []
+    for i, col in enumerate(description or ()):
+        type_code = col[1]
+        if type_code in _NUMERIC_TYPES:
+            plan.append(None)
+        elif type_code in _TYPE_CONVERTERS:
+            plan.append(_TYPE_CONVERTERS[type_code])
+        elif type_code in _TEXT_TYPES:
+            sample = next((row[i] for row in sample_rows if row[i] is not None), None)
+            plan.append(None if isinstance(sample, str) else _decode)
+        else:
+            plan.append(_convert_value)
+    return plan
+
+
+def apply_converters(plan: Sequence[Optional[Callable[[Any], Any]]], rows: Sequence[Sequence[Any]]) -> List[Sequence[Any]]:
+    """Applies a compiled converter plan column by column and returns positional rows."""
+    rows = rows if isinstance(rows, list) else list(rows)
+    if not rows or not any(plan):
+        return rows
+    columns = list(zip(*rows))
+    for i, convert in enumerate(plan):
+        if convert is not None and i < len(columns):
+            columns[i] = list(map(convert, columns[i]))
+    return list(zip(*columns))
+
+
+def estimate_json_bytes(rows: Sequence[Sequence[Any]], row_overhead: int = 0, sample_size: int = 64) -> int:
+    """Approximate JSON size of rows, extrapolated from a sample, plus row_overhead bytes per row."""
+    if not rows:
+        return 0
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step][:sample_size]
+    sample_bytes = len(json.dumps(sample, ensure_ascii=False, default=str).encode("utf-8"))
+    return int(sample_bytes / len(sample) * len(rows)) + row_overhead * len(rows)
+
+
+class ResultSet:
+    """A query result kept in positional form until it is shaped for a response."""
+    __slots__ = ("columns", "types", "rows", "truncation")
+
+    def __init__(self, columns: List[str], types: List[str], rows: List[Sequence[Any]],
+                 truncation: Optional[Dict[str, Any]] = None):
+        self.columns = columns
+        self.types = types
+        self.rows = rows
+        # 행/바이트 예산으로 잘린 경우의 메타데이터 (truncated, limit_reason, total_rows ...)
+        self.truncation = truncation
+
+    @classmethod
+    def from_cursor(cls, cursor, rows: Sequence[Sequence[Any]]) -> "ResultSet":
+        plan = compile_converters(cursor.description, rows)
+        return cls(column_names(cursor), column_types(cursor), apply_converters(plan, rows))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def header_bytes(self) -> int:
+        return len(json.dumps(self.columns, ensure_ascii=False))
+
+    def estimated_bytes(self, sample_size: int = 64) -> int:
+        """Approximate JSON payload size, extrapolated from a sample of rows."""
+        header = self.header_bytes()
+        # dict 형태는 행마다 컬럼명이 반복되므로 그 비용도 포함
+        return header + estimate_json_bytes(self.rows, row_overhead=header, sample_size=sample_size)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+    def to_columnar(self) -> Dict[str, Any]:
+        return {"columns": self.columns, "types": self.types, "rows": self.rows}
+
+    def to_ndjson(self) -> str:
+        """One header line with columns/types, then one compact JSON array per row."""
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+        lines = [dumps({"columns": self.columns, "types": self.types})]
+        lines.extend(dumps(row) for row in self.rows)
+        return "\n".join(lines)
+
+    def format(self, output_format: str, metadata: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Shapes the result; a truncated result (or one with extra metadata such as a cost warning)
+        is wrapped in an envelope carrying that metadata.
+        """
+        if output_format == "columnar":
+            body = self.to_columnar()
+        elif output_format == "ndjson":
+            body = self.to_ndjson()
+        else:
+            body = self.to_dicts()
+        envelope = {**(self.truncation or {}), **(metadata or {})}
+        if not envelope:
+            return body
+        if output_format == "columnar":
+            return {**body, **envelope}
+        return {output_format: body, **envelope}
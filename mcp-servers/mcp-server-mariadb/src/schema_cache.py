@@ -0,0 +1,296 @@
+# schema_cache.py
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import logger
+
+# 테이블 목록 값: {table_name: [CREATE_TIME, UPDATE_TIME]}
+TableListing = Dict[str, List[Optional[str]]]
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "version", "loaded_at")
+
+    def __init__(self, value: Any, fetched_at: float, version: Any = None, loaded_at: Optional[float] = None):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.version = version
+        # 값을 DB에서 실제로 읽은 시각 (wall clock, 스냅샷에 저장) — 재검증으로는 바뀌지 않음
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+
+
+class SchemaCache:
+    """
+    Metadata cache for database lists, table lists and table schemas.
+
+    - Fresh entries (younger than ttl) are served directly; stale ones are served while a
+      background refresh runs (stale-while-revalidate). Past max_stale seconds (0 = no bound)
+      the caller waits for a fresh fetch instead, and its error is raised if the fetch fails.
+    - Table schemas are versioned by the table's CREATE_TIME, so a stale schema is revalidated
+      from the (cheap, per-database) table listing instead of running DESCRIBE again. In-place and
+      INSTANT ALTER TABLE keep CREATE_TIME, so a schema older than max_age is always read again.
+    - Lookups of missing databases/tables are remembered for negative_ttl seconds.
+    - Contents are persisted to a JSON snapshot so a restarted server can answer immediately.
+    """
+    def __init__(self, ttl: float, negative_ttl: float, snapshot_path: Optional[str], server_id: str,
+                 enabled: bool = True, snapshot_interval: float = 5.0, max_age: float = 600.0,
+                 max_stale: float = 600.0):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self.negative_ttl = negative_ttl
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.snapshot_interval = snapshot_interval
+        self.server_id = server_id
+        self._databases: Optional[_Entry] = None
+        self._tables: Dict[str, _Entry] = {}
+        self._schemas: Dict[Tuple[str, str], _Entry] = {}
+        self._negative: Dict[Tuple[str, ...], float] = {}
+        self._refreshing: Dict[Tuple, asyncio.Task] = {}
+        self._save_task: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.stats = {"hits": 0, "stale_hits": 0, "too_stale": 0, "misses": 0, "revalidated": 0, "expired": 0,
+                      "negative_hits": 0, "refresh_errors": 0}
+
+    # --- Lookups ---
+    async def get_databases(self, fetch: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        if not self.enabled:
+            return await fetch()
+        entry = self._databases
+        if entry is not None and self._serve(entry, ("databases",), lambda: self._refresh_databases(fetch)):
+            return entry.value
+        entry = await self._refresh_databases(fetch)
+        return entry.value
+
+    async def get_tables(self, database: str, fetch: Callable[[str], Awaitable[TableListing]]) -> TableListing:
+        if not self.enabled:
+            return await fetch(database)
+        entry = self._tables.get(database)
+        if entry is not None and self._serve(entry, ("tables", database), lambda: self._refresh_tables(database, fetch)):
+            return entry.value
+        entry = await self._refresh_tables(database, fetch)
+        return entry.value
+
+    async def get_table_schema(self, database: str, table: str,
+                               fetch_tables: Callable[[str], Awaitable[TableListing]],
+                               fetch_schema: Callable[[str, str], Awaitable[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Returns the cached schema, or None if the table does not exist."""
+        if not self.enabled:
+            return await fetch_schema(database, table)
+        key = (database, table)
+        entry = self._schemas.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry.fetched_at < self.ttl:
+            self.stats["hits"] += 1
+            return entry.value
+
+        version = await self.table_version(database, table, fetch_tables)
+        if version is None:
+            self._schemas.pop(key, None)
+            return None
+        if entry is not None and entry.version == version:
+            if time.time() - entry.loaded_at < self.max_age:
+                # CREATE_TIME이 그대로면 스키마도 그대로 — DESCRIBE 생략
+                entry.fetched_at = now
+                self.stats["revalidated"] += 1
+                return entry.value
+            # CREATE_TIME을 바꾸지 않는 ALTER(INSTANT/INPLACE)가 있었을 수 있으므로 상한이 지나면 다시 읽음
+            self.stats["expired"] += 1
+
+        self.stats["misses"] += 1
+        schema = await fetch_schema(database, table)
+        self._schemas[key] = _Entry(schema, time.monotonic(), version)
+        self._mark_dirty()
+        return schema
+
+    async def database_exists(self, database: str, fetch: Callable[[], Awaitable[List[str]]]) -> bool:
+        if self._is_negative(("db", database)):
+            return False
+        if database in await self.get_databases(fetch):
+            return True
+        if self.enabled and self._databases is not None and time.monotonic() - self._databases.fetched_at >= self.negative_ttl:
+            # 목록이 오래되었으면 한 번 새로 읽어서 확인
+            await self._refresh_databases(fetch)
+            if database in self._databases.value:
+                return True
+        self._remember_negative(("db", database))
+        return False
+
+    async def table_version(self, database: str, table: str,
+                            fetch_tables: Callable[[str], Awaitable[TableListing]]) -> Optional[Any]:
+        """CREATE_TIME of the table (its schema version), or None if it does not exist."""
+        if self._is_negative(("table", database, table)):
+            return None
+        tables = await self.get_tables(database, fetch_tables)
+        if table not in tables and self.enabled:
+            entry = self._tables.get(database)
+            if entry is not None and time.monotonic() - entry.fetched_at >= self.negative_ttl:
+                tables = (await self._refresh_tables(database, fetch_tables)).value
+        if table not in tables:
+            self._remember_negative(("table", database, table))
+            return None
+        return tables[table][0]
+
+    # --- Invalidation ---
+    def invalidate(self, database: Optional[str] = None) -> None:
+        """Drops database/table listings (all, or one database) and negative entries. Schemas stay versioned."""
+        self._negative.clear()
+        self._databases = None
+        if database is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(database, None)
+
+    # --- Internals ---
+    def _serve(self, entry: _Entry, refresh_key: Tuple, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        age = time.monotonic() - entry.fetched_at
+        if age < self.ttl:
+            self.stats["hits"] += 1
+            return True
+        if self.max_stale and age >= self.max_stale:
+            # 너무 오래된 값은 돌려주지 않음 — 호출자가 새로 읽을 때까지 기다림 (실패하면 오류)
+            self.stats["too_stale"] += 1
+            return False
+        # 오래된 값을 먼저 돌려주고 백그라운드에서 갱신
+        self.stats["stale_hits"] += 1
+        if refresh_key not in self._refreshing:
+            task = asyncio.get_running_loop().create_task(self._background_refresh(refresh_key, refresh))
+            self._refreshing[refresh_key] = task
+        return True
+
+    async def _background_refresh(self, refresh_key: Tuple, refresh: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await refresh()
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"⚠️ 스키마 캐시 백그라운드 갱신 실패 {refresh_key}: {e}")
+        finally:
+            self._refreshing.pop(refresh_key, None)
+
+    async def _refresh_databases(self, fetch) -> _Entry:
+        self.stats["misses"] += 1
+        self._databases = _Entry(list(await fetch()), time.monotonic())
+        self._mark_dirty()
+        return self._databases
+
+    async def _refresh_tables(self, database: str, fetch) -> _Entry:
+        self.stats["misses"] += 1
+        listing = await fetch(database)
+        entry = _Entry(listing, time.monotonic())
+        self._tables[database] = entry
+        # 삭제되었거나 CREATE_TIME이 바뀐 테이블의 스키마만 폐기 (증분 갱신)
+        for (db, table) in [k for k in self._schemas if k[0] == database]:
+            version = listing.get(table)
+            if version is None or version[0] != self._schemas[(db, table)].version:
+                del self._schemas[(db, table)]
+        self._mark_dirty()
+        return entry
+
+    def _is_negative(self, key: Tuple[str, ...]) -> bool:
+        expires_at = self._negative.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._negative[key]
+            return False
+        self.stats["negative_hits"] += 1
+        return True
+
+    def _remember_negative(self, key: Tuple[str, ...]) -> None:
+        if self.enabled:
+            self._negative[key] = time.monotonic() + self.negative_ttl
+
+    # --- Snapshot persistence ---
+    def _mark_dirty(self) -> None:
+        if self.snapshot_path is None:
+            return
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        await asyncio.sleep(self.snapshot_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Writes the snapshot file if anything changed since the last write."""
+        if self.snapshot_path is None or not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write_snapshot, self._snapshot_data())
+        except Exception as e:
+            logger.warning(f"⚠️ 스키마 스냅샷 저장 실패 ({self.snapshot_path}): {e}")
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        schemas: Dict[str, Dict[str, Any]] = {}
+        for (db, table), entry in self._schemas.items():
+            schemas.setdefault(db, {})[table] = {"version": entry.version, "schema": entry.value,
+                                                 "loaded_at": entry.loaded_at}
+        return {
+            "server": self.server_id,
+            "saved_at": time.time(),
+            "databases": self._databases.value if self._databases else None,
+            "tables": {db: entry.value for db, entry in self._tables.items()},
+            "schemas": schemas,
+        }
+
+    def _write_snapshot(self, data: Dict[str, Any]) -> None:
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(self.snapshot_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def load_snapshot(self) -> bool:
+        """Loads a previous snapshot. Loaded entries are stale, so they are revalidated on first use."""
+        if not self.enabled or self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ 스키마 스냅샷 로드 실패 ({self.snapshot_path}): {e}")
+            return False
+        if data.get("server") != self.server_id:
+            logger.info(f"ℹ️ 스키마 스냅샷이 다른 서버({data.get('server')})의 것이어서 무시합니다.")
+            return False
+        # 스냅샷 저장 이후 경과 시간을 나이로 복원 (최소 ttl → 즉시 stale 상태로 취급되어 첫 조회 때 갱신)
+        # max_stale보다 오래된 스냅샷은 첫 조회 때 DB에서 새로 읽음
+        fetched_at = time.monotonic() - max(self.ttl, time.time() - float(data.get("saved_at") or 0.0))
+        if data.get("databases") is not None:
+            self._databases = _Entry(data["databases"], fetched_at)
+        for db, listing in (data.get("tables") or {}).items():
+            self._tables[db] = _Entry(listing, fetched_at)
+        for db, tables in (data.get("schemas") or {}).items():
+            for table, item in tables.items():
+                self._schemas[(db, table)] = _Entry(item["schema"], fetched_at, item.get("version"), item.get("loaded_at", 0.0))
+        logger.info(f"✅ 스키마 스냅샷 로드 완료: 데이터베이스 목록 {'있음' if self._databases else '없음'}, "
+                    f"테이블 목록 {len(self._tables)}개, 스키마 {len(self._schemas)}개")
+        return True
+
+    async def close(self) -> None:
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+        await self.flush()
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "max_age_seconds": self.max_age,
+            "max_stale_seconds": self.max_stale,
+            "databases_cached": self._databases is not None,
+            "table_listings": len(self._tables),
+            "schemas": len(self._schemas),
+            "negative_entries": len(self._negative),
+        }
@@ -4,27 +4,95 @@ import logging
 import argparse
 import sys
 import json
-from typing import List, Dict, Any, Optional
-from functools import partial
+import re
+import socket
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple, Union
+from functools import partial, wraps
 
-import aiomysql
 import anyio
+import uvicorn
 from fastmcp import FastMCP, Context
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
 
 # Import configuration settings
 from config import (
-    DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME,
-    MCP_READ_ONLY, MCP_MAX_POOL_SIZE, EMBEDDING_PROVIDER,
-    logger
+    DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_DRIVER,
+    DB_REPLICA_HOSTS, MCP_REPLICA_MAX_LAG, MCP_REPLICA_POLL_INTERVAL, MCP_REPLICA_ALLOW_UNREPLICATED,
+    MCP_READ_ONLY, MCP_MAX_POOL_SIZE, MCP_STATEMENT_TIMEOUT, EMBEDDING_PROVIDER, HF_PRELOAD_MODELS,
+    MCP_POOL_WARM_SIZE, MCP_POOL_MAX_CONN_AGE, MCP_POOL_PING_AFTER_IDLE,
+    MCP_BATCH_MAX_ITEMS, MCP_BATCH_CONCURRENCY,
+    MCP_MAX_RESULT_ROWS, MCP_MAX_RESULT_BYTES, MCP_TRUNCATION_COUNT_SECONDS,
+    MCP_ADMISSION_ENABLED, MCP_METADATA_LANE_SIZE, MCP_QUERY_TARGET_LATENCY_MS, MCP_METADATA_TARGET_LATENCY_MS,
+    MCP_ADMISSION_MAX_QUEUE, MCP_ADMISSION_MAX_WAIT,
+    MCP_STREAM_PAGE_SIZE, MCP_STREAM_MAX_PAGE_SIZE, MCP_STREAM_IDLE_TIMEOUT, MCP_MAX_OPEN_STREAMS,
+    MCP_QUERY_CACHE_ENABLED, MCP_QUERY_CACHE_TTL, MCP_QUERY_CACHE_MAX_BYTES, MCP_QUERY_CACHE_VALIDATE_INTERVAL,
+    MCP_SCHEMA_CACHE_ENABLED, MCP_SCHEMA_CACHE_TTL, MCP_SCHEMA_CACHE_NEGATIVE_TTL, MCP_SCHEMA_CACHE_MAX_AGE,
+    MCP_SCHEMA_CACHE_MAX_STALE, MCP_SCHEMA_SNAPSHOT_PATH,
+    MCP_QUERY_STATS_MAX_ENTRIES, MCP_QUERY_STATS_SAMPLE_SIZE,
+    MCP_COST_GUARD_MODE, MCP_COST_GUARD_MAX_ROWS, MCP_COST_GUARD_PLAN_TTL, MCP_COST_GUARD_PLAN_CACHE_SIZE,
+    MCP_METRICS_ENABLED, MCP_METRICS_PATH,
+    MCP_TRACE_SAMPLE_RATE, MCP_TRACE_BUFFER_SIZE, MCP_TRACE_FILE,
+    MCP_STARTUP_DIAGNOSTICS,
+    MCP_WORKERS, MCP_CONNECTION_BUDGET, MCP_WORKER_HEALTH_INTERVAL, MCP_WORKER_MAX_FAST_FAILURES,
+    MCP_UVLOOP, MCP_HEALTH_PATH,
+    logger, query_logger
 )
 
-# Import EmbeddingService for vector store creation
+from admission import AdaptiveLane, AdmissionController, OverloadedError
+from db_driver import DatabaseDriver, get_driver
+from pool_monitor import PoolMonitor
+from replicas import ReplicaRouter, parse_replica_hosts
+from streams import ResultStream, StreamRegistry
+from query_cache import QueryResultCache, is_cacheable, referenced_tables
+from schema_cache import SchemaCache, TableListing
+from query_stats import QueryStats, STATS_ORDER_KEYS
+from cost_guard import CostGuard
+from tracing import Tracer, add_span, span
+from workers import WorkerHealth, resolve_uvloop, run_workers
+from metrics import (
+    METRICS, OPENMETRICS_CONTENT_TYPE, POOL_ACQUIRE_WAIT, RESULT_ROWS, RESULT_BYTES, instrumented, merge_families,
+)
+from result_format import (
+    ResultSet, DEFAULT_OUTPUT_FORMAT, validate_output_format,
+    column_names, column_types, compile_converters, apply_converters, estimate_json_bytes,
+)
+
+# Import EmbeddingService for vector store creation (provider SDKs are imported on first use)
 from embeddings import EmbeddingService
 
-# Singleton instance for embedding service
-embedding_service = None
-if EMBEDDING_PROVIDER is not None:
-    embedding_service = EmbeddingService()
+# Singleton instance for embedding service, created on first use so that startup does not
+# pay for provider clients or model loading
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = asyncio.Lock()
+
+
+async def get_embedding_service() -> Optional[EmbeddingService]:
+    """Returns the shared EmbeddingService, or None when EMBEDDING_PROVIDER is not set."""
+    global _embedding_service
+    if _embedding_service is None and EMBEDDING_PROVIDER is not None:
+        async with _embedding_service_lock:
+            if _embedding_service is None:
+                # 생성자가 SentenceTransformer(HF_MODEL)를 동기적으로 로드하므로 이벤트 루프 밖에서 생성
+                _embedding_service = await asyncio.to_thread(EmbeddingService)
+    return _embedding_service
+
+# 데이터를 변경하지 않는 문장 (쿼리 캐시 무효화 판단용)
+READ_STATEMENT_PREFIXES = ('SELECT', 'SHOW', 'DESC', 'DESCRIBE', 'USE', 'EXPLAIN')
+# 복제본으로 보내면 안 되는 읽기 (잠금 읽기, 결과를 변수/파일로 쓰는 SELECT)
+_PRIMARY_ONLY_READ_RE = re.compile(r"\bFOR\s+UPDATE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b")
+# max_statement_time(SET STATEMENT ... FOR)을 적용할 문장
+TIMED_STATEMENT_PREFIXES = ('SELECT', 'WITH')
+# 서버 측 max_statement_time이 먼저 동작하도록 클라이언트 측 상한에 두는 여유 (초)
+STATEMENT_TIMEOUT_GRACE = 2.0
+# 행/바이트 예산이 있을 때 fetchmany로 한 번에 읽는 행 수
+RESULT_FETCH_CHUNK_ROWS = 1000
+# MariaDB ER_STATEMENT_TIMEOUT (max_statement_time 초과)
+ER_STATEMENT_TIMEOUT = 1969
 
 # --- MariaDB MCP Server Class ---
 class MariaDBServer:
@@ -32,17 +100,93 @@ class MariaDBServer:
     MCP Server exposing tools to interact with a MariaDB database.
     Manages the database connection pool.
     """
-    def __init__(self, server_name="MariaDB_Server", autocommit=True):
+    def __init__(self, server_name="MariaDB_Server", autocommit=True, driver: Optional[DatabaseDriver] = None):
         self.mcp = FastMCP(server_name)
-        self.pool: Optional[aiomysql.Pool] = None
+        # 풀/커서 생성은 드라이버 구현(aiomysql 또는 asyncmy)에 위임
+        self.driver = driver or get_driver(DB_DRIVER)
+        self.pool = None
+        # 백그라운드 풀 생성 태스크 (도구 호출은 _wait_for_pool에서 완료를 기다림)
+        self._pool_task: Optional[asyncio.Task] = None
+        self._background_tasks: set = set()
+        # 연결 수명/유휴 시간 추적 및 획득 지연 통계
+        self.pool_monitor = PoolMonitor(max_age=MCP_POOL_MAX_CONN_AGE, ping_after_idle=MCP_POOL_PING_AFTER_IDLE)
+        # 읽기 전용 문장을 보낼 복제본 (DB_REPLICA_HOSTS가 비어 있으면 모두 primary 사용)
+        self.replicas = ReplicaRouter(
+            self.driver,
+            parse_replica_hosts(DB_REPLICA_HOSTS, DB_PORT),
+            max_lag=MCP_REPLICA_MAX_LAG,
+            poll_interval=MCP_REPLICA_POLL_INTERVAL,
+            allow_unreplicated=MCP_REPLICA_ALLOW_UNREPLICATED,
+            pool_options=dict(user=DB_USER, password=DB_PASSWORD, database=DB_NAME, minsize=1,
+                              maxsize=MCP_MAX_POOL_SIZE, autocommit=autocommit, charset='utf8mb4'),
+        )
         self.autocommit = autocommit
         self.is_read_only = MCP_READ_ONLY
+        # 풀 연결별 현재 스키마 추적 (SELECT DATABASE() 왕복 제거용)
+        self._conn_databases: "weakref.WeakKeyDictionary[Any, Optional[str]]" = weakref.WeakKeyDictionary()
+        self.db_context_stats: Dict[str, int] = {
+            "round_trips_saved": 0,
+            "use_statements_issued": 0,
+            "use_statements_skipped": 0,
+        }
+        # READ-ONLY 모드에서 반복되는 execute_sql 결과 캐시
+        self.query_cache: Optional[QueryResultCache] = None
+        if MCP_QUERY_CACHE_ENABLED and self.is_read_only:
+            self.query_cache = QueryResultCache(
+                ttl=MCP_QUERY_CACHE_TTL,
+                max_bytes=MCP_QUERY_CACHE_MAX_BYTES,
+                validate_interval=MCP_QUERY_CACHE_VALIDATE_INTERVAL,
+            )
+        # 스키마 메타데이터 캐시 (재시작 시 스냅샷 파일에서 복원)
+        self.schema_cache = SchemaCache(
+            ttl=MCP_SCHEMA_CACHE_TTL,
+            negative_ttl=MCP_SCHEMA_CACHE_NEGATIVE_TTL,
+            max_age=MCP_SCHEMA_CACHE_MAX_AGE,
+            max_stale=MCP_SCHEMA_CACHE_MAX_STALE,
+            snapshot_path=MCP_SCHEMA_SNAPSHOT_PATH or None,
+            server_id=f"{DB_USER}@{DB_HOST}:{DB_PORT}",
+            enabled=MCP_SCHEMA_CACHE_ENABLED,
+        )
+        self.schema_cache.load_snapshot()
+        # 문장 시간 제한/취소 관련 카운터
+        self.cancellation_stats: Dict[str, int] = {
+            "statement_timeouts": 0,
+            "cancelled": 0,
+            "kill_query_sent": 0,
+            "kill_query_failed": 0,
+        }
+        self._kill_tasks: set = set()
+        # 도구 호출 승인 제어: 메타데이터 도구용 예약 용량과 지연 기반(AIMD) 쿼리 한도
+        metadata_slots = min(MCP_METADATA_LANE_SIZE, max(1, MCP_MAX_POOL_SIZE - 1))
+        self.admission = AdmissionController({
+            "metadata": AdaptiveLane("metadata", min_limit=1, max_limit=metadata_slots,
+                                     target_latency=MCP_METADATA_TARGET_LATENCY_MS / 1000,
+                                     max_queue=MCP_ADMISSION_MAX_QUEUE, max_wait=MCP_ADMISSION_MAX_WAIT),
+            "query": AdaptiveLane("query", min_limit=1, max_limit=max(1, MCP_MAX_POOL_SIZE - metadata_slots),
+                                  target_latency=MCP_QUERY_TARGET_LATENCY_MS / 1000,
+                                  max_queue=MCP_ADMISSION_MAX_QUEUE, max_wait=MCP_ADMISSION_MAX_WAIT),
+        }, enabled=MCP_ADMISSION_ENABLED)
+        # execute_sql_stream으로 열린 서버 사이드 커서 (열려 있는 동안 연결을 쥐고 있으므로 query 레인 슬롯을 점유)
+        query_lane = self.admission.lanes["query"]
+        self.streams = StreamRegistry(idle_timeout=MCP_STREAM_IDLE_TIMEOUT, max_streams=MCP_MAX_OPEN_STREAMS,
+                                      on_open=query_lane.hold, on_close=query_lane.release_hold)
+        # 정규화된 문장(fingerprint)별 실행 통계
+        self.query_stats = QueryStats(max_entries=MCP_QUERY_STATS_MAX_ENTRIES, sample_size=MCP_QUERY_STATS_SAMPLE_SIZE)
+        # EXPLAIN 기반 사전 비용 검사 (fingerprint별 실행 계획 평가 캐시)
+        self.cost_guard = CostGuard(MCP_COST_GUARD_MODE, max_rows=MCP_COST_GUARD_MAX_ROWS,
+                                    cache_ttl=MCP_COST_GUARD_PLAN_TTL, max_entries=MCP_COST_GUARD_PLAN_CACHE_SIZE)
+        self._register_gauges()
+        # 도구 호출 단계별 타이밍 트레이스 (샘플링, 링 버퍼 + 선택적 JSONL 파일)
+        self.tracer = Tracer(MCP_TRACE_SAMPLE_RATE, MCP_TRACE_BUFFER_SIZE, MCP_TRACE_FILE)
+        # 다중 워커 모드에서 workers.py가 설정 (워커별 상태 파일과 전체 워커 수)
+        self.worker_health: Optional[WorkerHealth] = None
+        self.expected_workers = 1
         logger.info(f"🔧 {server_name} 초기화 중...")
         if self.is_read_only:
             logger.warning("⚠️ 서버가 READ-ONLY 모드로 실행됩니다. 쓰기 작업이 비활성화되었습니다.")
 
     async def initialize_pool(self):
-        """Initializes the aiomysql connection pool within the running event loop."""
+        """Initializes the connection pool of the selected driver within the running event loop."""
         if not all([DB_USER, DB_PASSWORD]):
              logger.error("❌ 데이터베이스 자격 증명이 누락되어 풀을 초기화할 수 없습니다.")
              raise ConnectionError("Missing database credentials for pool initialization.")
@@ -52,29 +196,79 @@ class MariaDBServer:
             return
 
         try:
-            logger.info(f"🔗 연결 풀 생성 중: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME} (최대 크기: {MCP_MAX_POOL_SIZE})")
-            self.pool = await aiomysql.create_pool(
+            logger.info(f"🔗 연결 풀 생성 중: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME} "
+                        f"(예열: {MCP_POOL_WARM_SIZE}, 최대 크기: {MCP_MAX_POOL_SIZE}, 드라이버: {self.driver.name})")
+            self.pool = await self.driver.create_pool(
                 host=DB_HOST,
                 port=DB_PORT,
                 user=DB_USER,
                 password=DB_PASSWORD,
-                db=DB_NAME,
-                minsize=1,
+                database=DB_NAME,
+                # minsize만큼의 연결을 풀 생성 시점에 미리 열어 둠 (예열)
+                minsize=max(1, MCP_POOL_WARM_SIZE),
                 maxsize=MCP_MAX_POOL_SIZE,
                 autocommit=self.autocommit,
                 charset='utf8mb4'
             )
-            logger.info("✅ 데이터베이스 연결 풀이 성공적으로 초기화되었습니다.")
+            self.pool_monitor.stats["warmed"] = self.pool.size
+            logger.info(f"✅ 데이터베이스 연결 풀이 성공적으로 초기화되었습니다. (열린 연결: {self.pool.size}개)")
+            # 복제본 풀 생성 및 지연 폴링 시작 (실패한 복제본은 다음 폴링에서 재시도)
+            await self.replicas.start()
         except Exception as e:
             logger.error(f"❌ 데이터베이스 연결 풀 초기화 실패: {e}", exc_info=True)
             self.pool = None
             raise
 
+    def start_pool(self) -> asyncio.Task:
+        """
+        Starts creating the pool in the background so the MCP server can answer initialize/list_tools
+        while connections are being warmed. A failed attempt is retried by the next tool call.
+        """
+        if self._pool_task is None or (self._pool_task.done() and self.pool is None):
+            self._pool_task = asyncio.get_running_loop().create_task(self.initialize_pool())
+            self._pool_task.add_done_callback(self._on_pool_started)
+        return self._pool_task
+
+    @staticmethod
+    def _on_pool_started(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # initialize_pool이 상세 오류를 이미 기록함; 다음 도구 호출에서 재시도
+            logger.critical(f"💥 백그라운드 연결 풀 생성 실패 (다음 요청 시 재시도): {task.exception()}")
+
+    async def _wait_for_pool(self) -> None:
+        """Waits for the background pool creation; raises if the pool cannot be created."""
+        if self.pool is not None:
+            return
+        if self._pool_task is None:
+            logger.error("❌ 연결 풀이 초기화되지 않았습니다.")
+            raise RuntimeError("Database connection pool not available.")
+        task = self.start_pool()
+        try:
+            # 호출이 취소되어도 다른 요청이 기다리는 풀 생성은 계속되도록 shield
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Database connection pool not available: {e}") from e
+        if self.pool is None:
+            raise RuntimeError("Database connection pool not available.")
+
     async def close_pool(self):
         """Closes the connection pool gracefully."""
+        for task in [self._pool_task, *self._background_tasks]:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except BaseException:
+                    pass
         if self.pool:
-            logger.info("🔚 데이터베이스 연결 풀 종료 중...")
+            logger.info(f"🔚 데이터베이스 연결 풀 종료 중... (DB 컨텍스트 통계: {self.db_context_stats}, "
+                        f"취소 통계: {self.cancellation_stats})")
             try:
+                await self.streams.close_all()
+                await self.schema_cache.close()
+                await self.replicas.close()
                 self.pool.close()
                 await self.pool.wait_closed()
                 logger.info("✅ 데이터베이스 연결 풀이 종료되었습니다.")
@@ -82,13 +276,165 @@ class MariaDBServer:
                 logger.error(f"❌ 연결 풀 종료 중 오류: {e}", exc_info=True)
             finally:
                 self.pool = None
+                self._conn_databases.clear()
 
-    async def _execute_query(self, sql: str, params: Optional[tuple] = None, database: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Helper function to execute SELECT queries using the pool."""
+    async def _acquire_connection(self, pool=None):
+        """
+        Acquires a pooled connection. Connections older than MCP_POOL_MAX_CONN_AGE are replaced, and ones idle
+        longer than MCP_POOL_PING_AFTER_IDLE are pinged first so a connection dropped by wait_timeout is never used.
+        """
+        monitor = self.pool_monitor
+        started = time.perf_counter()
+        monitor.waiting += 1
+        try:
+            # 풀 전체가 끊어진 경우에도 새 연결로 채워질 때까지만 재시도
+            for _ in range(MCP_MAX_POOL_SIZE + 1):
+                conn = await (pool or self.pool).acquire()
+                now = time.monotonic()
+                try:
+                    if monitor.needs_recycle(conn, now):
+                        monitor.stats["recycled_age"] += 1
+                        await self._discard_connection(conn, pool)
+                        continue
+                    if monitor.needs_ping(conn, now):
+                        monitor.stats["pings"] += 1
+                        try:
+                            await conn.ping(reconnect=False)
+                        except Exception as e:
+                            monitor.stats["ping_failures"] += 1
+                            monitor.stats["recycled_dead"] += 1
+                            logger.info(f"♻️ 끊어진 유휴 연결 교체: {e}")
+                            await self._discard_connection(conn, pool)
+                            continue
+                except BaseException:
+                    await self._discard_connection(conn, pool)
+                    raise
+                elapsed = time.perf_counter() - started
+                monitor.record_acquire(elapsed * 1000)
+                POOL_ACQUIRE_WAIT.observe(elapsed)
+                return conn
+            raise RuntimeError("Could not obtain a live database connection from the pool.")
+        finally:
+            monitor.waiting -= 1
+
+    async def _release_connection(self, conn, pool=None) -> None:
+        self.pool_monitor.mark_released(conn)
+        await (pool or self.pool).release(conn)
+
+    async def _discard_connection(self, conn, pool=None) -> None:
+        """Closes a connection and hands it back so the pool replaces it."""
+        conn.close()
+        self.pool_monitor.forget(conn)
+        self._conn_databases.pop(conn, None)
+        await (pool or self.pool).release(conn)
+
+    @staticmethod
+    def _is_replica_read(query_upper: str) -> bool:
+        """Statements that may be served by a read replica."""
+        return (query_upper.startswith(READ_STATEMENT_PREFIXES) and not query_upper.startswith('USE')
+                and _PRIMARY_ONLY_READ_RE.search(query_upper) is None)
+
+    async def _acquire_routed(self, read: bool):
+        """
+        Acquires a connection from the least-loaded healthy replica for reads, otherwise from the primary.
+        Returns (conn, pool). A replica that fails to hand out a connection is taken out of rotation.
+        """
+        started = time.perf_counter()
+        await self._wait_for_pool()
+        replica = self.replicas.pick() if read and self.replicas else None
+        if replica is not None:
+            replica.acquiring += 1
+            try:
+                conn = await self._acquire_connection(replica.pool)
+                replica.routed += 1
+                add_span("acquire", started, replica=replica.name)
+                return conn, replica.pool
+            except Exception as e:
+                self.replicas.mark_failed(replica, e)
+            finally:
+                replica.acquiring -= 1
+        conn = await self._acquire_connection()
+        add_span("acquire", started)
+        return conn, self.pool
+
+    @asynccontextmanager
+    async def _connection(self, read: bool = False):
+        conn, pool = await self._acquire_routed(read)
+        try:
+            yield conn
+        finally:
+            await self._release_connection(conn, pool)
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Pool size, free connections, waiters, acquire latency histogram and recycle counters."""
         if self.pool is None:
-            logger.error("❌ 연결 풀이 초기화되지 않았습니다.")
-            raise RuntimeError("Database connection pool not available.")
+            return {"initialized": False}
+        size, free = self.pool.size, self.pool.freesize
+        return {
+            "initialized": True,
+            "driver": self.driver.name,
+            "size": size,
+            "free": free,
+            "in_use": size - free,
+            "minsize": self.pool.minsize,
+            "maxsize": self.pool.maxsize,
+            "open_streams": len(self.streams),
+            **self.pool_monitor.snapshot(),
+            "db_context": self.get_db_context_stats(),
+            "cancellation": dict(self.cancellation_stats),
+            "replication": self.replicas.snapshot(),
+        }
+
+    def _register_gauges(self) -> None:
+        """Scrape-time gauges for pool, admission lanes and open streams."""
+        def pool_connections():
+            if self.pool is None:
+                return []
+            return [(("in_use",), self.pool.size - self.pool.freesize), (("free",), self.pool.freesize)]
+
+        METRICS.gauge("mcp_pool_connections", "Primary pool connections by state.", ("state",), pool_connections)
+        METRICS.gauge("mcp_pool_waiting", "Callers waiting for a pooled connection.", (),
+                      lambda: [((), self.pool_monitor.waiting)])
+        METRICS.gauge("mcp_admission_inflight", "Requests running in each admission lane.", ("lane",),
+                      lambda: [((name,), lane.inflight) for name, lane in self.admission.lanes.items()])
+        METRICS.gauge("mcp_admission_limit", "Current adaptive concurrency limit of each admission lane.", ("lane",),
+                      lambda: [((name,), int(lane.limit)) for name, lane in self.admission.lanes.items()])
+        METRICS.gauge("mcp_open_streams", "Open execute_sql_stream cursors.", (), lambda: [((), len(self.streams))])
+
+    @staticmethod
+    def _observe_result(tool: str, result: ResultSet) -> None:
+        """Records rows and approximate JSON bytes of a returned result."""
+        RESULT_ROWS.observe(len(result), tool=tool)
+        truncation = result.truncation or {}
+        RESULT_BYTES.observe(truncation.get("returned_bytes_approx") or estimate_json_bytes(result.rows), tool=tool)
+
+    def _tool(self, func):
+        """Registers an MCP tool with call count, latency and error metrics."""
+        return self.mcp.tool(instrumented(self.tracer.traced(func)))
 
+    async def _switch_database(self, conn, cursor, database: Optional[str]) -> None:
+        """Issues USE only when the connection's tracked schema differs from the requested one."""
+        # 새 연결은 풀 생성 시 지정한 DB_NAME으로 시작하므로 추적 정보가 없으면 DB_NAME으로 간주
+        current_db = self._conn_databases.get(conn, DB_NAME)
+        # 매 쿼리마다 실행하던 SELECT DATABASE() 왕복을 생략
+        self.db_context_stats["round_trips_saved"] += 1
+        if not database:
+            return
+        if database == current_db:
+            self.db_context_stats["use_statements_skipped"] += 1
+            return
+        query_logger.info("🔄 데이터베이스 컨텍스트 전환: '%s' -> '%s'", current_db, database)
+        with span("use", database=database):
+            await cursor.execute(f"USE `{database}`")
+        self.db_context_stats["use_statements_issued"] += 1
+        self._conn_databases[conn] = database
+
+    def get_db_context_stats(self) -> Dict[str, int]:
+        """Returns counters for database context switches and avoided round trips."""
+        return dict(self.db_context_stats)
+
+    def _check_read_only(self, sql: str) -> str:
+        """Rejects write statements in read-only mode. Returns the upper-cased statement."""
         # 허용된 쿼리 타입 확인 (READ-ONLY 모드용)
         allowed_prefixes = ('SELECT', 'SHOW', 'DESC', 'DESCRIBE', 'USE', 'CREATE', 'EXPLAIN')
         query_upper = sql.strip().upper()
@@ -97,65 +443,430 @@ class MariaDBServer:
         if self.is_read_only and not is_allowed_read_query:
              logger.warning(f"⚠️ READ-ONLY 모드에서 잠재적으로 쓰기 쿼리가 차단됨: {sql[:100]}...")
              raise PermissionError("Operation forbidden: Server is in read-only mode.")
+        return query_upper
+
+    def _statement_timeout(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Effective time budget in seconds: the per-call value capped by MCP_STATEMENT_TIMEOUT (None = unlimited)."""
+        budgets = [t for t in (timeout, MCP_STATEMENT_TIMEOUT) if t and t > 0]
+        return min(budgets) if budgets else None
+
+    @staticmethod
+    def _with_statement_timeout(sql: str, query_upper: str, timeout: Optional[float]) -> str:
+        """Prefixes SELECTs with SET STATEMENT max_statement_time so MariaDB aborts them itself."""
+        if not timeout or not query_upper.startswith(TIMED_STATEMENT_PREFIXES):
+            return sql
+        return f"SET STATEMENT max_statement_time={timeout:g} FOR {sql}"
+
+    async def _run_cancellable(self, conn, awaitable, timeout: Optional[float]) -> Any:
+        """
+        Awaits a statement (execute or fetch) under a client-side deadline. If the awaiting task is cancelled or
+        the deadline passes, the statement is killed on the server and the connection is discarded instead of reused.
+        """
+        budget = f"{timeout:g}s" if timeout else "max_statement_time"
+        try:
+            if timeout:
+                return await asyncio.wait_for(awaitable, timeout + STATEMENT_TIMEOUT_GRACE)
+            return await awaitable
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            self.cancellation_stats["statement_timeouts" if isinstance(e, asyncio.TimeoutError) else "cancelled"] += 1
+            await self._kill_query(conn)
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(f"Query exceeded the statement time budget ({budget}) and was cancelled.") from e
+            raise
+        except Exception as e:
+            if e.args and e.args[0] == ER_STATEMENT_TIMEOUT:
+                self.cancellation_stats["statement_timeouts"] += 1
+                raise TimeoutError(f"Query exceeded the statement time budget ({budget}) and was stopped by the server.") from e
+            raise
+
+    async def _kill_query(self, conn) -> None:
+        """Discards conn and stops its running statement with KILL QUERY on a separate connection."""
+        thread_id = self.driver.thread_id(conn)
+        # 응답을 읽다 중단된 연결은 프로토콜 상태를 알 수 없으므로 풀에 되돌리지 않고 닫음
+        conn.close()
+        self._conn_databases.pop(conn, None)
+        if thread_id is None:
+            return
+        # 연결이 실제로 붙어 있는 서버(primary 또는 복제본)로 보내야 함: 다른 서버의 같은 thread id를 죽이지 않도록
+        endpoint = self.driver.endpoint(conn)
+        if endpoint is None:
+            self.cancellation_stats["kill_query_failed"] += 1
+            logger.error(f"❌ KILL QUERY {thread_id} 생략: 연결의 서버 주소를 알 수 없습니다.")
+            return
+        # 호출한 태스크가 다시 취소되더라도 KILL은 끝까지 보내도록 별도 태스크로 실행
+        task = asyncio.get_running_loop().create_task(self._send_kill_query(thread_id, *endpoint))
+        self._kill_tasks.add(task)
+        task.add_done_callback(self._kill_tasks.discard)
+        await asyncio.shield(task)
+
+    async def _send_kill_query(self, thread_id: int, host: str, port: int) -> None:
+        # 풀이 고갈된 상황에서도 동작하도록 풀 밖의 단독 연결 사용
+        side_conn = None
+        try:
+            side_conn = await asyncio.wait_for(
+                self.driver.connect(host=host, port=port, user=DB_USER, password=DB_PASSWORD, database=None),
+                STATEMENT_TIMEOUT_GRACE * 2)
+            async with await self.driver.cursor(side_conn) as cursor:
+                await cursor.execute(f"KILL QUERY {int(thread_id)}")
+            self.cancellation_stats["kill_query_sent"] += 1
+            logger.warning(f"🛑 실행 중인 쿼리 중단 요청 전송: KILL QUERY {thread_id}")
+        except Exception as e:
+            self.cancellation_stats["kill_query_failed"] += 1
+            logger.error(f"❌ KILL QUERY {thread_id} 실패: {e}")
+        finally:
+            if side_conn is not None:
+                side_conn.close()
+
+    async def _execute_query(self, sql: str, params: Optional[tuple] = None, database: Optional[str] = None,
+                             internal: bool = False) -> List[Dict[str, Any]]:
+        """Helper function to execute SELECT queries using the pool."""
+        result = await self._execute_query_result(sql, params=params, database=database, internal=internal)
+        with span("to_dicts", rows=len(result)):
+            return result.to_dicts()
 
-        logger.info(f"🔍 쿼리 실행 중 (DB: {database or DB_NAME}): {sql[:100]}...")
+    def _result_budget(self, max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> Tuple[Optional[int], Optional[int]]:
+        """Effective (max_rows, max_bytes): per-call values capped by MCP_MAX_RESULT_ROWS / MCP_MAX_RESULT_BYTES."""
+        def effective(requested, global_limit):
+            limits = [v for v in (requested, global_limit) if v and v > 0]
+            return min(limits) if limits else None
+        return effective(max_rows, MCP_MAX_RESULT_ROWS), effective(max_bytes, MCP_MAX_RESULT_BYTES)
+
+    async def _fetch_within_budget(self, cursor, max_rows: Optional[int], max_bytes: Optional[int]) -> Tuple[ResultSet, bool]:
+        """
+        Reads an unbuffered result with fetchmany until it ends or a row/byte budget is reached.
+        Returns (result, fully_read); a partially read cursor means the connection must be discarded.
+        """
+        columns, types = column_names(cursor), column_types(cursor)
+        # dict 형태 응답 기준으로 행마다 반복되는 컬럼명 비용
+        row_overhead = len(json.dumps(columns, ensure_ascii=False))
+        chunk_size = min(RESULT_FETCH_CHUNK_ROWS, max_rows + 1) if max_rows else RESULT_FETCH_CHUNK_ROWS
+        rows: List[Any] = []
+        plan = None
+        size = 0
+        seen = 0
+        limit_reason = None
+        while True:
+            chunk = list(await cursor.fetchmany(chunk_size) or [])
+            if not chunk:
+                break
+            seen += len(chunk)
+            if plan is None:
+                plan = compile_converters(cursor.description, chunk)
+            chunk = apply_converters(plan, chunk)
+            if max_rows and len(rows) + len(chunk) > max_rows:
+                chunk = chunk[:max_rows - len(rows)]
+                limit_reason = "max_rows"
+            chunk_bytes = estimate_json_bytes(chunk, row_overhead, sample_size=16)
+            if max_bytes and size + chunk_bytes > max_bytes:
+                per_row = chunk_bytes / len(chunk)
+                fit = int((max_bytes - size) / per_row)
+                chunk, chunk_bytes = chunk[:fit], int(per_row * fit)
+                limit_reason = "max_bytes"
+            rows.extend(chunk)
+            size += chunk_bytes
+            if limit_reason:
+                break
+        if limit_reason is None:
+            return ResultSet(columns, types, rows), True
+
+        # 남은 행은 저장하지 않고 개수만 센다 (시간 상한 내에서) — 대략적인 전체 크기 보고용
+        total_rows = seen
+        deadline = time.monotonic() + MCP_TRUNCATION_COUNT_SECONDS
+        fully_read = False
+        while time.monotonic() < deadline:
+            more = await cursor.fetchmany(RESULT_FETCH_CHUNK_ROWS)
+            if not more:
+                fully_read = True
+                break
+            total_rows += len(more)
+        bytes_per_row = size / len(rows) if rows else row_overhead
+        truncation = {
+            "truncated": True,
+            "limit_reason": limit_reason,
+            "max_rows": max_rows,
+            "max_bytes": max_bytes,
+            "returned_rows": len(rows),
+            "returned_bytes_approx": size,
+            "total_rows": total_rows,
+            "total_rows_exact": fully_read,
+            "total_bytes_approx": int(bytes_per_row * total_rows),
+            "hint": "Result was truncated. Add WHERE filters, aggregate, select fewer columns, use LIMIT/OFFSET"
+                    + (" or page through it with execute_sql_stream." if self.worker_health is None else "."),
+        }
+        query_logger.info("✂️ 결과가 예산에 맞게 잘림 (%s): %s/%s%s행 반환",
+                          limit_reason, len(rows), total_rows, '' if fully_read else '+')
+        return ResultSet(columns, types, rows, truncation=truncation), fully_read
+
+    async def _execute_query_result(self, sql: str, params: Optional[tuple] = None, database: Optional[str] = None,
+                                    timeout: Optional[float] = None, max_rows: Optional[int] = None,
+                                    max_bytes: Optional[int] = None, internal: bool = False) -> ResultSet:
+        """
+        Executes a query within the statement time budget and returns the result in positional (column/row) form.
+        With max_rows/max_bytes the rows are fetched incrementally and the result is truncated at the budget.
+        internal=True marks the server's own metadata and validation queries, which are not counted in query_stats.
+        """
+        await self._wait_for_pool()
+
+        query_upper = self._check_read_only(sql)
+        timeout = self._statement_timeout(timeout)
+        budgeted = bool(max_rows or max_bytes)
+
+        query_logger.info("🔍 쿼리 실행 중 (DB: %s): %.100s...", database or DB_NAME, sql)
         if params:
-            logger.debug(f"📊 파라미터: {params}")
+            query_logger.debug("📊 파라미터: %s", params)
 
         conn = None
+        started = None
         try:
-            async with self.pool.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cursor:
-                    # 현재 데이터베이스 확인
-                    current_db_query = "SELECT DATABASE()"
-                    await cursor.execute(current_db_query)
-                    current_db_result = await cursor.fetchone()
-                    current_db_name = current_db_result.get('DATABASE()') if current_db_result else None
-                    pool_db_name = DB_NAME
-                    actual_current_db = current_db_name or pool_db_name
-
-                    # 필요한 경우 데이터베이스 전환
-                    if database and database != actual_current_db:
-                        logger.info(f"🔄 데이터베이스 컨텍스트 전환: '{actual_current_db}' -> '{database}'")
-                        await cursor.execute(f"USE `{database}`")
-
-                    # 실제 쿼리 실행
-                    await cursor.execute(sql, params or ())
-                    results = await cursor.fetchall()
-
-                    # 결과를 일반 딕셔너리로 변환 (JSON 직렬화 가능하도록)
-                    converted_results = []
-                    if results:
-                        for row in results:
-                            converted_row = {}
-                            for key, value in row.items():
-                                # 날짜, 시간 등을 문자열로 변환
-                                if hasattr(value, 'isoformat'):
-                                    converted_row[key] = value.isoformat()
-                                elif isinstance(value, bytes):
-                                    converted_row[key] = value.decode('utf-8', errors='ignore')
-                                else:
-                                    converted_row[key] = value
-                            converted_results.append(converted_row)
-
-                    logger.info(f"✅ 쿼리 실행 성공, {len(converted_results)}개 행 반환됨.")
-                    return converted_results
+            async with self._connection(read=self._is_replica_read(query_upper)) as conn:
+                # 예산이 있으면 서버 사이드 커서로 필요한 만큼만 읽음
+                cursor = await self.driver.cursor(conn, streaming=budgeted)
+                cursor_consumed = True
+                try:
+                    # 필요한 경우에만 데이터베이스 전환 (연결별 추적 스키마 기준)
+                    await self._switch_database(conn, cursor, database)
 
+                    # 실제 쿼리 실행 (풀 대기 시간을 제외한 실행+수신 시간을 통계에 기록)
+                    started = time.perf_counter()
+                    try:
+                        with span("execute"):
+                            await self._run_cancellable(
+                                conn, cursor.execute(self._with_statement_timeout(sql, query_upper, timeout), params or ()),
+                                timeout)
+                    finally:
+                        if query_upper.startswith('USE'):
+                            # 사용자 USE 문은 추적 정보를 무효화 (다음 요청에서 USE를 다시 실행)
+                            self._conn_databases[conn] = None
+                    if not query_upper.startswith(READ_STATEMENT_PREFIXES):
+                        # CREATE 등 변경 가능성이 있는 문장 이후에는 캐시를 비움
+                        self._invalidate_caches()
+
+                    if budgeted:
+                        # 예산 적용 시 수신과 변환이 청크 단위로 섞이므로 한 단계로 기록
+                        with span("fetch_convert") as fetch_span:
+                            result, cursor_consumed = await self._run_cancellable(
+                                conn, self._fetch_within_budget(cursor, max_rows, max_bytes), timeout)
+                            fetch_span.set(rows=len(result), truncated=bool(result.truncation))
+                    else:
+                        with span("fetch"):
+                            results = await cursor.fetchall()
+                        # 결과를 JSON 직렬화 가능한 위치 기반 행으로 변환 (컬럼명은 한 번만 보관)
+                        with span("convert", rows=len(results or ())):
+                            result = ResultSet.from_cursor(cursor, results or ())
+                finally:
+                    if cursor_consumed:
+                        try:
+                            await cursor.close()
+                        except Exception as e:
+                            logger.debug(f"커서 종료 중 오류 (연결 폐기됨): {e}")
+                    else:
+                        # 다 읽지 않은 결과를 버리기(drain) 위해 기다리지 않고 연결을 폐기 — 풀이 새 연결로 대체
+                        conn.close()
+                        self._conn_databases.pop(conn, None)
+
+                if not internal:
+                    self.query_stats.record(sql, (time.perf_counter() - started) * 1000, rows=len(result))
+                query_logger.info("✅ 쿼리 실행 성공, %s개 행 반환됨.", len(result))
+                return result
+
+        except TimeoutError as e:
+            if started is not None and not internal:
+                self.query_stats.record(sql, (time.perf_counter() - started) * 1000, error=True)
+            logger.warning(f"⏱️ 쿼리 시간 제한 초과: {e} SQL: {sql[:100]}...")
+            raise
         except Exception as e:
+            if started is not None and not internal:
+                self.query_stats.record(sql, (time.perf_counter() - started) * 1000, error=True)
             conn_state = f"Connection: {'acquired' if conn else 'not acquired'}"
             logger.error(f"❌ 데이터베이스 쿼리 실행 오류 ({conn_state}): {e}", exc_info=True)
             raise RuntimeError(f"Database error: {e}") from e
 
+    async def _execute_cached_query(self, sql: str, params: Optional[tuple] = None, database: Optional[str] = None,
+                                    timeout: Optional[float] = None, max_rows: Optional[int] = None,
+                                    max_bytes: Optional[int] = None) -> ResultSet:
+        """Serves deterministic SELECTs from the read-only result cache, sharing identical in-flight queries."""
+        cache = self.query_cache
+        load = partial(self._execute_query_result, sql, params=params, database=database, timeout=timeout,
+                       max_rows=max_rows, max_bytes=max_bytes)
+        if cache is None or not is_cacheable(sql):
+            return await load()
+        effective_db = database or DB_NAME
+        return await cache.get_or_load(
+            cache.make_key(effective_db, sql, params, budget=(max_rows, max_bytes)),
+            referenced_tables(sql, effective_db),
+            loader=load,
+            fetch_versions=self._table_versions,
+        )
+
+    async def _explain_plan(self, explain_sql: str, params: Optional[tuple] = None,
+                            database: Optional[str] = None) -> Optional[str]:
+        """Runs EXPLAIN FORMAT=JSON for the cost guard and returns the plan document (not counted in query_stats)."""
+        timeout = self._statement_timeout(None)
+        async with self._connection(read=True) as conn:
+            async with await self.driver.cursor(conn) as cursor:
+                await self._switch_database(conn, cursor, database)
+                await self._run_cancellable(conn, cursor.execute(explain_sql, params or ()), timeout)
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def _check_query_cost(self, sql: str, params: Optional[tuple] = None,
+                                database: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Pre-flight cost check: returns a cost_warning dict in warn mode, raises QueryCostError in reject mode,
+        and returns None when the guard is off or the estimate is within MCP_COST_GUARD_MAX_ROWS.
+        """
+        if not self.cost_guard.enabled:
+            return None
+        with span("cost_check"):
+            return await self.cost_guard.check(sql, database or DB_NAME,
+                                               explain=partial(self._explain_plan, params=params, database=database))
+
+    async def _table_versions(self, tables: List[tuple]) -> Dict[tuple, Any]:
+        """Reads CREATE_TIME/UPDATE_TIME for the given (schema, table) pairs in one query."""
+        conditions = " OR ".join(["(TABLE_SCHEMA = %s AND TABLE_NAME = %s)"] * len(tables))
+        params = tuple(part for ref in tables for part in ref)
+        sql = f"SELECT TABLE_SCHEMA, TABLE_NAME, CREATE_TIME, UPDATE_TIME FROM information_schema.TABLES WHERE {conditions}"
+        result = await self._execute_query_result(sql, params=params, internal=True)
+        return {(row[0], row[1]): (row[2], row[3]) for row in result.rows}
+
+    async def _open_stream(self, sql: str, params: Optional[tuple], database: Optional[str], page_size: int,
+                           output_format: str = DEFAULT_OUTPUT_FORMAT, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Runs a query on an unbuffered server-side cursor and returns its first page.
+        The time budget covers executing the statement only (not the time between pages), so it is
+        enforced client-side with KILL QUERY rather than max_statement_time.
+        """
+        await self._wait_for_pool()
+        query_upper = self._check_read_only(sql)
+        if query_upper.startswith('USE'):
+            raise ValueError("USE statements cannot be streamed; pass database_name instead.")
+        # 연결을 기다리기 전에 슬롯을 먼저 예약 — 동시에 열어도 한도를 넘지 않음
+        if not self.streams.reserve():
+            logger.warning(f"⚠️ 열린 스트림 수가 한도({self.streams.max_streams})에 도달했습니다.")
+            raise RuntimeError(f"Too many open result streams (max {self.streams.max_streams}). "
+                               "Fetch remaining pages or call close_stream first.")
+        try:
+            query_logger.info("🔍 스트리밍 쿼리 실행 중 (DB: %s, page_size=%s): %.100s...", database or DB_NAME, page_size, sql)
+            conn, pool = await self._acquire_routed(read=self._is_replica_read(query_upper))
+            stream = None
+            try:
+                cursor = await self.driver.cursor(conn, streaming=True)
+                await self._switch_database(conn, cursor, database)
+                with span("execute"):
+                    await self._run_cancellable(conn, cursor.execute(sql, params or ()), self._statement_timeout(timeout))
+                stream = ResultStream(conn, cursor, release=partial(self._release_connection, pool=pool), database=database)
+                stream.columns, stream.types = column_names(cursor), column_types(cursor)
+                with span("fetch", rows=page_size):
+                    rows = await stream.fetch_page(page_size)
+                # 변환 계획은 첫 페이지 기준으로 한 번만 생성해 이후 페이지에 재사용
+                stream.converters = compile_converters(cursor.description, rows)
+            except BaseException as e:
+                # 취소된 경우에도 연결을 반드시 폐기하고 풀에 반환
+                await self._discard_connection(conn, pool)
+                if not isinstance(e, Exception) or isinstance(e, TimeoutError):
+                    raise
+                logger.error(f"❌ 스트리밍 쿼리 실행 오류: {e}", exc_info=True)
+                raise RuntimeError(f"Database error: {e}") from e
+
+            if stream.exhausted:
+                await stream.close()
+            else:
+                self.streams.add(stream)
+        finally:
+            self.streams.release_reservation()
+        return self._stream_page(stream, rows, output_format)
+
+    async def _fetch_stream_page(self, token: str, page_size: int, output_format: str = DEFAULT_OUTPUT_FORMAT) -> Dict[str, Any]:
+        """Fetches the next page from an open stream."""
+        stream = self.streams.get(token)
+        if stream is None:
+            raise ValueError("Unknown or expired continuation_token. Re-run execute_sql_stream.")
+        async with stream.lock:
+            if stream.closed:
+                raise ValueError("Unknown or expired continuation_token. Re-run execute_sql_stream.")
+            try:
+                with span("fetch", rows=page_size):
+                    rows = await stream.fetch_page(page_size)
+            except Exception as e:
+                logger.error(f"❌ 스트림 페이지 조회 오류: {e}", exc_info=True)
+                await stream.close()
+                self.streams.discard(token)
+                raise RuntimeError(f"Database error: {e}") from e
+        if stream.exhausted:
+            await self.streams.close(token)
+        return self._stream_page(stream, rows, output_format)
+
+    def _stream_page(self, stream: ResultStream, rows, output_format: str) -> Dict[str, Any]:
+        page = ResultSet(stream.columns, stream.types, apply_converters(stream.converters, rows))
+        has_more = not stream.exhausted
+        query_logger.info("✅ 스트림 페이지 반환: %s개 행 (누적 %s개, 추가 페이지: %s)", len(page), stream.rows_fetched, has_more)
+        if output_format == "columnar":
+            response = page.to_columnar()
+        elif output_format == "ndjson":
+            response = {"ndjson": page.to_ndjson()}
+        else:
+            response = {"rows": page.to_dicts()}
+        response.update({
+            "continuation_token": stream.token if has_more else None,
+            "has_more": has_more,
+            "rows_fetched": stream.rows_fetched,
+        })
+        return response
+
+    @staticmethod
+    def _page_size(page_size: Optional[int]) -> int:
+        if not page_size or page_size <= 0:
+            return MCP_STREAM_PAGE_SIZE
+        return min(page_size, MCP_STREAM_MAX_PAGE_SIZE)
+
+    def _invalidate_caches(self) -> None:
+        """Drops cached results and metadata after a statement that may change data or schema."""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+        self.schema_cache.invalidate()
+
+    async def _fetch_databases(self) -> List[str]:
+        results = await self._execute_query("SHOW DATABASES", internal=True)
+        return [row['Database'] for row in results if 'Database' in row]
+
+    async def _fetch_tables(self, database_name: str) -> TableListing:
+        """Table names with CREATE_TIME/UPDATE_TIME, used to revalidate cached schemas."""
+        sql = ("SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME FROM information_schema.TABLES "
+               "WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME")
+        result = await self._execute_query_result(sql, params=(database_name,), database='information_schema', internal=True)
+        return {row[0]: [row[1], row[2]] for row in result.rows}
+
+    async def _fetch_table_schema(self, database_name: str, table_name: str) -> Dict[str, Any]:
+        sql = f"DESCRIBE `{database_name}`.`{table_name}`"
+        schema_results = await self._execute_query(sql, internal=True)
+        schema_info = {}
+        if not schema_results:
+            exists_sql = "SELECT COUNT(*) as count FROM information_schema.tables WHERE table_schema = %s AND table_name = %s"
+            exists_result = await self._execute_query(exists_sql, params=(database_name, table_name), internal=True)
+            if not exists_result or exists_result[0]['count'] == 0:
+                logger.warning(f"⚠️ TOOL WARNING: 테이블 '{database_name}'.'{table_name}'을 찾을 수 없거나 접근할 수 없습니다.")
+                raise FileNotFoundError(f"Table '{database_name}'.'{table_name}' not found or inaccessible.")
+
+        for row in schema_results:
+            col_name = row.get('Field')
+            if col_name:
+                schema_info[col_name] = {
+                    'type': row.get('Type'),
+                    'nullable': row.get('Null', '').upper() == 'YES',
+                    'key': row.get('Key'),
+                    'default': row.get('Default'),
+                    'extra': row.get('Extra')
+                }
+        return schema_info
+
     async def _database_exists(self, database_name: str) -> bool:
         """Checks if a database exists."""
         if not database_name:
             logger.warning(f"⚠️ _database_exists가 잘못된 database_name으로 호출됨: {database_name}")
             return False
 
-        sql = "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA WHERE SCHEMA_NAME = %s"
         try:
-            results = await self._execute_query(sql, params=(database_name,), database='information_schema')
-            return len(results) > 0
+            return await self.schema_cache.database_exists(database_name, self._fetch_databases)
         except Exception as e:
             logger.error(f"❌ 데이터베이스 '{database_name}' 존재 확인 오류: {e}", exc_info=True)
             return False
@@ -166,85 +877,214 @@ class MariaDBServer:
             logger.warning(f"⚠️ _table_exists가 잘못된 이름으로 호출됨: db='{database_name}', table='{table_name}'")
             return False
 
-        sql = "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
         try:
-            results = await self._execute_query(sql, params=(database_name, table_name), database='information_schema')
-            return len(results) > 0
+            version = await self.schema_cache.table_version(database_name, table_name, self._fetch_tables)
+            return version is not None
         except Exception as e:
             logger.error(f"❌ 테이블 '{database_name}.{table_name}' 존재 확인 오류: {e}", exc_info=True)
             return False
 
+    async def _describe_tables(self, database_name: str, table_pattern: Optional[str] = None,
+                               table_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Builds columns, keys, foreign-key relations and estimated row counts for many tables
+        from three set-based information_schema queries instead of one DESCRIBE per table.
+        The queries run one after another so a metadata call never holds more than one connection.
+        """
+        table_filter, filter_params = "", ()
+        if table_name:
+            table_filter, filter_params = " AND TABLE_NAME = %s", (table_name,)
+        elif table_pattern:
+            table_filter, filter_params = " AND TABLE_NAME LIKE %s", (table_pattern,)
+
+        tables_sql = ("SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_ROWS, TABLE_COMMENT FROM information_schema.TABLES "
+                      f"WHERE TABLE_SCHEMA = %s{table_filter} ORDER BY TABLE_NAME")
+        columns_sql = ("SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA "
+                       f"FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s{table_filter} "
+                       "ORDER BY TABLE_NAME, ORDINAL_POSITION")
+        # 다른 테이블이 참조하는 관계(referenced_by)도 필요하므로 키 정보는 테이블 필터 없이 조회
+        keys_sql = ("SELECT TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME, "
+                    "REFERENCED_TABLE_SCHEMA, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                    "FROM information_schema.KEY_COLUMN_USAGE WHERE TABLE_SCHEMA = %s OR REFERENCED_TABLE_SCHEMA = %s "
+                    "ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION")
+        tables_result = await self._execute_query_result(
+            tables_sql, params=(database_name, *filter_params), database='information_schema', internal=True)
+        columns_result = await self._execute_query_result(
+            columns_sql, params=(database_name, *filter_params), database='information_schema', internal=True)
+        keys_result = await self._execute_query_result(
+            keys_sql, params=(database_name, database_name), database='information_schema', internal=True)
+
+        tables: Dict[str, Dict[str, Any]] = {}
+        for name, table_type, engine, table_rows, comment in tables_result.rows:
+            tables[name] = {
+                'type': table_type,
+                'engine': engine,
+                'estimated_rows': table_rows,
+                'comment': comment or None,
+                'columns': {},
+                'primary_key': [],
+                'unique_keys': {},
+                'foreign_keys': [],
+                'referenced_by': [],
+            }
+
+        for name, column, column_type, nullable, key, default, extra in columns_result.rows:
+            if name in tables:
+                tables[name]['columns'][column] = {
+                    'type': column_type,
+                    'nullable': (nullable or '').upper() == 'YES',
+                    'key': key,
+                    'default': default,
+                    'extra': extra
+                }
+
+        foreign_keys: Dict[tuple, Dict[str, Any]] = {}
+        for schema, name, constraint, column, ref_schema, ref_table, ref_column in keys_result.rows:
+            if ref_table is None:
+                if schema != database_name or name not in tables:
+                    continue
+                if constraint == 'PRIMARY':
+                    tables[name]['primary_key'].append(column)
+                else:
+                    tables[name]['unique_keys'].setdefault(constraint, []).append(column)
+                continue
+            fk = foreign_keys.get((schema, name, constraint))
+            if fk is None:
+                fk = foreign_keys[(schema, name, constraint)] = {
+                    'constraint': constraint, 'schema': schema, 'table': name, 'columns': [],
+                    'referenced_schema': ref_schema, 'referenced_table': ref_table, 'referenced_columns': [],
+                }
+            fk['columns'].append(column)
+            fk['referenced_columns'].append(ref_column)
+
+        for fk in foreign_keys.values():
+            if fk['schema'] == database_name and fk['table'] in tables:
+                tables[fk['table']]['foreign_keys'].append({
+                    'constraint': fk['constraint'],
+                    'columns': fk['columns'],
+                    'referenced_table': fk['referenced_table'] if fk['referenced_schema'] == database_name
+                        else f"{fk['referenced_schema']}.{fk['referenced_table']}",
+                    'referenced_columns': fk['referenced_columns'],
+                })
+            if fk['referenced_schema'] == database_name and fk['referenced_table'] in tables:
+                tables[fk['referenced_table']]['referenced_by'].append({
+                    'constraint': fk['constraint'],
+                    'table': fk['table'] if fk['schema'] == database_name else f"{fk['schema']}.{fk['table']}",
+                    'columns': fk['columns'],
+                    'referenced_columns': fk['referenced_columns'],
+                })
+        return tables
+
+    async def _execute_batch_item(self, index: int, item: Any, output_format: str, timeout: Optional[float],
+                                  semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Runs one execute_batch item and reports its result or error with timing, never raising."""
+        entry: Dict[str, Any] = {"index": index}
+        started = time.perf_counter()
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Each batch item must be an object with 'sql', 'database' and optional 'parameters'.")
+            sql = item.get("sql") or item.get("sql_query")
+            if not sql:
+                raise ValueError("Batch item is missing 'sql'.")
+            database = item.get("database") or item.get("database_name") or DB_NAME
+            parameters = item.get("parameters")
+            entry["database"] = database
+            async with semaphore:
+                # 배치 전체가 아니라 항목 단위로 승인 받아 다른 쿼리와 공정하게 경쟁
+                async with self.admission.admit("query") as queue_wait:
+                    entry["queue_wait_ms"] = round(queue_wait * 1000, 3)
+                    max_rows, max_bytes = self._result_budget(item.get("max_rows"), item.get("max_bytes"))
+                    params = tuple(parameters) if parameters else None
+                    cost_warning = await self._check_query_cost(sql, params=params, database=database)
+                    result = await self._execute_cached_query(
+                        sql, params=params, database=database, timeout=timeout,
+                        max_rows=max_rows, max_bytes=max_bytes)
+            self._observe_result("execute_batch", result)
+            entry.update(status="ok", row_count=len(result), truncated=bool(result.truncation),
+                         result=result.format(output_format))
+            if cost_warning:
+                entry["cost_warning"] = cost_warning
+        except Exception as e:
+            entry.update(status="error", error=f"{type(e).__name__}: {e}")
+        entry["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return entry
+
+    def _admitted(self, lane: str):
+        """Decorator that runs a tool inside an admission lane ('metadata' or 'query')."""
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                try:
+                    started = time.perf_counter()
+                    async with self.admission.admit(lane):
+                        add_span("admission", started, lane=lane)
+                        return await func(*args, **kwargs)
+                except OverloadedError as e:
+                    logger.warning(f"🚦 요청 거부 ({func.__name__}): {e}")
+                    raise
+            return wrapper
+        return decorator
+
     # --- Tool Registration ---
     def register_tools(self):
-        """Registers the class methods as MCP tools using @tool decorator."""
-        if self.pool is None:
-             logger.error("❌ 도구 등록 불가: 데이터베이스 풀이 초기화되지 않았습니다.")
-             raise RuntimeError("Database pool must be initialized before registering tools.")
+        """
+        Registers the class methods as MCP tools using @tool decorator.
+        Tools can be registered before the pool is ready; database access waits for it.
+        """
+        if self.pool is None and self._pool_task is None:
+             logger.error("❌ 도구 등록 불가: 데이터베이스 풀 생성이 시작되지 않았습니다.")
+             raise RuntimeError("Database pool must be initialized (or started) before registering tools.")
 
         # 1. 데이터베이스 목록 조회
-        @self.mcp.tool
+        @self._tool
+        @self._admitted("metadata")
         async def list_databases() -> List[str]:
             """Lists all accessible databases on the connected MariaDB server."""
-            logger.info("🔧 TOOL START: list_databases 호출됨.")
-            sql = "SHOW DATABASES"
+            query_logger.info("🔧 TOOL START: list_databases 호출됨.")
             try:
-                results = await self._execute_query(sql)
-                db_list = [row['Database'] for row in results if 'Database' in row]
-                logger.info(f"✅ TOOL END: list_databases 완료. 데이터베이스 발견: {len(db_list)}개.")
+                db_list = list(await self.schema_cache.get_databases(self._fetch_databases))
+                query_logger.info("✅ TOOL END: list_databases 완료. 데이터베이스 발견: %s개.", len(db_list))
                 return db_list
             except Exception as e:
                 logger.error(f"❌ TOOL ERROR: list_databases 실패: {e}", exc_info=True)
                 raise
 
         # 2. 테이블 목록 조회
-        @self.mcp.tool
+        @self._tool
+        @self._admitted("metadata")
         async def list_tables(database_name: str) -> List[str]:
             """Lists all tables within the specified database."""
-            logger.info(f"🔧 TOOL START: list_tables 호출됨. database_name={database_name}")
+            query_logger.info("🔧 TOOL START: list_tables 호출됨. database_name=%s", database_name)
             if not database_name:
                 logger.warning(f"⚠️ TOOL WARNING: list_tables가 잘못된 database_name으로 호출됨: {database_name}")
                 raise ValueError(f"Invalid database name provided: {database_name}")
-            sql = "SHOW TABLES"
             try:
-                results = await self._execute_query(sql, database=database_name)
-                table_list = [list(row.values())[0] for row in results if row]
-                logger.info(f"✅ TOOL END: list_tables 완료. 테이블 발견: {len(table_list)}개.")
+                table_list = list(await self.schema_cache.get_tables(database_name, self._fetch_tables))
+                if not table_list and not await self._database_exists(database_name):
+                    raise FileNotFoundError(f"Database '{database_name}' not found or inaccessible.")
+                query_logger.info("✅ TOOL END: list_tables 완료. 테이블 발견: %s개.", len(table_list))
                 return table_list
             except Exception as e:
                 logger.error(f"❌ TOOL ERROR: list_tables 실패 (database_name={database_name}): {e}", exc_info=True)
                 raise
 
         # 3. 테이블 스키마 조회
-        @self.mcp.tool
+        @self._tool
+        @self._admitted("metadata")
         async def get_table_schema(database_name: str, table_name: str) -> Dict[str, Any]:
             """Retrieves the schema for a specific table in a database."""
-            logger.info(f"🔧 TOOL START: get_table_schema 호출됨. database_name={database_name}, table_name={table_name}")
+            query_logger.info("🔧 TOOL START: get_table_schema 호출됨. database_name=%s, table_name=%s", database_name, table_name)
             if not database_name or not table_name:
                 logger.warning(f"⚠️ TOOL WARNING: get_table_schema가 잘못된 이름으로 호출됨")
                 raise ValueError(f"Invalid database or table name provided")
 
-            sql = f"DESCRIBE `{database_name}`.`{table_name}`"
             try:
-                schema_results = await self._execute_query(sql)
-                schema_info = {}
-                if not schema_results:
-                    exists_sql = "SELECT COUNT(*) as count FROM information_schema.tables WHERE table_schema = %s AND table_name = %s"
-                    exists_result = await self._execute_query(exists_sql, params=(database_name, table_name))
-                    if not exists_result or exists_result[0]['count'] == 0:
-                        logger.warning(f"⚠️ TOOL WARNING: 테이블 '{database_name}'.'{table_name}'을 찾을 수 없거나 접근할 수 없습니다.")
-                        raise FileNotFoundError(f"Table '{database_name}'.'{table_name}' not found or inaccessible.")
-
-                for row in schema_results:
-                    col_name = row.get('Field')
-                    if col_name:
-                        schema_info[col_name] = {
-                            'type': row.get('Type'),
-                            'nullable': row.get('Null', '').upper() == 'YES',
-                            'key': row.get('Key'),
-                            'default': row.get('Default'),
-                            'extra': row.get('Extra')
-                        }
-                logger.info(f"✅ TOOL END: get_table_schema 완료. 컬럼 발견: {len(schema_info)}개.")
+                schema_info = await self.schema_cache.get_table_schema(
+                    database_name, table_name, self._fetch_tables, self._fetch_table_schema)
+                if schema_info is None:
+                    logger.warning(f"⚠️ TOOL WARNING: 테이블 '{database_name}'.'{table_name}'을 찾을 수 없거나 접근할 수 없습니다.")
+                    raise FileNotFoundError(f"Table '{database_name}'.'{table_name}' not found or inaccessible.")
+                query_logger.info("✅ TOOL END: get_table_schema 완료. 컬럼 발견: %s개.", len(schema_info))
                 return schema_info
             except FileNotFoundError as e:
                 logger.warning(f"⚠️ TOOL WARNING: get_table_schema 테이블 없음: {e}")
@@ -253,11 +1093,77 @@ class MariaDBServer:
                 logger.error(f"❌ TOOL ERROR: get_table_schema 실패: {e}", exc_info=True)
                 raise RuntimeError(f"Could not retrieve schema for table '{database_name}.{table_name}'.")
 
+        # 3-1. 외래 키 관계를 포함한 테이블 스키마 조회
+        @self._tool
+        @self._admitted("metadata")
+        async def get_table_schema_with_relations(database_name: str, table_name: str) -> Dict[str, Any]:
+            """Retrieves a table's columns, primary/unique keys, outgoing foreign keys and the tables that reference it."""
+            query_logger.info("🔧 TOOL START: get_table_schema_with_relations 호출됨. database_name=%s, table_name=%s", database_name, table_name)
+            if not database_name or not table_name:
+                logger.warning(f"⚠️ TOOL WARNING: get_table_schema_with_relations가 잘못된 이름으로 호출됨")
+                raise ValueError(f"Invalid database or table name provided")
+            try:
+                tables = await self._describe_tables(database_name, table_name=table_name)
+                if table_name not in tables:
+                    raise FileNotFoundError(f"Table '{database_name}'.'{table_name}' not found or inaccessible.")
+                table_info = tables[table_name]
+                # 컬럼별로도 참조 대상을 표시
+                for fk in table_info['foreign_keys']:
+                    for column, ref_column in zip(fk['columns'], fk['referenced_columns']):
+                        table_info['columns'][column]['foreign_key'] = {
+                            'constraint': fk['constraint'],
+                            'referenced_table': fk['referenced_table'],
+                            'referenced_column': ref_column,
+                        }
+                query_logger.info("✅ TOOL END: get_table_schema_with_relations 완료. 컬럼 %s개, 외래 키 %s개.",
+                                  len(table_info['columns']), len(table_info['foreign_keys']))
+                return {'table_name': table_name, **table_info}
+            except FileNotFoundError as e:
+                logger.warning(f"⚠️ TOOL WARNING: get_table_schema_with_relations 테이블 없음: {e}")
+                raise e
+            except Exception as e:
+                logger.error(f"❌ TOOL ERROR: get_table_schema_with_relations 실패: {e}", exc_info=True)
+                raise RuntimeError(f"Could not retrieve schema for table '{database_name}.{table_name}'.")
+
+        # 3-2. 데이터베이스 전체 구조를 한 번에 조회
+        @self._tool
+        @self._admitted("metadata")
+        async def describe_database(database_name: str, table_pattern: Optional[str] = None) -> Dict[str, Any]:
+            """
+            Describes every table of a database in one call: columns, primary/unique keys, foreign-key relations
+            and estimated row counts. table_pattern optionally filters tables with a SQL LIKE pattern (e.g. 'Job%').
+            """
+            query_logger.info("🔧 TOOL START: describe_database 호출됨. database_name=%s, table_pattern=%s", database_name, table_pattern)
+            if not database_name:
+                logger.warning(f"⚠️ TOOL WARNING: describe_database가 잘못된 database_name으로 호출됨: {database_name}")
+                raise ValueError(f"Invalid database name provided: {database_name}")
+            try:
+                tables = await self._describe_tables(database_name, table_pattern=table_pattern)
+                if not tables and not await self._database_exists(database_name):
+                    raise FileNotFoundError(f"Database '{database_name}' not found or inaccessible.")
+                query_logger.info("✅ TOOL END: describe_database 완료. 테이블 %s개.", len(tables))
+                return {'database': database_name, 'table_count': len(tables), 'tables': tables}
+            except Exception as e:
+                logger.error(f"❌ TOOL ERROR: describe_database 실패 (database_name={database_name}): {e}", exc_info=True)
+                raise
+
         # 4. SQL 실행 (메인 도구)
-        @self.mcp.tool
-        async def execute_sql(sql_query: str, database_name: str, parameters: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
-            """Executes a read-only SQL query against a specified database."""
-            logger.info(f"🔧 TOOL START: execute_sql 호출됨. database_name={database_name}, sql_query={sql_query[:100]}...")
+        @self._tool
+        @self._admitted("query")
+        async def execute_sql(sql_query: str, database_name: str, parameters: Optional[List[Any]] = None,
+                              output_format: str = DEFAULT_OUTPUT_FORMAT, timeout_seconds: Optional[float] = None,
+                              max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+            """
+            Executes a read-only SQL query against a specified database.
+            output_format: 'rows' (list of objects, default), 'columnar' ({columns, types, rows} with positional rows)
+            or 'ndjson' ({ndjson: text}: a header line with columns/types, then one JSON array per row).
+            timeout_seconds: optional time budget for this call (capped by the server-wide statement timeout).
+            max_rows / max_bytes: optional result budgets (capped by the server-wide budgets). A result that exceeds
+            them is cut off and wrapped as {<format>: ..., truncated: true, total_rows, total_bytes_approx, hint}.
+            If the server's cost guard is enabled, SELECTs whose EXPLAIN estimate exceeds the limit are rejected
+            (or wrapped with a cost_warning) with advice on how to narrow the query.
+            """
+            query_logger.info("🔧 TOOL START: execute_sql 호출됨. database_name=%s, sql_query=%.100s...", database_name, sql_query)
 
             if not sql_query:
                 logger.error("❌ SQL 쿼리가 비어있습니다.")
@@ -265,28 +1171,221 @@ class MariaDBServer:
 
             if not database_name:
                 database_name = DB_NAME
-                logger.info(f"🔄 database_name이 비어있어서 기본값 사용: {database_name}")
+                query_logger.info("🔄 database_name이 비어있어서 기본값 사용: %s", database_name)
+
+            output_format = validate_output_format(output_format)
 
             # parameters를 tuple로 변환 (None이면 빈 tuple)
             param_tuple = tuple(parameters) if parameters else None
             if param_tuple:
-                logger.debug(f"📊 파라미터: {param_tuple}")
+                query_logger.debug("📊 파라미터: %s", param_tuple)
 
             try:
-                results = await self._execute_query(sql_query, params=param_tuple, database=database_name)
-                logger.info(f"✅ TOOL END: execute_sql 완료. 반환된 행: {len(results)}개.")
+                row_budget, byte_budget = self._result_budget(max_rows, max_bytes)
+                # 실행 전에 EXPLAIN 추정치로 전체 스캔/카티전 조인 차단 또는 경고
+                cost_warning = await self._check_query_cost(sql_query, params=param_tuple, database=database_name)
+                result = await self._execute_cached_query(sql_query, params=param_tuple, database=database_name,
+                                                          timeout=timeout_seconds, max_rows=row_budget,
+                                                          max_bytes=byte_budget)
+                self._observe_result("execute_sql", result)
+                query_logger.info("✅ TOOL END: execute_sql 완료. 반환된 행: %s개 (format: %s).", len(result), output_format)
 
                 # 결과를 직접 반환 (FastMCP가 자동으로 적절한 형식으로 감쌀 것)
-                return results
+                with span("format", output_format=output_format) as format_span:
+                    response = result.format(output_format, metadata={"cost_warning": cost_warning} if cost_warning else None)
+                    if isinstance(response, str):
+                        # ndjson은 여기서 이미 인코딩됨 — 구조화된 출력을 유지하도록 객체로 감쌈
+                        format_span.set(response_bytes=len(response))
+                        response = {"ndjson": response}
+                    elif format_span.recording:
+                        # 나머지 형식은 FastMCP가 반환 후 인코딩하므로 (샘플링된 호출만) 크기 추정치를 기록
+                        format_span.set(response_bytes_approx=result.estimated_bytes())
+                return response
             except Exception as e:
                 logger.error(f"❌ TOOL ERROR: execute_sql 실패: {e}", exc_info=True)
                 raise
 
+        # 4-1 ~ 4-3. 스트리밍 도구: 커서와 continuation_token은 이를 연 프로세스에만 있으므로,
+        # 요청이 임의의 워커로 가는 다중 워커 모드에서는 등록하지 않음
+        if self.worker_health is not None:
+            logger.warning("⚠️ 다중 워커 모드: execute_sql_stream/fetch_next_page/close_stream 도구를 비활성화합니다.")
+        else:
+            # 4-1. 스트리밍 SQL 실행 (서버 사이드 커서 + 페이지 단위 반환)
+            @self._tool
+            @self._admitted("query")
+            async def execute_sql_stream(sql_query: str, database_name: str, parameters: Optional[List[Any]] = None,
+                                         page_size: Optional[int] = None, output_format: str = DEFAULT_OUTPUT_FORMAT,
+                                         timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+                """Executes a read-only SQL query on a server-side cursor and returns the first page of rows plus a continuation_token for fetch_next_page. Supports output_format 'rows', 'columnar' or 'ndjson'."""
+                query_logger.info("🔧 TOOL START: execute_sql_stream 호출됨. database_name=%s, sql_query=%.100s...", database_name, sql_query)
+                if not sql_query:
+                    logger.error("❌ SQL 쿼리가 비어있습니다.")
+                    raise ValueError("SQL query cannot be empty")
+                if not database_name:
+                    database_name = DB_NAME
+                output_format = validate_output_format(output_format)
+                param_tuple = tuple(parameters) if parameters else None
+                try:
+                    page = await self._open_stream(sql_query, param_tuple, database_name, self._page_size(page_size), output_format,
+                                                   timeout=timeout_seconds)
+                    query_logger.info("✅ TOOL END: execute_sql_stream 완료. 누적 행: %s개.", page['rows_fetched'])
+                    return page
+                except Exception as e:
+                    logger.error(f"❌ TOOL ERROR: execute_sql_stream 실패: {e}", exc_info=True)
+                    raise
+
+            # 4-2. 다음 페이지 조회
+            @self._tool
+            async def fetch_next_page(continuation_token: str, page_size: Optional[int] = None,
+                                      output_format: str = DEFAULT_OUTPUT_FORMAT) -> Dict[str, Any]:
+                """Fetches the next page of rows for a continuation_token returned by execute_sql_stream."""
+                query_logger.info("🔧 TOOL START: fetch_next_page 호출됨. token=%.8s...", continuation_token)
+                output_format = validate_output_format(output_format)
+                try:
+                    page = await self._fetch_stream_page(continuation_token, self._page_size(page_size), output_format)
+                    query_logger.info("✅ TOOL END: fetch_next_page 완료. 누적 행: %s개.", page['rows_fetched'])
+                    return page
+                except Exception as e:
+                    logger.error(f"❌ TOOL ERROR: fetch_next_page 실패: {e}", exc_info=True)
+                    raise
+
+            # 4-3. 스트림 종료
+            @self._tool
+            async def close_stream(continuation_token: str) -> Dict[str, Any]:
+                """Closes an open result stream early and releases its connection."""
+                query_logger.info("🔧 TOOL START: close_stream 호출됨. token=%.8s...", continuation_token)
+                closed = await self.streams.close(continuation_token)
+                status = "closed" if closed else "not_found"
+                query_logger.info("✅ TOOL END: close_stream 완료. 상태: %s", status)
+                return {"status": status, "continuation_token": continuation_token}
+
+        # 4-4. 쿼리 결과 캐시 통계
+        @self._tool
+        async def query_cache_stats() -> Dict[str, Any]:
+            """Returns hit/miss statistics for the read-only query result cache and the schema metadata cache."""
+            query_logger.info("🔧 TOOL START: query_cache_stats 호출됨.")
+            schema_cache = {"schema_cache": self.schema_cache.snapshot_stats()}
+            if self.query_cache is None:
+                return {"enabled": False, "reason": "Query cache is disabled or server is not in read-only mode.",
+                        **self._worker_labels(), **schema_cache}
+            return {"enabled": True, **self._worker_labels(), **self.query_cache.snapshot(), **schema_cache}
+
+        # 4-5. 쿼리 결과 캐시 비우기
+        @self._tool
+        async def clear_query_cache() -> Dict[str, Any]:
+            """Drops every cached query result."""
+            query_logger.info("🔧 TOOL START: clear_query_cache 호출됨.")
+            if self.query_cache is None:
+                return {"status": "disabled"}
+            dropped = len(self.query_cache)
+            self.query_cache.clear()
+            query_logger.info("✅ TOOL END: clear_query_cache 완료. %s개 항목 삭제.", dropped)
+            return {"status": "cleared", "entries_dropped": dropped}
+
+        # 4-6. 문장별 실행 통계
+        @self._tool
+        async def query_stats(limit: int = 20, order_by: str = "total_ms", query_filter: Optional[str] = None) -> Dict[str, Any]:
+            """
+            Returns per-statement statistics grouped by fingerprint (literals and IN-lists normalized):
+            calls, total/mean/p50/p99/max latency in ms, rows returned and errors.
+            order_by: calls, total_ms, mean_ms, p50_ms, p99_ms, max_ms, rows or errors.
+            Queries answered from the result cache do not reach the database and are not counted.
+            """
+            query_logger.info("🔧 TOOL START: query_stats 호출됨. limit=%s, order_by=%s, query_filter=%s", limit, order_by, query_filter)
+            if order_by not in STATS_ORDER_KEYS:
+                raise ValueError(f"Unsupported order_by '{order_by}'. Choose from: {list(STATS_ORDER_KEYS)}")
+            statements = self.query_stats.top(limit=limit, order_by=order_by, query_filter=query_filter)
+            query_logger.info("✅ TOOL END: query_stats 완료. %s개 항목 반환.", len(statements))
+            return {**self._worker_labels(), **self.query_stats.summary(), "order_by": order_by, "statements": statements,
+                    "cost_guard": self.cost_guard.snapshot()}
+
+        # 4-7. 문장별 실행 통계 초기화
+        @self._tool
+        async def reset_query_stats() -> Dict[str, Any]:
+            """Clears all per-statement statistics."""
+            query_logger.info("🔧 TOOL START: reset_query_stats 호출됨.")
+            removed = self.query_stats.reset()
+            query_logger.info("✅ TOOL END: reset_query_stats 완료. %s개 항목 삭제.", removed)
+            return {"status": "reset", "fingerprints_removed": removed}
+
+        # 4-8. 연결 풀 상태
+        @self._tool
+        async def pool_status() -> Dict[str, Any]:
+            """Returns connection pool size, free connections, waiters, acquire latency histogram and recycle counts."""
+            query_logger.info("🔧 TOOL START: pool_status 호출됨.")
+            return {**self._worker_labels(), **self.get_pool_status()}
+
+        # 4-9. 승인 제어(동시 실행 한도) 상태
+        @self._tool
+        async def concurrency_status() -> Dict[str, Any]:
+            """Returns per-lane admission state: adaptive limit, in-flight and queued calls, queue-wait times and rejections."""
+            query_logger.info("🔧 TOOL START: concurrency_status 호출됨.")
+            return self.admission.snapshot()
+
+        # 4-10. 배치 SQL 실행 (독립적인 여러 쿼리를 동시에)
+        @self._tool
+        async def execute_batch(items: List[Dict[str, Any]], output_format: str = DEFAULT_OUTPUT_FORMAT,
+                                max_concurrency: Optional[int] = None, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+            """
+            Runs independent read-only queries concurrently. items: list of {sql, database, parameters}.
+            Returns per-item results in input order, each with status ('ok' or 'error'), row_count or error,
+            and elapsed_ms / queue_wait_ms so slow members are easy to spot. One failing item does not fail the batch.
+            """
+            query_logger.info("🔧 TOOL START: execute_batch 호출됨. 항목 %s개", len(items or []))
+            if not items:
+                raise ValueError("items cannot be empty")
+            if len(items) > MCP_BATCH_MAX_ITEMS:
+                raise ValueError(f"Too many batch items ({len(items)}); the maximum is {MCP_BATCH_MAX_ITEMS}.")
+            output_format = validate_output_format(output_format)
+            concurrency = max(1, min(max_concurrency or MCP_BATCH_CONCURRENCY, MCP_BATCH_CONCURRENCY))
+            semaphore = asyncio.Semaphore(concurrency)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                self._execute_batch_item(i, item, output_format, timeout_seconds, semaphore)
+                for i, item in enumerate(items)
+            ))
+            failed = sum(1 for r in results if r["status"] != "ok")
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            query_logger.info("✅ TOOL END: execute_batch 완료. 성공 %s개, 실패 %s개, %sms", len(results) - failed, failed, elapsed_ms)
+            return {
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "concurrency": concurrency,
+                "elapsed_ms": elapsed_ms,
+                "results": results,
+            }
+
+        # 4-11. 최근 도구 호출 단계별 트레이스
+        @self._tool
+        async def recent_traces(limit: int = 20, tool: Optional[str] = None, min_duration_ms: float = 0.0) -> Dict[str, Any]:
+            """
+            Returns the most recent sampled tool-call traces (newest first) with phase spans such as
+            admission, acquire, use, cost_check, execute, fetch, convert and format, each with start_ms and duration_ms.
+            tool: only traces of this tool. min_duration_ms: only calls at least this slow.
+            """
+            query_logger.info("🔧 TOOL START: recent_traces 호출됨. limit=%s, tool=%s, min_duration_ms=%s", limit, tool, min_duration_ms)
+            traces = self.tracer.recent(limit=max(1, limit), tool=tool, min_duration_ms=min_duration_ms)
+            query_logger.info("✅ TOOL END: recent_traces 완료. %s개 반환.", len(traces))
+            return {**self._worker_labels(), "sample_rate": self.tracer.sample_rate, "buffered": len(self.tracer.buffer),
+                    **self.tracer.stats, "traces": traces}
+
+        # 4-12. 임베딩 서비스 상태 (모델 레지스트리, 추론 실행기)
+        @self._tool
+        async def embedding_stats() -> Dict[str, Any]:
+            """Returns embedding provider statistics: loaded models, memory use, load/hit/evict counts and inference executor usage."""
+            query_logger.info("🔧 TOOL START: embedding_stats 호출됨.")
+            if EMBEDDING_PROVIDER is None:
+                return {"enabled": False, "reason": "EMBEDDING_PROVIDER is not set."}
+            if _embedding_service is None:
+                return {"enabled": True, "initialized": False, "provider": EMBEDDING_PROVIDER}
+            return {"enabled": True, "initialized": True, **_embedding_service.get_stats()}
+
         # 5. 데이터베이스 생성
-        @self.mcp.tool
+        @self._tool
+        @self._admitted("query")
         async def create_database(database_name: str) -> Dict[str, Any]:
             """Creates a new database if it doesn't exist."""
-            logger.info(f"🔧 TOOL START: create_database 호출됨. database: '{database_name}'")
+            query_logger.info("🔧 TOOL START: create_database 호출됨. database: '%s'", database_name)
             if not database_name:
                 logger.error(f"❌ 생성용 database_name이 잘못됨: '{database_name}'")
                 raise ValueError(f"Invalid database_name for creation: '{database_name}'")
@@ -294,15 +1393,16 @@ class MariaDBServer:
             # 존재 여부 확인
             if await self._database_exists(database_name):
                 message = f"Database '{database_name}' already exists."
-                logger.info(f"✅ TOOL END: create_database. {message}")
+                query_logger.info("✅ TOOL END: create_database. %s", message)
                 return {"status": "exists", "message": message, "database_name": database_name}
 
             sql = f"CREATE DATABASE IF NOT EXISTS `{database_name}`"
 
             try:
                 await self._execute_query(sql, database=None)
+                self.schema_cache.invalidate()
                 message = f"Database '{database_name}' created successfully."
-                logger.info(f"✅ TOOL END: create_database. {message}")
+                query_logger.info("✅ TOOL END: create_database. %s", message)
                 return {"status": "success", "message": message, "database_name": database_name}
             except Exception as e:
                 error_message = f"Failed to create database '{database_name}'."
@@ -311,52 +1411,141 @@ class MariaDBServer:
 
         logger.info("✅ @tool 데코레이터를 사용하여 MCP 도구 등록 완료.")
 
+    async def _startup_diagnostics(self) -> None:
+        """Logs the table list of DB_NAME and sample rows of JobMapRaws once the pool is ready."""
+        try:
+            logger.info("📋 서버 시작 후, 테이블 목록 및 샘플 데이터 자동 출력:")
+
+            # 테이블 목록 조회
+            table_check_sql = "SHOW TABLES"
+            table_results = await self._execute_query(table_check_sql, database=DB_NAME, internal=True)
+
+            if table_results:
+                logger.info(f"📊 총 {len(table_results)}개 테이블 발견:")
+                for i, row in enumerate(table_results, start=1):
+                    table_name = list(row.values())[0]
+                    logger.info(f"   {i}. {table_name}")
+
+                    # JobMapRaws 테이블에서 샘플 데이터 조회
+                    if table_name == 'JobMapRaws':
+                        try:
+                            sample_sql = f"SELECT * FROM {table_name} LIMIT 3"
+                            sample_results = await self._execute_query(sample_sql, database=DB_NAME, internal=True)
+                            logger.info(f"📝 {table_name} 샘플 데이터 ({len(sample_results)}개 행):")
+                            for j, sample_row in enumerate(sample_results, start=1):
+                                logger.info(f"      행 {j}: {dict(sample_row)}")
+                        except Exception as sample_error:
+                            logger.warning(f"⚠️ {table_name} 샘플 데이터 조회 실패: {sample_error}")
+            else:
+                logger.warning("⚠️ 테이블이 존재하지 않습니다.")
+
+        except Exception as e:
+            logger.error(f"❌ 테이블 목록 조회 실패: {e}", exc_info=True)
+
+    async def _preload_embedding_models(self) -> None:
+        """Loads HF_PRELOAD_MODELS into the embedding model registry after startup."""
+        try:
+            service = await get_embedding_service()
+            await service.preload_models(HF_PRELOAD_MODELS)
+            logger.info(f"📦 임베딩 모델 사전 로드 완료: {', '.join(HF_PRELOAD_MODELS)}")
+        except Exception as e:
+            logger.error(f"❌ 임베딩 모델 사전 로드 실패: {e}", exc_info=True)
+
+    def _worker_labels(self) -> Dict[str, Any]:
+        """{'worker': index} in multi-worker mode (added to metrics and stats outputs), else empty."""
+        return {"worker": self.worker_health.index} if self.worker_health is not None else {}
+
+    async def _metrics_endpoint(self, request: Request) -> Response:
+        """OpenMetrics text exposition for Prometheus scrapes (all workers, labelled by worker, in multi-worker mode)."""
+        if self.worker_health is None:
+            return Response(METRICS.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+        # 이 워커는 현재 값, 다른 워커는 마지막으로 게시한 값 (MCP_WORKER_HEALTH_INTERVAL 주기)
+        own = METRICS.families(self._worker_labels())
+        peers = await asyncio.to_thread(self.worker_health.peer_metrics)
+        return Response(merge_families([own, *peers]), media_type=OPENMETRICS_CONTENT_TYPE)
+
+    def get_health(self) -> Dict[str, Any]:
+        """Liveness snapshot of this process: pool readiness and usage, admission queue and open streams."""
+        pool = self.pool
+        return {
+            "pool_ready": pool is not None,
+            "pool_in_use": pool.size - pool.freesize if pool is not None else 0,
+            "pool_max": pool.maxsize if pool is not None else MCP_MAX_POOL_SIZE,
+            "admission_inflight": sum(lane.inflight for lane in self.admission.lanes.values()),
+            "open_streams": len(self.streams),
+        }
+
+    async def _health_endpoint(self, request: Request) -> Response:
+        """Health of this worker, or of all workers of the group in multi-worker mode."""
+        if self.worker_health is not None:
+            # 워커 상태 파일 읽기는 파일 I/O이므로 이벤트 루프 밖에서 실행
+            health = await asyncio.to_thread(self.worker_health.aggregate, self.expected_workers)
+        else:
+            health = {"status": "ok" if self.pool is not None else "down", **self.get_health()}
+        return JSONResponse(health, status_code=200 if health["status"] != "down" else 503)
+
+    async def _report_worker_health(self) -> None:
+        """Periodically publishes this worker's health for the aggregated /health endpoint."""
+        while True:
+            try:
+                health = self.get_health()
+                await asyncio.to_thread(self.worker_health.write, health)
+                if MCP_METRICS_ENABLED:
+                    families = METRICS.families(self._worker_labels())
+                    await asyncio.to_thread(self.worker_health.write_metrics, families)
+            except OSError as e:
+                logger.warning(f"⚠️ 워커 상태 기록 실패: {e}")
+            await asyncio.sleep(self.worker_health.interval)
+
+    def _http_app(self, transport: str):
+        """FastMCP ASGI app for sse or streamable-http (stateless when served by several workers)."""
+        # fastmcp 2.7-2.11 (see pyproject.toml): http_app builds both transports; sse_app() was removed later
+        if transport == "sse":
+            return self.mcp.http_app(transport="sse")
+        return self.mcp.http_app(transport="streamable-http", stateless_http=self.worker_health is not None)
+
+    async def _serve_http(self, transport: str, host: str, port: int, sock: Optional[socket.socket] = None) -> None:
+        """Serves the FastMCP HTTP app with uvicorn, adding the metrics and health routes next to it."""
+        app = self._http_app(transport)
+        if MCP_METRICS_ENABLED:
+            app.router.routes.append(Route(MCP_METRICS_PATH, self._metrics_endpoint, methods=["GET"]))
+            logger.info(f"📈 메트릭 엔드포인트: http://{host}:{port}{MCP_METRICS_PATH}")
+        app.router.routes.append(Route(MCP_HEALTH_PATH, self._health_endpoint, methods=["GET"]))
+        config = uvicorn.Config(app, host=host, port=port, log_level="info")
+        # 워커 모드에서는 SO_REUSEPORT로 미리 바인딩한 소켓을 넘겨받아 사용
+        await uvicorn.Server(config).serve(sockets=[sock] if sock is not None else None)
+
     # --- Async Main Server Logic ---
-    async def run_async_server(self, transport="stdio", host="127.0.0.1", port=9001):
+    async def run_async_server(self, transport="stdio", host="127.0.0.1", port=9001,
+                               sock: Optional[socket.socket] = None):
         try:
-            # 1. Initialize pool
-            await self.initialize_pool()
-            logger.info("✅ [MCP] MariaDB 연결 성공 및 풀 생성 완료")
+            # 1. 연결 풀 생성은 백그라운드에서 (MCP initialize가 풀 예열을 기다리지 않도록)
+            self.start_pool()
+            logger.info("🔗 [MCP] MariaDB 연결 풀 생성 시작 (백그라운드)")
 
-            # 2. Register tools
+            # 2. Register tools (DB 접근 시 풀 준비를 기다림)
             self.register_tools()
             logger.info("✅ [MCP] MCP 도구 등록 완료 (list_databases, execute_sql 등)")
 
-            # 3. 자동 테이블 조회 및 샘플 데이터 출력
-            try:
-                logger.info("📋 서버 시작 후, 테이블 목록 및 샘플 데이터 자동 출력:")
-
-                # 테이블 목록 조회
-                table_check_sql = "SHOW TABLES"
-                table_results = await self._execute_query(table_check_sql, database=DB_NAME)
-
-                if table_results:
-                    logger.info(f"📊 총 {len(table_results)}개 테이블 발견:")
-                    for i, row in enumerate(table_results, start=1):
-                        table_name = list(row.values())[0]
-                        logger.info(f"   {i}. {table_name}")
-
-                        # JobMapRaws 테이블에서 샘플 데이터 조회
-                        if table_name == 'JobMapRaws':
-                            try:
-                                sample_sql = f"SELECT * FROM {table_name} LIMIT 3"
-                                sample_results = await self._execute_query(sample_sql, database=DB_NAME)
-                                logger.info(f"📝 {table_name} 샘플 데이터 ({len(sample_results)}개 행):")
-                                for j, sample_row in enumerate(sample_results, start=1):
-                                    logger.info(f"      행 {j}: {dict(sample_row)}")
-                            except Exception as sample_error:
-                                logger.warning(f"⚠️ {table_name} 샘플 데이터 조회 실패: {sample_error}")
-                else:
-                    logger.warning("⚠️ 테이블이 존재하지 않습니다.")
-
-            except Exception as e:
-                logger.error(f"❌ 테이블 목록 조회 실패: {e}", exc_info=True)
+            # 3. 선택적 시작 진단 (테이블 목록 및 샘플 데이터)은 백그라운드 태스크로
+            if MCP_STARTUP_DIAGNOSTICS:
+                task = asyncio.get_running_loop().create_task(self._startup_diagnostics())
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            if HF_PRELOAD_MODELS and EMBEDDING_PROVIDER == "huggingface":
+                task = asyncio.get_running_loop().create_task(self._preload_embedding_models())
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            if self.worker_health is not None:
+                task = asyncio.get_running_loop().create_task(self._report_worker_health())
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
 
             # 4. Prepare transport
             logger.info(f"✅ [MCP] 서버 시작 완료 (Transport: {transport})")
             transport_kwargs = {}
-            if transport == "sse":
-                transport_kwargs = {"host": host, "port": port}
+            if transport in ("sse", "streamable-http"):
+                transport_kwargs = {"host": host, "port": port, "sock": sock}
                 logger.info(f"🌐 {transport}를 통한 MCP 서버 시작: {host}:{port}")
             elif transport == "stdio":
                 logger.info(f"📡 {transport}를 통한 MCP 서버 시작...")
@@ -366,14 +1555,20 @@ class MariaDBServer:
                 logger.error(f"❌ 지원되지 않는 전송 타입: {transport}")
                 return
 
-            # 5. Run FastMCP
-            await self.mcp.run_async(transport=transport, **transport_kwargs)
+            # 5. Run FastMCP (HTTP 전송은 /metrics, /health 경로를 추가한 앱으로 직접 실행)
+            if transport in ("sse", "streamable-http"):
+                await self._serve_http(transport, **transport_kwargs)
+            else:
+                await self.mcp.run_async(transport=transport, **transport_kwargs)
 
         except (ConnectionError, Exception) as e:
             logger.critical(f"💥 서버 설정 실패: {e}", exc_info=True)
             raise
         finally:
             await self.close_pool()
+            self.tracer.close()
+            if _embedding_service is not None:
+                _embedding_service.close()
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
@@ -387,22 +1582,40 @@ if __name__ == "__main__":
     )
 
     parser = argparse.ArgumentParser(description="MariaDB MCP Server")
-    parser.add_argument('--transport', type=str, default='stdio', choices=['stdio', 'sse'],
-                        help='MCP transport protocol (stdio or sse)')
+    parser.add_argument('--transport', type=str, default='stdio', choices=['stdio', 'sse', 'streamable-http'],
+                        help='MCP transport protocol (stdio, sse or streamable-http)')
     parser.add_argument('--host', type=str, default='127.0.0.1',
-                        help='Host for SSE transport')
+                        help='Host for HTTP transports')
     parser.add_argument('--port', type=int, default=9001,
-                        help='Port for SSE transport')
+                        help='Port for HTTP transports')
+    parser.add_argument('--workers', type=int, default=MCP_WORKERS,
+                        help='Worker processes sharing the port (streamable-http only)')
+    parser.add_argument('--uvloop', action=argparse.BooleanOptionalAction, default=MCP_UVLOOP,
+                        help='Run the event loop on uvloop if installed')
     args = parser.parse_args()
+    exit_code = 0
+
+    if args.workers > 1:
+        # N개의 워커 프로세스가 SO_REUSEPORT로 포트를 공유하고 연결 예산을 나눠 가짐
+        try:
+            exit_code = run_workers(args.workers, args.host, args.port, args.transport,
+                                    connection_budget=MCP_CONNECTION_BUDGET, use_uvloop=args.uvloop,
+                                    health_interval=MCP_WORKER_HEALTH_INTERVAL,
+                                    max_fast_failures=MCP_WORKER_MAX_FAST_FAILURES)
+        except Exception as e:
+            logger.critical(f"💥 워커 시작 실패: {e}", exc_info=True)
+            exit_code = 1
+        logger.info(f"🔚 서버가 종료 코드 {exit_code}로 종료됩니다.")
+        sys.exit(exit_code)
 
     # 1. Create the server instance
     server = MariaDBServer()
-    exit_code = 0
 
     try:
         # 2. Use anyio.run to manage the event loop and call the main async server logic
         anyio.run(
-            partial(server.run_async_server, transport=args.transport, host=args.host, port=args.port)
+            partial(server.run_async_server, transport=args.transport, host=args.host, port=args.port),
+            backend_options={"use_uvloop": resolve_uvloop(args.uvloop)}
         )
         logger.info("✅ 서버가 정상적으로 종료되었습니다.")
 
@@ -412,4 +1625,4 @@ if __name__ == "__main__":
          logger.critical(f"💥 서버 시작 실패 또는 크래시: {e}", exc_info=True)
          exit_code = 1
     finally:
-        logger.info(f"🔚 서버가 종료 코드 {exit_code}로 종료됩니다.")
\ No newline at end of file
+        logger.info(f"🔚 서버가 종료 코드 {exit_code}로 종료됩니다.")
@@ -0,0 +1,155 @@
+# streams.py
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import logger
+
+
+class ResultStream:
+    """
+    An open server-side (unbuffered) cursor that is paged through by continuation token.
+    Holds its pooled connection until it is exhausted, closed, or reclaimed as idle.
+    """
+    def __init__(self, conn, cursor, release: Callable[[Any], Awaitable[None]], database: Optional[str] = None):
+        self.token = secrets.token_urlsafe(16)
+        self.conn = conn
+        self.cursor = cursor
+        self.database = database
+        self.columns: List[str] = []
+        self.types: List[str] = []
+        self.converters: List[Any] = []
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.rows_fetched = 0
+        self.exhausted = False
+        self.closed = False
+        self._release = release
+        # 다음 페이지 존재 여부를 정확히 알기 위해 한 행을 미리 읽어 둠
+        self._lookahead: List[Any] = []
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+    async def fetch_page(self, page_size: int) -> List[Any]:
+        """Fetches up to page_size raw rows and updates the exhausted flag."""
+        self.touch()
+        rows = self._lookahead + list(await self.cursor.fetchmany(page_size + 1 - len(self._lookahead)) or [])
+        if len(rows) > page_size:
+            self._lookahead = rows[page_size:]
+            rows = rows[:page_size]
+        else:
+            self._lookahead = []
+            self.exhausted = True
+        self.rows_fetched += len(rows)
+        return rows
+
+    async def close(self) -> None:
+        """Releases the cursor and returns (or discards) the connection."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.exhausted:
+                await self.cursor.close()
+            else:
+                # 남은 행을 모두 읽어 버리는(drain) 대신 연결을 폐기 — 풀이 새 연결로 대체함
+                self.conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ 스트림 {self.token[:8]} 커서 종료 중 오류: {e}")
+            self.conn.close()
+        finally:
+            await self._release(self.conn)
+
+
+class StreamRegistry:
+    """
+    Tracks open ResultStreams by token and reclaims the ones left idle too long.
+    A slot is reserved before a stream's connection is acquired, so concurrent opens cannot exceed max_streams.
+    on_open/on_close are called when a stream is registered and when it leaves the registry.
+    """
+    def __init__(self, idle_timeout: float, max_streams: int, on_open: Optional[Callable[[], None]] = None,
+                 on_close: Optional[Callable[[], None]] = None):
+        self.idle_timeout = idle_timeout
+        self.max_streams = max_streams
+        self.on_open = on_open
+        self.on_close = on_close
+        self._streams: Dict[str, ResultStream] = {}
+        self._reserved = 0
+        self._reaper_task: Optional[asyncio.Task] = None
+        self.reclaimed_count = 0
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def is_full(self) -> bool:
+        return len(self._streams) + self._reserved >= self.max_streams
+
+    def reserve(self) -> bool:
+        """Claims a slot for a stream about to be opened; False if the registry is full."""
+        if self.is_full():
+            return False
+        self._reserved += 1
+        return True
+
+    def release_reservation(self) -> None:
+        """Returns a reserved slot, after the stream was registered with add() or failed to open."""
+        self._reserved -= 1
+
+    def add(self, stream: ResultStream) -> None:
+        self._streams[stream.token] = stream
+        if self.on_open is not None:
+            self.on_open()
+        self._ensure_reaper()
+
+    def get(self, token: str) -> Optional[ResultStream]:
+        return self._streams.get(token)
+
+    def _pop(self, token: str) -> Optional[ResultStream]:
+        stream = self._streams.pop(token, None)
+        if stream is not None and self.on_close is not None:
+            self.on_close()
+        return stream
+
+    def discard(self, token: str) -> None:
+        self._pop(token)
+
+    async def close(self, token: str) -> bool:
+        stream = self._pop(token)
+        if stream is None:
+            return False
+        async with stream.lock:
+            await stream.close()
+        return True
+
+    async def reap_idle(self) -> int:
+        """Closes streams idle longer than idle_timeout. Returns how many were reclaimed."""
+        now = time.monotonic()
+        expired = [t for t, s in self._streams.items()
+                   if not s.lock.locked() and now - s.last_used > self.idle_timeout]
+        for token in expired:
+            if await self.close(token):
+                self.reclaimed_count += 1
+                logger.info(f"♻️ 유휴 스트림 회수됨: {token[:8]}... (timeout: {self.idle_timeout}s)")
+        return len(expired)
+
+    async def close_all(self) -> None:
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        for token in list(self._streams):
+            await self.close(token)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"❌ 유휴 스트림 회수 중 오류: {e}", exc_info=True)
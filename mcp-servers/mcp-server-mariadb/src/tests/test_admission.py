@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+
+from admission import AdaptiveLane, AdmissionController, OverloadedError
+
+
+def make_lane(**overrides):
+    options = dict(min_limit=1, max_limit=2, target_latency=0.05, max_queue=1, max_wait=1.0)
+    options.update(overrides)
+    return AdaptiveLane("query", **options)
+
+
+class TestAdaptiveLane(unittest.IsolatedAsyncioTestCase):
+    async def test_queue_full_is_rejected_with_retry_hint(self):
+        controller = AdmissionController({"query": make_lane()})
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("query"):
+                await release.wait()
+
+        holders = [asyncio.create_task(hold()) for _ in range(3)]  # 2 running, 1 queued
+        await asyncio.sleep(0.01)
+        with self.assertRaises(OverloadedError) as ctx:
+            async with controller.admit("query"):
+                pass
+        self.assertGreater(ctx.exception.retry_after, 0)
+        self.assertIsInstance(ctx.exception, RuntimeError)
+        release.set()
+        await asyncio.gather(*holders)
+        lane = controller.lanes["query"]
+        self.assertEqual(lane.inflight, 0)
+        self.assertEqual(lane.stats["admitted"], 3)
+        self.assertEqual(lane.stats["rejected_queue_full"], 1)
+
+    async def test_wait_timeout(self):
+        lane = make_lane(max_limit=1, max_wait=0.02)
+        await lane.acquire()
+        with self.assertRaises(OverloadedError):
+            await lane.acquire()
+        lane.release(0.0)
+        self.assertEqual(lane.inflight, 0)
+        self.assertEqual(lane.stats["rejected_wait_timeout"], 1)
+
+    async def test_aimd_adjusts_limit(self):
+        lane = make_lane(max_limit=10, target_latency=0.05)
+        await lane.acquire()
+        lane.release(1.0)  # 느린 완료 → 곱셈 감소
+        self.assertLess(lane.limit, 10)
+        reduced = lane.limit
+        for _ in range(20):
+            await lane.acquire()
+            lane.release(0.001)  # 빠른 완료 → 덧셈 증가
+        self.assertGreater(lane.limit, reduced)
+
+    async def test_held_slots_count_against_limit(self):
+        lane = make_lane(max_limit=2, max_wait=1.0)
+        lane.hold()  # 열린 스트림이 연결을 쥐고 있음
+        await lane.acquire()
+        waiter = asyncio.create_task(lane.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        self.assertEqual(lane.snapshot()["held"], 1)
+        # 스트림이 닫히면 대기 중인 요청이 바로 슬롯을 받음
+        lane.release_hold()
+        await asyncio.wait_for(waiter, 0.5)
+        self.assertEqual((lane.inflight, lane.held), (2, 0))
+
+    async def test_held_streams_do_not_starve_calls_at_min_limit(self):
+        lane = make_lane(min_limit=1, max_limit=4, max_wait=0.2)
+        lane.limit = 1.0  # 느린 완료로 최소 한도까지 줄어든 상태
+        lane.hold()
+        lane.hold()
+        # 스트림이 한도 이상을 쥐고 있어도 호출 하나는 바로 입장
+        self.assertEqual(await lane.acquire(), 0.0)
+        waiter = asyncio.create_task(lane.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        lane.release(0.001)  # 빠른 완료 → 한도가 다시 증가
+        await asyncio.wait_for(waiter, 0.5)
+        self.assertGreater(lane.limit, 1.0)
+        lane.release(0.001)
+        self.assertEqual((lane.inflight, lane.held), (0, 2))
+
+    async def test_disabled_controller_admits_everything(self):
+        controller = AdmissionController({"query": make_lane(max_limit=1, max_queue=0)}, enabled=False)
+        async with controller.admit("query"):
+            async with controller.admit("query"):
+                pass
+
+if __name__ == "__main__":
+    unittest.main()
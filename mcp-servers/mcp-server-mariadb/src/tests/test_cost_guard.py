@@ -0,0 +1,84 @@
+import unittest
+import json
+
+from cost_guard import CostGuard, QueryCostError, assess_plan
+
+# MariaDB EXPLAIN FORMAT=JSON: 두 테이블을 조인 조건 없이 조인 (조인 버퍼 사용)
+CARTESIAN_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "nested_loop": [
+            {"table": {"table_name": "orders", "access_type": "ALL", "rows": 20000, "filtered": 100}},
+            {"block-nested-loop": {
+                "table": {"table_name": "customers", "access_type": "ALL", "rows": 500, "filtered": 100},
+                "buffer_type": "flat", "join_type": "BNL",
+            }},
+        ],
+    }
+}
+
+INDEXED_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "table": {"table_name": "orders", "access_type": "ref", "key": "idx_customer", "rows": 12, "filtered": 100},
+    }
+}
+
+
+class TestAssessPlan(unittest.TestCase):
+    def test_join_multiplies_rows_and_reports_scans(self):
+        assessment = assess_plan(CARTESIAN_PLAN)
+        self.assertEqual(assessment["estimated_rows_examined"], 20000 + 20000 * 500)
+        self.assertEqual([s["table"] for s in assessment["full_scans"]], ["orders", "customers"])
+        self.assertEqual(assessment["unindexed_joins"], ["customers"])
+
+    def test_indexed_lookup(self):
+        assessment = assess_plan(INDEXED_PLAN)
+        self.assertEqual(assessment["estimated_rows_examined"], 12)
+        self.assertEqual(assessment["full_scans"], [])
+
+
+class TestCostGuard(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.explains = []
+
+    async def explain(self, explain_sql):
+        self.explains.append(explain_sql)
+        return json.dumps(CARTESIAN_PLAN)
+
+    async def test_reject_mode_raises_with_narrowing_advice(self):
+        guard = CostGuard("reject", max_rows=100000, cache_ttl=60)
+        with self.assertRaises(QueryCostError) as ctx:
+            await guard.check("SELECT * FROM orders, customers", "shop", self.explain)
+        self.assertIn("customers", str(ctx.exception))
+        self.assertIn("join conditions", str(ctx.exception))
+        self.assertIsInstance(ctx.exception, ValueError)
+        self.assertEqual(self.explains, ["EXPLAIN FORMAT=JSON SELECT * FROM orders, customers"])
+
+    async def test_warn_mode_uses_plan_cache_per_fingerprint(self):
+        guard = CostGuard("warn", max_rows=100000, cache_ttl=60)
+        first = await guard.check("SELECT * FROM orders, customers WHERE orders.total > 10", "shop", self.explain)
+        second = await guard.check("SELECT * FROM orders, customers WHERE orders.total > 99", "shop", self.explain)
+        self.assertEqual(first["estimated_rows_examined"], second["estimated_rows_examined"])
+        self.assertIn("message", first)
+        self.assertEqual(len(self.explains), 1)
+        self.assertEqual(guard.stats["plan_cache_hits"], 1)
+        self.assertEqual(guard.stats["warnings"], 2)
+
+    async def test_skips_non_select_and_explain_errors(self):
+        async def failing(explain_sql):
+            raise RuntimeError("syntax error")
+
+        guard = CostGuard("reject", max_rows=1, cache_ttl=60)
+        self.assertIsNone(await guard.check("SHOW TABLES", "shop", self.explain))
+        self.assertIsNone(await guard.check("SELECT * FROM", "shop", failing))
+        self.assertEqual(guard.stats["explain_errors"], 1)
+        self.assertEqual(self.explains, [])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            CostGuard("block", max_rows=1, cache_ttl=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
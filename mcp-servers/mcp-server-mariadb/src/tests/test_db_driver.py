@@ -0,0 +1,29 @@
+import unittest
+from types import SimpleNamespace
+
+from db_driver import AiomysqlDriver, AsyncmyDriver, DatabaseDriver
+
+
+class TestDriverEndpoint(unittest.TestCase):
+    # 드라이버 라이브러리 없이 endpoint만 확인 (__init__은 모듈을 import하므로 생략)
+    def test_aiomysql_public_attributes(self):
+        driver = AiomysqlDriver.__new__(AiomysqlDriver)
+        self.assertEqual(driver.endpoint(SimpleNamespace(host="replica-1", port=3307)), ("replica-1", 3307))
+
+    def test_asyncmy_private_attributes(self):
+        driver = AsyncmyDriver.__new__(AsyncmyDriver)
+        self.assertEqual(driver.endpoint(SimpleNamespace(_host="replica-2", _port="3308")), ("replica-2", 3308))
+        self.assertIsNone(driver.endpoint(SimpleNamespace()))
+
+
+class TestDriverInterface(unittest.TestCase):
+    def test_cursor_is_abstract(self):
+        class NoCursorDriver(DatabaseDriver):
+            module_name = "json"
+
+        with self.assertRaises(TypeError):
+            NoCursorDriver()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import tempfile
+
+from embedding_cache import EmbeddingCache
+from embeddings import EmbeddingService
+from gemini_batch import EmbeddingBatchError
+
+
+class TestEmbeddingCache(unittest.IsolatedAsyncioTestCase):
+    async def test_memory_lru(self):
+        cache = EmbeddingCache(memory_entries=2)
+        await cache.put_many("openai", "m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+        self.assertEqual(await cache.get_many("openai", "m", ["a", "b", "c"]), [None, [2.0], [3.0]])
+        self.assertEqual(await cache.get_many("openai", "other-model", ["c"]), [None])
+        self.assertEqual(cache.stats["memory_hits"], 2)
+        self.assertEqual(cache.stats["misses"], 2)
+
+    async def test_disk_store_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "embeddings.sqlite3")
+            cache = EmbeddingCache(path, memory_entries=10)
+            await cache.put_many("gemini", "m", ["hello", "world"], [[0.5, 0.25], [1.5, -2.0]])
+            cache.close()
+
+            reopened = EmbeddingCache(path, memory_entries=10)
+            try:
+                result = await reopened.get_many("gemini", "m", ["world", "new", "hello"])
+                self.assertEqual(result, [[1.5, -2.0], None, [0.5, 0.25]])
+                self.assertEqual(reopened.stats["disk_hits"], 2)
+                self.assertEqual(reopened.stats["provider_calls_saved"], 0)
+                # 디스크에서 읽은 항목은 메모리 LRU로 승격
+                await reopened.get_many("gemini", "m", ["hello", "world"])
+                self.assertEqual(reopened.stats["memory_hits"], 2)
+                self.assertEqual(reopened.stats["provider_calls_saved"], 1)
+                self.assertAlmostEqual(reopened.snapshot()["hit_ratio"], 0.8)
+            finally:
+                reopened.close()
+
+    async def test_unusable_disk_path_falls_back_to_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blocker = os.path.join(tmp, "not-a-directory")
+            open(blocker, "w").close()
+            # 상위 경로가 일반 파일이라 디렉터리 생성(mkdir)이 OSError로 실패
+            cache = EmbeddingCache(os.path.join(blocker, "embeddings.sqlite3"), memory_entries=10)
+            try:
+                await cache.put_many("openai", "m", ["a"], [[1.0]])
+                self.assertFalse(cache.disk_enabled)
+                self.assertEqual(cache.stats["disk_errors"], 1)
+                # 이후 호출은 디스크를 건드리지 않고 메모리 캐시로 동작
+                self.assertEqual(await cache.get_many("openai", "m", ["a", "b"]), [[1.0], None])
+                await cache.put_many("openai", "m", ["b"], [[2.0]])
+                self.assertEqual(cache.stats["disk_errors"], 1)
+                self.assertFalse(cache.snapshot()["disk_enabled"])
+            finally:
+                cache.close()
+
+
+class TestEmbeddingServiceCache(unittest.IsolatedAsyncioTestCase):
+    def make_service(self, cache):
+        service = EmbeddingService.__new__(EmbeddingService)
+        service.provider = "gemini"
+        service.allowed_models = ["m"]
+        service.default_model = "m"
+        service.cache = cache
+        service.provider_calls = []
+
+        async def embed_with_provider(texts, target_model):
+            service.provider_calls.append(list(texts))
+            errors = {index: "RuntimeError: invalid content" for index, t in enumerate(texts) if t.startswith("bad")}
+            if errors:
+                raise EmbeddingBatchError(errors, len(texts))
+            return [[float(len(t))] for t in texts]
+
+        service._embed_with_provider = embed_with_provider
+        return service
+
+    async def test_batch_error_indexes_refer_to_caller_texts(self):
+        cache = EmbeddingCache(memory_entries=10)
+        await cache.put_many("gemini", "m", ["a", "b"], [[1.0], [2.0]])
+        service = self.make_service(cache)
+
+        texts = ["a", "bad1", "b", "ok", "bad2", "bad1"]
+        with self.assertRaises(EmbeddingBatchError) as raised:
+            await service.embed(texts)
+        # 공급자는 캐시 미스만 받음: ["bad1", "ok", "bad2"] -> 오류 위치 0, 2
+        self.assertEqual(service.provider_calls, [["bad1", "ok", "bad2"]])
+        self.assertEqual(raised.exception.errors, {1: "RuntimeError: invalid content", 4: "RuntimeError: invalid content",
+                                                   5: "RuntimeError: invalid content"})
+        self.assertEqual(raised.exception.total, len(texts))
+
+    async def test_partially_cached_batch(self):
+        cache = EmbeddingCache(memory_entries=10)
+        await cache.put_many("gemini", "m", ["a"], [[9.0]])
+        service = self.make_service(cache)
+        self.assertEqual(await service.embed(["abc", "a", "abc"]), [[3.0], [9.0], [3.0]])
+        self.assertEqual(service.provider_calls, [["abc"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import threading
+import time
+
+from gemini_batch import EmbeddingBatchError, GeminiBatcher, parse_gemini_vectors
+
+
+class FakeGemini:
+    """embed_content stand-in: a list of contents returns one vector per text; 'bad' texts fail."""
+    def __init__(self, supports_lists=True):
+        self.supports_lists = supports_lists
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, model, content):
+        with self.lock:
+            self.calls.append(content)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            texts = content if isinstance(content, list) else [content]
+            if isinstance(content, list) and not self.supports_lists:
+                raise TypeError("content must be a string")
+            if "bad" in texts:
+                raise RuntimeError("invalid content")
+            vectors = [[float(len(t))] for t in texts]
+            return {"embedding": vectors if isinstance(content, list) else vectors[0]}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestParseGeminiVectors(unittest.TestCase):
+    def test_single_and_batched_results(self):
+        self.assertEqual(parse_gemini_vectors({"embedding": [0.1, 0.2]}, 1), [[0.1, 0.2]])
+        self.assertEqual(parse_gemini_vectors({"embedding": [[1.0], [2.0]]}, 2), [[1.0], [2.0]])
+        with self.assertRaises(ValueError):
+            parse_gemini_vectors({"embedding": [[1.0]]}, 2)
+
+
+class TestGeminiBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_batches_keep_order_and_bound_concurrency(self):
+        fake = FakeGemini()
+        batcher = GeminiBatcher(fake, batch_size=3, concurrency=2)
+        try:
+            texts = ["x" * n for n in range(1, 11)]
+            result = await batcher.embed(texts, "models/text-embedding-004")
+        finally:
+            batcher.close()
+        self.assertEqual(result, [[float(n)] for n in range(1, 11)])
+        self.assertEqual(len(fake.calls), 4)
+        self.assertLessEqual(fake.max_active, 2)
+
+    async def test_failed_batch_is_retried_per_item(self):
+        fake = FakeGemini()
+        batcher = GeminiBatcher(fake, batch_size=10, concurrency=4)
+        try:
+            with self.assertRaises(EmbeddingBatchError) as ctx:
+                await batcher.embed(["a", "bad", "ccc"], "models/text-embedding-004")
+        finally:
+            batcher.close()
+        self.assertEqual(list(ctx.exception.errors), [1])
+        self.assertEqual(batcher.stats["batch_fallbacks"], 1)
+        self.assertEqual(batcher.stats["item_requests"], 3)
+
+    async def test_sdk_without_list_support_disables_batching(self):
+        fake = FakeGemini(supports_lists=False)
+        batcher = GeminiBatcher(fake, batch_size=10, concurrency=4)
+        try:
+            self.assertEqual(await batcher.embed(["a", "bb"], "m"), [[1.0], [2.0]])
+            self.assertFalse(batcher.batching)
+            await batcher.embed(["a", "bb"], "m")
+        finally:
+            batcher.close()
+        self.assertEqual(batcher.stats["batch_requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
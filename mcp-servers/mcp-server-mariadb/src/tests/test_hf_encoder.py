@@ -0,0 +1,112 @@
+import unittest
+import sys
+import threading
+import types
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import hf_encoder
+from hf_encoder import HuggingFaceEncoder, split_chunks
+
+
+class FakeArray(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeModel:
+    def __init__(self):
+        self.threads = set()
+
+    def encode(self, texts):
+        self.threads.add(threading.get_ident())
+        return FakeArray([[float(len(t))] for t in texts])
+
+
+class TestSplitChunks(unittest.TestCase):
+    def test_offsets_and_order(self):
+        chunks = split_chunks(["a", "b", "c", "d", "e"], 2)
+        self.assertEqual(chunks, [(0, ["a", "b"]), (2, ["c", "d"]), (4, ["e"])])
+
+
+class TestHuggingFaceEncoder(unittest.IsolatedAsyncioTestCase):
+    async def test_encode_runs_off_the_event_loop(self):
+        encoder = HuggingFaceEncoder(threads=1)
+        model = FakeModel()
+        try:
+            result = await encoder.encode(model, "fake", ["a", "bb", "ccc"])
+        finally:
+            encoder.close()
+        self.assertEqual(result, [[1.0], [2.0], [3.0]])
+        self.assertNotIn(threading.get_ident(), model.threads)
+        self.assertEqual(encoder.stats["thread_calls"], 1)
+
+    async def test_small_batches_skip_processes(self):
+        encoder = HuggingFaceEncoder(processes=2, min_batch=10)
+        try:
+            await encoder.encode(FakeModel(), "fake", ["a"] * 3)
+        finally:
+            encoder.close()
+        self.assertEqual(encoder.stats["process_calls"], 0)
+        self.assertFalse(encoder.snapshot()["process_pool_started"])
+
+    async def test_process_batches_do_not_load_the_model_here(self):
+        encoder = HuggingFaceEncoder(processes=2, min_batch=2)
+        loads = []
+
+        async def load_model():
+            loads.append(1)
+            return FakeModel()
+
+        async def encode_in_processes(model_name, texts):
+            return [[0.0] for _ in texts]
+
+        try:
+            with patch.object(encoder, "_encode_in_processes", encode_in_processes):
+                await encoder.encode(None, "other", ["a", "b", "c"], load_model=load_model)
+                self.assertEqual(loads, [])
+                # 작은 배치는 이 프로세스의 스레드에서 처리하므로 그때 로드
+                await encoder.encode(None, "other", ["a"], load_model=load_model)
+                self.assertEqual(loads, [1])
+        finally:
+            encoder.close()
+
+    async def test_broken_process_pool_falls_back_to_loading_the_model(self):
+        encoder = HuggingFaceEncoder(processes=2, min_batch=2)
+
+        async def load_model():
+            return FakeModel()
+
+        async def encode_in_processes(model_name, texts):
+            raise BrokenProcessPool("worker died")
+
+        try:
+            with patch.object(encoder, "_encode_in_processes", encode_in_processes):
+                result = await encoder.encode(None, "other", ["a", "bb"], load_model=load_model)
+        finally:
+            encoder.close()
+        self.assertEqual(result, [[1.0], [2.0]])
+        self.assertEqual(encoder.stats["process_fallbacks"], 1)
+
+
+class TestWorkerModels(unittest.TestCase):
+    def test_worker_keeps_only_the_latest_model(self):
+        loaded = []
+
+        class SentenceTransformer(FakeModel):
+            def __init__(self, name):
+                super().__init__()
+                loaded.append(name)
+
+        module = types.ModuleType("sentence_transformers")
+        module.SentenceTransformer = SentenceTransformer
+        with patch.dict(sys.modules, {"sentence_transformers": module}), patch.dict(hf_encoder._worker_models, clear=True):
+            hf_encoder._encode_chunk("m1", ["a"])
+            hf_encoder._encode_chunk("m1", ["b"])
+            self.assertEqual(loaded, ["m1"])
+            self.assertEqual(hf_encoder._encode_chunk("m2", ["cc"]), [[2.0]])
+            self.assertEqual(list(hf_encoder._worker_models), ["m2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import logging
+import queue
+import sys
+
+from config import DeferredQueueHandler, SampledLogFilter
+
+
+def make_record(level=logging.INFO, created=1000.0):
+    record = logging.LogRecord("config.query", level, __file__, 1, "rows: %s", (3,), None)
+    record.created = created
+    return record
+
+
+class TestSampledLogFilter(unittest.TestCase):
+    def test_rate_limit_per_second(self):
+        log_filter = SampledLogFilter(max_per_second=2)
+        passed = [log_filter.filter(make_record(created=1000.1 + i * 0.1)) for i in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        self.assertTrue(log_filter.filter(make_record(created=1001.0)))  # 다음 1초 구간
+        self.assertEqual(log_filter.dropped, 3)
+
+    def test_warnings_are_never_dropped(self):
+        log_filter = SampledLogFilter(sample_rate=0.0, max_per_second=1)
+        self.assertFalse(log_filter.filter(make_record()))
+        self.assertTrue(log_filter.filter(make_record(level=logging.WARNING)))
+        self.assertTrue(log_filter.filter(make_record(level=logging.ERROR)))
+
+
+class TestDeferredQueueHandler(unittest.TestCase):
+    def test_message_is_merged_before_enqueueing(self):
+        log_queue = queue.SimpleQueue()
+        rows = [1, 2]
+        record = logging.LogRecord("config.query", logging.INFO, __file__, 1, "rows: %s", (rows,), None)
+        DeferredQueueHandler(log_queue).handle(record)
+        rows.append(3)  # 기록 이후 인자가 바뀌어도 메시지는 호출 시점 값
+        queued = log_queue.get_nowait()
+        self.assertEqual((queued.msg, queued.args), ("rows: [1, 2]", None))
+        self.assertEqual(queued.getMessage(), "rows: [1, 2]")
+        # 줄 포맷(시간, 로거 이름 등)은 리스너가 적용
+        self.assertNotIn("INFO", queued.getMessage())
+
+    def test_traceback_is_cached_before_enqueueing(self):
+        log_queue = queue.SimpleQueue()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("config", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        DeferredQueueHandler(log_queue).handle(record)
+        queued = log_queue.get_nowait()
+        self.assertIsNone(queued.exc_info)
+        self.assertIn("ValueError: boom", queued.exc_text)
+        self.assertIn("ValueError: boom", logging.Formatter().format(queued))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from metrics import MetricsRegistry, TOOL_CALLS, TOOL_DURATION, TOOL_ERRORS, instrumented, merge_families
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_openmetrics_exposition(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("demo_calls", "Calls.", ("tool",))
+        latency = registry.histogram("demo_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+        registry.gauge("demo_free", "Free.", ("state",), lambda: [(("free",), 3)])
+        calls.inc(tool='say "hi"')
+        latency.observe(0.05, tool="a")
+        latency.observe(0.5, tool="a")
+        latency.observe(2.0, tool="a")
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE demo_calls counter", lines)
+        self.assertIn('demo_calls_total{tool="say \\"hi\\""} 1', lines)
+        self.assertIn('demo_seconds_bucket{tool="a",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{tool="a",le="1"} 2', lines)
+        self.assertIn('demo_seconds_bucket{tool="a",le="+Inf"} 3', lines)
+        self.assertIn('demo_seconds_count{tool="a"} 3', lines)
+        self.assertIn('demo_seconds_sum{tool="a"} 2.55', lines)
+        self.assertIn('demo_free{state="free"} 3', lines)
+        self.assertEqual(lines[-1], "# EOF")
+
+    def test_worker_families_are_merged_under_one_header(self):
+        registries = [MetricsRegistry(), MetricsRegistry()]
+        for worker, registry in enumerate(registries):
+            registry.counter("demo_calls", "Calls.", ("tool",)).inc(worker + 1, tool="a")
+        lines = merge_families([r.families({"worker": i}) for i, r in enumerate(registries)]).splitlines()
+        self.assertEqual(lines.count("# TYPE demo_calls counter"), 1)
+        self.assertIn('demo_calls_total{tool="a",worker="0"} 1', lines)
+        self.assertIn('demo_calls_total{tool="a",worker="1"} 2', lines)
+        self.assertEqual(lines[-1], "# EOF")
+
+
+class TestInstrumented(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_calls_and_errors(self):
+        @instrumented
+        async def demo_tool(fail: bool = False):
+            if fail:
+                raise PermissionError("nope")
+            return "ok"
+
+        self.assertEqual(await demo_tool(), "ok")
+        with self.assertRaises(PermissionError):
+            await demo_tool(fail=True)
+        self.assertEqual(TOOL_CALLS.value(tool="demo_tool", status="ok"), 1)
+        self.assertEqual(TOOL_CALLS.value(tool="demo_tool", status="error"), 1)
+        self.assertEqual(TOOL_ERRORS.value(tool="demo_tool", exception="PermissionError"), 1)
+        self.assertEqual(TOOL_DURATION.count(tool="demo_tool"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
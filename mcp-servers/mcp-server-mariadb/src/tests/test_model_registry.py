@@ -0,0 +1,48 @@
+import unittest
+import asyncio
+
+from model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.IsolatedAsyncioTestCase):
+    def make_registry(self, budget=100):
+        self.loaded = []
+
+        async def loader(name):
+            self.loaded.append(name)
+            await asyncio.sleep(0.01)
+            if name == "broken":
+                raise OSError("no such model")
+            return {"name": name}
+
+        return ModelRegistry(loader, memory_budget=budget, size_of=lambda model: 40)
+
+    async def test_concurrent_callers_share_one_load(self):
+        registry = self.make_registry()
+        models = await asyncio.gather(*(registry.get("a") for _ in range(5)))
+        self.assertEqual(self.loaded, ["a"])
+        self.assertTrue(all(m is models[0] for m in models))
+        await registry.get("a")
+        self.assertEqual((registry.stats["loads"], registry.stats["shared_loads"], registry.stats["hits"]), (1, 4, 1))
+
+    async def test_lru_eviction_keeps_pinned_models(self):
+        registry = self.make_registry(budget=100)
+        registry.add("default", {"name": "default"}, pinned=True)
+        await registry.get("a")
+        await registry.get("b")  # 120 > 100: a is evicted, default is pinned
+        self.assertNotIn("a", registry)
+        self.assertIn("default", registry)
+        self.assertEqual(registry.stats["evictions"], 1)
+        self.assertEqual(registry.memory_used, 80)
+
+    async def test_failed_load_is_retried(self):
+        registry = self.make_registry()
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                await registry.get("broken")
+        self.assertEqual(registry.stats["load_failures"], 2)
+        self.assertEqual(registry.snapshot()["loading"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
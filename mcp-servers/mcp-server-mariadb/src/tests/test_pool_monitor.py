@@ -0,0 +1,40 @@
+import unittest
+
+from pool_monitor import PoolMonitor
+
+
+class FakeConn:
+    pass
+
+
+class TestPoolMonitor(unittest.TestCase):
+    def test_recycle_by_age(self):
+        monitor = PoolMonitor(max_age=10, ping_after_idle=5)
+        conn = FakeConn()
+        self.assertFalse(monitor.needs_recycle(conn, 100.0))
+        self.assertFalse(monitor.needs_recycle(conn, 105.0))
+        self.assertTrue(monitor.needs_recycle(conn, 111.0))
+        self.assertFalse(PoolMonitor(max_age=0, ping_after_idle=5).needs_recycle(conn, 1e9))
+
+    def test_ping_only_after_idle(self):
+        monitor = PoolMonitor(max_age=0, ping_after_idle=5)
+        conn = FakeConn()
+        self.assertFalse(monitor.needs_ping(conn, 0.0))  # 처음 획득한 연결은 방금 열린 것
+        monitor.mark_released(conn)
+        last_used = monitor._last_used[conn]
+        self.assertFalse(monitor.needs_ping(conn, last_used + 1))
+        self.assertTrue(monitor.needs_ping(conn, last_used + 6))
+        self.assertFalse(PoolMonitor(max_age=0, ping_after_idle=-1).needs_ping(conn, last_used + 600))
+
+    def test_acquire_histogram(self):
+        monitor = PoolMonitor(max_age=0, ping_after_idle=-1)
+        for ms in (0.5, 3, 3, 7000):
+            monitor.record_acquire(ms)
+        histogram = monitor.histogram()
+        self.assertEqual(histogram["le_1ms"], 1)
+        self.assertEqual(histogram["le_5ms"], 2)
+        self.assertEqual(histogram["gt_5000ms"], 1)
+        self.assertEqual(monitor.snapshot()["acquire_count"], 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import asyncio
+
+from query_cache import QueryResultCache, normalize_sql, is_cacheable, referenced_tables
+from result_format import ResultSet
+
+
+def make_result(value=1):
+    return ResultSet(['n'], ['int'], [(value,)])
+
+
+class TestQueryClassification(unittest.TestCase):
+    def test_normalize_keeps_literals(self):
+        self.assertEqual(normalize_sql("SELECT  *\n FROM t WHERE a = 'x  y';"), "SELECT * FROM t WHERE a = 'x  y'")
+
+    def test_is_cacheable(self):
+        self.assertTrue(is_cacheable("select * from t where name = 'now()'"))
+        self.assertFalse(is_cacheable("SELECT NOW()"))
+        self.assertFalse(is_cacheable("SELECT * FROM t FOR UPDATE"))
+        self.assertFalse(is_cacheable("SHOW TABLES"))
+
+    def test_referenced_tables(self):
+        sql = "SELECT * FROM a AS x, `c` JOIN other.b ON x.id = b.id WHERE x.v IN (SELECT v FROM d)"
+        self.assertEqual(referenced_tables(sql, 'db'),
+                         [('db', 'a'), ('db', 'c'), ('other', 'b'), ('db', 'd')])
+
+
+class TestQueryResultCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = QueryResultCache(ttl=60, max_bytes=10_000, validate_interval=0)
+        self.versions = {('db', 't'): ('2024-01-01', None)}
+        self.loads = 0
+
+    async def fetch_versions(self, tables):
+        return dict(self.versions)
+
+    async def loader(self):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return make_result(self.loads)
+
+    async def get(self, sql="SELECT * FROM t"):
+        key = self.cache.make_key('db', sql, None)
+        return await self.cache.get_or_load(key, [('db', 't')], self.loader, self.fetch_versions)
+
+    async def test_concurrent_identical_queries_share_one_execution(self):
+        results = await asyncio.gather(*(self.get() for _ in range(5)))
+        self.assertEqual(self.loads, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(self.cache.stats['coalesced'], 4)
+
+    async def test_hit_and_update_time_invalidation(self):
+        await self.get()
+        await self.get()
+        self.assertEqual((self.loads, self.cache.stats['hits']), (1, 1))
+        self.versions[('db', 't')] = ('2024-01-01', '2024-06-01 10:00:00')
+        await self.get()
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(self.cache.stats['invalidations'], 1)
+
+    async def test_lru_eviction_under_byte_budget(self):
+        self.cache = QueryResultCache(ttl=60, max_bytes=200, validate_interval=60)
+        for i in range(20):
+            await self.get(f"SELECT * FROM t WHERE id = {i}")
+        self.assertLessEqual(self.cache.current_bytes, 200)
+        self.assertGreater(self.cache.stats['evictions'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
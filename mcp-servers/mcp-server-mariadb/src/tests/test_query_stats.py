@@ -0,0 +1,56 @@
+import unittest
+
+from query_stats import QueryStats, fingerprint
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_literals_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t1 WHERE id = 5 AND name = 'bob' AND x IN (1, 2, 3) -- note"),
+            "SELECT * FROM t1 WHERE id = ? AND name = ? AND x IN (...)",
+        )
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a = %s AND b IN (%s,%s);"),
+                         "SELECT * FROM t WHERE a = ? AND b IN (...)")
+
+    def test_quotes_inside_comments_and_comment_markers_inside_strings(self):
+        self.assertEqual(fingerprint("SELECT a FROM t -- don't\nWHERE id = 5 AND name = 'x'"),
+                         "SELECT a FROM t WHERE id = ? AND name = ?")
+        self.assertNotEqual(fingerprint("SELECT a FROM t -- don't\nWHERE id = 5"),
+                            fingerprint("SELECT a FROM t -- don't\nWHERE other = 5"))
+        self.assertEqual(fingerprint("SELECT a FROM t /* it's */ WHERE b = '-- not a comment' AND c = 1"),
+                         "SELECT a FROM t WHERE b = ? AND c = ?")
+        self.assertEqual(fingerprint("SELECT `it's` FROM t WHERE d = 'x'"), "SELECT `it's` FROM t WHERE d = ?")
+
+    def test_same_shape_shares_fingerprint(self):
+        self.assertEqual(fingerprint("select a from b where c = 1"), fingerprint("select  a from b\nwhere c = 42"))
+
+
+class TestQueryStats(unittest.TestCase):
+    def test_record_and_percentiles(self):
+        stats = QueryStats(max_entries=10, sample_size=200)
+        for i in range(1, 101):
+            stats.record(f"SELECT * FROM t WHERE id = {i}", float(i), rows=2)
+        stats.record("SELECT * FROM t WHERE id = 0", 5.0, error=True)
+        [entry] = stats.top()
+        self.assertEqual(entry['calls'], 101)
+        self.assertEqual(entry['errors'], 1)
+        self.assertEqual(entry['rows'], 200)
+        self.assertEqual(entry['p50_ms'], 50.0)
+        self.assertEqual(entry['p99_ms'], 99.0)
+        self.assertEqual(entry['max_ms'], 100.0)
+
+    def test_bounded_and_ordered(self):
+        stats = QueryStats(max_entries=2)
+        stats.record("SELECT a FROM t", 1.0)
+        stats.record("SELECT b FROM t", 10.0)
+        stats.record("SELECT c FROM t", 5.0)
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats.evicted, 1)
+        self.assertEqual([e['query'] for e in stats.top(order_by='max_ms')], ["SELECT b FROM t", "SELECT c FROM t"])
+        with self.assertRaises(ValueError):
+            stats.top(order_by='nope')
+        self.assertEqual(stats.reset(), 2)
+        self.assertEqual(len(stats), 0)
+
+if __name__ == "__main__":
+    unittest.main()
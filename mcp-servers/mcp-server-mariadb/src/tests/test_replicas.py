@@ -0,0 +1,97 @@
+import unittest
+from contextlib import asynccontextmanager
+
+from replicas import ReplicaRouter, parse_replica_hosts
+
+
+class FakePool:
+    def __init__(self, size, free, maxsize=10):
+        self.size, self.freesize, self.maxsize = size, free, maxsize
+
+
+class TestReplicaRouting(unittest.TestCase):
+    def test_parse_hosts(self):
+        self.assertEqual(parse_replica_hosts("r1:3307, r2 ,", 3306), [("r1", 3307), ("r2", 3306)])
+        self.assertEqual(parse_replica_hosts("", 3306), [])
+
+    def test_pick_least_loaded_healthy_replica(self):
+        router = ReplicaRouter(None, [("r1", 3306), ("r2", 3306), ("r3", 3306)], max_lag=5, poll_interval=5, pool_options={})
+        r1, r2, r3 = router.replicas
+        r1.pool, r2.pool, r3.pool = FakePool(6, 1), FakePool(4, 2), FakePool(1, 1)
+        r1.healthy = r2.healthy = True  # r3는 지연 초과로 제외된 상태
+        self.assertIs(router.pick(), r2)
+        r2.acquiring = 4
+        self.assertIs(router.pick(), r1)
+
+    def test_falls_back_to_primary(self):
+        router = ReplicaRouter(None, [("r1", 3306)], max_lag=5, poll_interval=5, pool_options={})
+        router.replicas[0].pool = FakePool(0, 0)
+        self.assertIsNone(router.pick())
+        self.assertEqual(router.fallbacks, 1)
+        router.replicas[0].healthy = True
+        router.mark_failed(router.replicas[0], RuntimeError("gone"))
+        self.assertIsNone(router.pick())
+
+class FakeStatusCursor:
+    def __init__(self, status):
+        self.status = status
+        self.description = [(name,) for name in status] if status else None
+
+    async def execute(self, sql):
+        pass
+
+    async def fetchone(self):
+        return tuple(self.status.values()) if self.status else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeStatusDriver:
+    def __init__(self, status):
+        self.status = status
+
+    async def create_pool(self, host, port, **options):
+        @asynccontextmanager
+        async def acquire():
+            yield object()
+        pool = FakePool(1, 1)
+        pool.acquire = acquire
+        return pool
+
+    async def cursor(self, conn):
+        return FakeStatusCursor(self.status)
+
+
+class TestReplicaHealth(unittest.IsolatedAsyncioTestCase):
+    def make_router(self, status, **options):
+        return ReplicaRouter(FakeStatusDriver(status), [("r1", 3306)], max_lag=5, poll_interval=5,
+                             pool_options={}, **options)
+
+    async def test_lag_within_limit_is_healthy(self):
+        router = self.make_router({"Slave_IO_Running": "Yes", "Slave_SQL_Running": "Yes", "Seconds_Behind_Master": 2})
+        await router.poll_once()
+        replica = router.replicas[0]
+        self.assertTrue(replica.healthy)
+        self.assertEqual(replica.lag, 2.0)
+
+    async def test_empty_slave_status_is_unhealthy(self):
+        router = self.make_router(None)
+        await router.poll_once()
+        replica = router.replicas[0]
+        # 복제 정보가 없는 호스트(잘못된 주소, primary 등)는 지연을 알 수 없으므로 제외
+        self.assertFalse(replica.healthy)
+        self.assertIn("no replication", replica.last_error)
+        self.assertIsNone(router.pick())
+
+    async def test_empty_slave_status_can_be_allowed(self):
+        router = self.make_router(None, allow_unreplicated=True)
+        await router.poll_once()
+        self.assertTrue(router.replicas[0].healthy)
+        self.assertIsNone(router.replicas[0].lag)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import datetime
+import json
+from decimal import Decimal
+
+from result_format import ResultSet, validate_output_format, compile_converters, apply_converters, estimate_json_bytes
+
+
+class FakeCursor:
+    description = [('id', 3), ('created', 12), ('id', 3), ('payload', 252)]
+
+
+class TestResultFormat(unittest.TestCase):
+    def setUp(self):
+        rows = [(1, datetime.datetime(2024, 1, 2, 3, 4, 5), 10, b'abc'),
+                (2, None, 20, None)]
+        self.result = ResultSet.from_cursor(FakeCursor(), rows)
+
+    def test_to_dicts_keeps_row_shape(self):
+        dicts = self.result.to_dicts()
+        self.assertEqual(dicts[0]['created'], '2024-01-02T03:04:05')
+        self.assertEqual(dicts[0]['payload'], 'abc')
+        # Repeated column names must not overwrite each other
+        self.assertEqual(len(dicts[0]), 4)
+
+    def test_columnar_shape(self):
+        columnar = self.result.to_columnar()
+        self.assertEqual(columnar['columns'][:2], ['id', 'created'])
+        self.assertEqual(columnar['types'], ['int', 'datetime', 'int', 'blob'])
+        self.assertEqual(list(columnar['rows'][1]), [2, None, 20, None])
+
+    def test_ndjson_has_header_and_one_line_per_row(self):
+        lines = self.result.to_ndjson().split('\n')
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['columns'][1], 'created')
+        self.assertEqual(json.loads(lines[2]), [2, None, 20, None])
+
+    def test_validate_output_format(self):
+        self.assertEqual(validate_output_format(None), 'rows')
+        self.assertEqual(validate_output_format('COLUMNAR'), 'columnar')
+        with self.assertRaises(ValueError):
+            validate_output_format('arrow')
+
+
+class TestConverterPlan(unittest.TestCase):
+    def test_plan_per_column_type(self):
+        description = [('n', 3), ('price', 246), ('t', 11), ('name', 253), ('raw', 252)]
+        rows = [(1, Decimal('1.50'), datetime.timedelta(hours=-1, seconds=-5), 'a', b'\xffok'),
+                (2, None, None, None, None)]
+        plan = compile_converters(description, rows)
+        # 정수와 이미 str인 텍스트 컬럼은 변환하지 않음
+        self.assertIsNone(plan[0])
+        self.assertIsNone(plan[3])
+        converted = apply_converters(plan, rows)
+        self.assertEqual(list(converted[0]), [1, '1.50', '-01:00:05', 'a', 'ok'])
+        self.assertEqual(list(converted[1]), [2, None, None, None, None])
+
+    def test_identity_plan_reuses_rows(self):
+        rows = [(1, 'a'), (2, 'b')]
+        plan = compile_converters([('id', 3), ('name', 253)], rows)
+        self.assertIs(apply_converters(plan, rows), rows)
+
+
+class TestTruncationEnvelope(unittest.TestCase):
+    def test_truncated_result_is_wrapped(self):
+        truncation = {'truncated': True, 'limit_reason': 'max_rows', 'total_rows': 10}
+        result = ResultSet(['id'], ['int'], [(1,), (2,)], truncation=truncation)
+        self.assertEqual(result.format('rows'), {'rows': [{'id': 1}, {'id': 2}], **truncation})
+        self.assertEqual(result.format('columnar')['total_rows'], 10)
+        self.assertIn('ndjson', result.format('ndjson'))
+        self.assertEqual(ResultSet(['id'], ['int'], [(1,)]).format('rows'), [{'id': 1}])
+
+    def test_estimate_json_bytes(self):
+        rows = [(i, 'x' * 10) for i in range(100)]
+        exact = sum(len(json.dumps(list(r))) for r in rows) + len(rows)  # 구분자 포함
+        self.assertAlmostEqual(estimate_json_bytes(rows), exact, delta=exact * 0.1)
+        self.assertEqual(estimate_json_bytes([]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import asyncio
+import tempfile
+import os
+import json
+
+from schema_cache import SchemaCache
+
+
+class TestSchemaCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmpdir.name, 'schema.json')
+        self.listing = {'users': ['2024-01-01T00:00:00', None]}
+        self.calls = {'tables': 0, 'schema': 0}
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_cache(self, ttl=60, max_age=600, max_stale=600):
+        return SchemaCache(ttl=ttl, negative_ttl=60, snapshot_path=self.snapshot_path,
+                           server_id='test@localhost:3306', snapshot_interval=0, max_age=max_age,
+                           max_stale=max_stale)
+
+    async def fetch_tables(self, database):
+        self.calls['tables'] += 1
+        return dict(self.listing)
+
+    async def fetch_schema(self, database, table):
+        self.calls['schema'] += 1
+        return {'id': {'type': 'int'}}
+
+    async def test_schema_revalidated_by_create_time(self):
+        cache = self.make_cache(ttl=0)
+        await cache.get_table_schema('db', 'users', self.fetch_tables, self.fetch_schema)
+        await cache.get_table_schema('db', 'users', self.fetch_tables, self.fetch_schema)
+        # CREATE_TIME이 같으면 DESCRIBE를 다시 실행하지 않음
+        self.assertEqual(self.calls['schema'], 1)
+        self.assertEqual(cache.stats['revalidated'], 1)
+
+    async def test_schema_reread_after_max_age(self):
+        cache = self.make_cache(ttl=0, max_age=0)
+        await cache.get_table_schema('db', 'users', self.fetch_tables, self.fetch_schema)
+        await cache.get_table_schema('db', 'users', self.fetch_tables, self.fetch_schema)
+        # CREATE_TIME이 같아도 상한이 지나면 다시 읽음 (INSTANT ALTER TABLE 대비)
+        self.assertEqual(self.calls['schema'], 2)
+        self.assertEqual(cache.snapshot_stats()['expired'], 1)
+        self.assertEqual(cache.snapshot_stats()['revalidated'], 0)
+
+    async def test_negative_entries(self):
+        cache = self.make_cache()
+        self.assertIsNone(await cache.table_version('db', 'missing', self.fetch_tables))
+        self.assertIsNone(await cache.table_version('db', 'missing', self.fetch_tables))
+        self.assertEqual(self.calls['tables'], 1)
+        self.assertEqual(cache.stats['negative_hits'], 1)
+
+    async def test_snapshot_round_trip(self):
+        cache = self.make_cache()
+        await cache.get_table_schema('db', 'users', self.fetch_tables, self.fetch_schema)
+        await cache.close()
+
+        restored = self.make_cache()
+        self.assertTrue(restored.load_snapshot())
+        # 스냅샷에서 복원된 값은 DB 조회 없이 바로 응답 (백그라운드 갱신은 별도)
+        tables = await restored.get_tables('db', self.fetch_tables)
+        self.assertIn('users', tables)
+        self.assertEqual(restored.stats['stale_hits'], 1)
+        await restored.close()
+
+    async def test_too_stale_entries_wait_for_a_fresh_fetch(self):
+        cache = self.make_cache(ttl=60, max_stale=600)
+        await cache.get_tables('db', self.fetch_tables)
+        cache._tables['db'].fetched_at -= 120
+        await cache.get_tables('db', self.fetch_tables)  # stale: 바로 응답하고 백그라운드 갱신
+        self.assertEqual(cache.stats['stale_hits'], 1)
+        await asyncio.gather(*cache._refreshing.values())
+        cache._tables['db'].fetched_at -= 1200
+
+        async def failing_fetch(database):
+            raise ConnectionError("database unavailable")
+
+        # 상한을 넘은 값은 돌려주지 않고 새로 읽음 — 실패하면 오류
+        with self.assertRaises(ConnectionError):
+            await cache.get_tables('db', failing_fetch)
+        self.listing['orders'] = ['2024-02-01T00:00:00', None]
+        self.assertIn('orders', await cache.get_tables('db', self.fetch_tables))
+        self.assertEqual(cache.stats['too_stale'], 2)
+        await cache.close()
+
+    async def test_old_snapshot_is_not_served(self):
+        cache = self.make_cache()
+        await cache.get_tables('db', self.fetch_tables)
+        await cache.close()
+        with open(self.snapshot_path, encoding='utf-8') as f:
+            data = json.load(f)
+        data['saved_at'] -= 3600  # 한 시간 전에 저장된 스냅샷
+        with open(self.snapshot_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        restored = self.make_cache()
+        self.assertTrue(restored.load_snapshot())
+        await restored.get_tables('db', self.fetch_tables)
+        self.assertEqual((restored.stats['stale_hits'], restored.stats['too_stale']), (0, 1))
+        self.assertEqual(self.calls['tables'], 2)
+        await restored.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,446 @@
+import unittest
+import asyncio
+import json
+import tempfile
+import threading
+from unittest.mock import patch
+
+from admission import AdaptiveLane
+from cost_guard import CostGuard
+from db_driver import DatabaseDriver
+from schema_cache import SchemaCache
+from server import MariaDBServer
+from workers import WorkerHealth
+
+INT, VARCHAR = 3, 253
+
+
+class FakeDatabase:
+    """
+    Canned results by SQL substring: [(pattern, description, rows)]; the most recently added pattern wins.
+    rows may be an exception to raise or a coroutine function returning the rows.
+    """
+    def __init__(self, results=None):
+        self.results = list(results or [])
+        self.executed = []
+
+    def add(self, pattern, description, rows):
+        self.results.insert(0, (pattern, description, rows))
+
+    async def run(self, sql, params):
+        self.executed.append((sql, params))
+        for pattern, description, rows in self.results:
+            if pattern in sql:
+                if isinstance(rows, BaseException):
+                    raise rows
+                if callable(rows):
+                    rows = await rows(sql, params)
+                return description, list(rows)
+        return None, []
+
+
+class FakeCursor:
+    def __init__(self, conn, streaming=False):
+        self.conn = conn
+        self.streaming = streaming
+        self.description = None
+        self._rows = []
+        self.closed = False
+
+    async def execute(self, sql, params=()):
+        self.conn.executed.append(sql)
+        self.description, self._rows = await self.conn.database.run(sql, params)
+
+    async def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    async def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    async def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class FakeConnection:
+    _next_id = 100
+
+    def __init__(self, database, host="primary", port=3306):
+        FakeConnection._next_id += 1
+        self.server_thread_id = (FakeConnection._next_id,)
+        self.host, self.port = host, port
+        self.database = database
+        self.executed = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def ping(self, reconnect=False):
+        pass
+
+
+class FakePool:
+    def __init__(self, database, maxsize=10):
+        self.database = database
+        self.minsize = 1
+        self.maxsize = maxsize
+        self.free = []
+        self.released = []
+        self.opened = 0
+
+    @property
+    def size(self):
+        return self.opened
+
+    @property
+    def freesize(self):
+        return len(self.free)
+
+    async def acquire(self):
+        if self.free:
+            return self.free.pop()
+        self.opened += 1
+        return FakeConnection(self.database)
+
+    async def release(self, conn):
+        self.released.append(conn)
+        if conn.closed:
+            self.opened -= 1
+        else:
+            self.free.append(conn)
+
+
+class FakeDriver(DatabaseDriver):
+    name = "fake"
+
+    def __init__(self, database):
+        self.database = database
+        self.connections = []
+
+    async def cursor(self, conn, streaming=False):
+        return FakeCursor(conn, streaming)
+
+    async def connect(self, host, port, user, password, database, autocommit=True, charset='utf8mb4'):
+        conn = FakeConnection(self.database, host, port)
+        self.connections.append(conn)
+        return conn
+
+
+def make_server(database):
+    server = MariaDBServer(driver=FakeDriver(database))
+    server.pool = FakePool(database)
+    server.schema_cache = SchemaCache(ttl=60, negative_ttl=10, snapshot_path=None, server_id="test")
+    server.query_cache = None
+    return server
+
+
+async def get_tool(server, name):
+    server.register_tools()
+    tools = await server.mcp.get_tools()
+    return tools[name].fn
+
+
+class TestResultBudget(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        description = [("id", INT), ("name", VARCHAR)]
+        self.database.add("FROM items", description, [(i, f"item-{i:04d}") for i in range(25)])
+        self.server = make_server(self.database)
+
+    def test_budgets_are_off_unless_configured(self):
+        with patch("server.MCP_MAX_RESULT_ROWS", 0), patch("server.MCP_MAX_RESULT_BYTES", 0):
+            self.assertEqual(self.server._result_budget(), (None, None))
+            self.assertEqual(self.server._result_budget(5, None), (5, None))
+        with patch("server.MCP_MAX_RESULT_ROWS", 10):
+            self.assertEqual(self.server._result_budget(50)[0], 10)
+
+    async def test_row_budget_truncates_and_counts_the_rest(self):
+        result = await self.server._execute_query_result("SELECT * FROM items", max_rows=10)
+        self.assertEqual(len(result), 10)
+        self.assertEqual(result.rows[-1], (9, "item-0009"))
+        self.assertEqual(result.truncation["limit_reason"], "max_rows")
+        self.assertEqual(result.truncation["total_rows"], 25)
+        self.assertTrue(result.truncation["total_rows_exact"])
+        envelope = result.format("rows")
+        self.assertTrue(envelope["truncated"])
+        self.assertEqual(len(envelope["rows"]), 10)
+        # 끝까지 읽은 커서의 연결은 풀에 그대로 반환
+        [conn] = self.server.pool.released
+        self.assertFalse(conn.closed)
+
+    async def test_byte_budget(self):
+        result = await self.server._execute_query_result("SELECT * FROM items", max_bytes=200)
+        self.assertEqual(result.truncation["limit_reason"], "max_bytes")
+        self.assertGreater(len(result), 0)
+        self.assertLess(len(result), 25)
+        self.assertLessEqual(result.truncation["returned_bytes_approx"], 200)
+
+    async def test_within_budget_is_not_truncated(self):
+        result = await self.server._execute_query_result("SELECT * FROM items", max_rows=100)
+        self.assertEqual(len(result), 25)
+        self.assertIsNone(result.truncation)
+        self.assertEqual(result.format("rows")[0], {"id": 0, "name": "item-0000"})
+
+    async def test_partially_read_cursor_closes_the_connection(self):
+        # 남은 행을 셀 시간이 없으면 커서가 덜 읽힌 채로 끝남
+        with patch("server.MCP_TRUNCATION_COUNT_SECONDS", 0):
+            result = await self.server._execute_query_result("SELECT * FROM items", max_rows=10)
+        self.assertFalse(result.truncation["total_rows_exact"])
+        [conn] = self.server.pool.released
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.server.pool.free, [])
+
+
+class TestCancellation(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        self.started = asyncio.Event()
+
+        async def slow(sql, params):
+            self.started.set()
+            await asyncio.sleep(10)
+            return []
+
+        self.database.add("SLEEP", [("s", INT)], slow)
+        self.server = make_server(self.database)
+
+    def assert_killed_on_side_connection(self):
+        [conn] = self.server.pool.released
+        [side_conn] = self.server.driver.connections
+        # KILL은 풀 밖의 단독 연결로, 쿼리를 실행하던 같은 서버에 보냄
+        self.assertEqual(side_conn.executed, [f"KILL QUERY {conn.server_thread_id[0]}"])
+        self.assertEqual((side_conn.host, side_conn.port), (conn.host, conn.port))
+        self.assertTrue(side_conn.closed)
+        # 응답 도중 중단된 연결은 닫힌 채로 풀에 넘겨져 재사용되지 않음
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.server.pool.free, [])
+        self.assertEqual(self.server.cancellation_stats["kill_query_sent"], 1)
+
+    async def test_client_deadline_kills_the_query(self):
+        with patch("server.STATEMENT_TIMEOUT_GRACE", 0.01):
+            with self.assertRaises(TimeoutError):
+                await self.server._execute_query_result("SELECT SLEEP(10)", timeout=0.05)
+        self.assertEqual(self.server.cancellation_stats["statement_timeouts"], 1)
+        self.assert_killed_on_side_connection()
+
+    async def test_cancelled_call_kills_the_query(self):
+        task = asyncio.create_task(self.server._execute_query_result("SELECT SLEEP(10)"))
+        await asyncio.wait_for(self.started.wait(), 1)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.server.cancellation_stats["cancelled"], 1)
+        self.assert_killed_on_side_connection()
+
+    async def test_server_statement_timeout_maps_to_timeout_error(self):
+        self.database.add("FROM big", [("id", INT)],
+                          Exception(1969, "Query execution was interrupted (max_statement_time exceeded)"))
+        with self.assertRaises(TimeoutError):
+            await self.server._execute_query_result("SELECT * FROM big", timeout=1)
+        self.assertEqual(self.server.cancellation_stats["statement_timeouts"], 1)
+        # 서버가 스스로 중단했으므로 KILL도 연결 폐기도 필요 없음
+        self.assertEqual(self.server.driver.connections, [])
+        [conn] = self.server.pool.released
+        self.assertFalse(conn.closed)
+        self.assertIn("SET STATEMENT max_statement_time=1 FOR SELECT * FROM big", conn.executed)
+
+
+class TestExecuteBatch(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+
+        async def slow(sql, params):
+            await asyncio.sleep(0.05)
+            return [(1,)]
+
+        self.database.add("FROM slow", [("id", INT)], slow)
+        self.database.add("FROM fast", [("id", INT)], [(2,), (3,)])
+        self.database.add("FROM missing", None, Exception(1146, "Table 'test.missing' doesn't exist"))
+        self.server = make_server(self.database)
+
+    async def test_results_in_input_order_with_errors_isolated(self):
+        execute_batch = await get_tool(self.server, "execute_batch")
+        response = await execute_batch([
+            {"sql": "SELECT id FROM slow", "database": "test"},
+            {"sql": "SELECT id FROM fast", "database": "test"},
+            {"sql": "SELECT id FROM missing", "database": "test"},
+            "not an item",
+        ], max_concurrency=4)
+        results = response["results"]
+        # 느린 항목이 늦게 끝나도 입력 순서대로 반환
+        self.assertEqual([r["index"] for r in results], [0, 1, 2, 3])
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "error", "error"])
+        self.assertEqual((response["succeeded"], response["failed"]), (2, 2))
+        self.assertEqual(results[0]["result"], [{"id": 1}])
+        self.assertEqual(results[1]["row_count"], 2)
+        self.assertIn("doesn't exist", results[2]["error"])
+        self.assertTrue(results[3]["error"].startswith("ValueError"))
+        for entry in results:
+            self.assertGreaterEqual(entry["elapsed_ms"], 0)
+        self.assertGreaterEqual(results[0]["elapsed_ms"], 50)
+        self.assertNotIn("queue_wait_ms", results[3])
+
+    async def test_queue_wait_is_reported_per_item(self):
+        self.server.admission.lanes["query"] = AdaptiveLane("query", min_limit=1, max_limit=1, target_latency=1.0,
+                                                            max_queue=4, max_wait=5.0)
+        semaphore = asyncio.Semaphore(2)
+        results = await asyncio.gather(*(
+            self.server._execute_batch_item(i, {"sql": sql, "database": "test"}, "rows", None, semaphore)
+            for i, sql in enumerate(["SELECT id FROM slow", "SELECT id FROM fast"])))
+        self.assertEqual([r["status"] for r in results], ["ok", "ok"])
+        # 한도 1인 쿼리 레인에서 두 번째 항목은 첫 번째가 끝날 때까지 대기
+        self.assertEqual(results[0]["queue_wait_ms"], 0.0)
+        self.assertGreaterEqual(results[1]["queue_wait_ms"], 40)
+        self.assertGreaterEqual(results[1]["elapsed_ms"], results[1]["queue_wait_ms"])
+
+    async def test_cost_guard_rejection_fails_only_that_item(self):
+        plan = {"query_block": {"table": {"table_name": "huge", "access_type": "ALL", "rows": 5000000}}}
+        self.database.add("FROM huge", [("id", INT)], [(1,)])
+        self.database.add("EXPLAIN FORMAT=JSON SELECT * FROM huge", [("EXPLAIN", VARCHAR)], [(json.dumps(plan),)])
+        self.server.cost_guard = CostGuard("reject", max_rows=1000, cache_ttl=60)
+        execute_batch = await get_tool(self.server, "execute_batch")
+        response = await execute_batch([
+            {"sql": "SELECT * FROM huge", "database": "test"},
+            {"sql": "SELECT id FROM fast", "database": "test"},
+        ])
+        rejected, ok = response["results"]
+        self.assertEqual(rejected["status"], "error")
+        self.assertTrue(rejected["error"].startswith("QueryCostError"))
+        self.assertEqual(ok["status"], "ok")
+        # 거부된 문장은 실행되지 않음
+        executed = [sql for sql, _ in self.database.executed]
+        self.assertNotIn("SELECT * FROM huge", executed)
+        self.assertEqual(self.server.cost_guard.stats["rejections"], 1)
+
+
+class TestDescribeTables(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        self.database.add("FROM information_schema.TABLES", [(c, VARCHAR) for c in ("TABLE_NAME", "TABLE_TYPE", "ENGINE", "TABLE_ROWS", "TABLE_COMMENT")], [
+            ("customers", "BASE TABLE", "InnoDB", 120, ""),
+            ("orders", "BASE TABLE", "InnoDB", 5000, "customer orders"),
+        ])
+        self.database.add("FROM information_schema.COLUMNS", [(c, VARCHAR) for c in ("TABLE_NAME", "COLUMN_NAME", "COLUMN_TYPE", "IS_NULLABLE", "COLUMN_KEY", "COLUMN_DEFAULT", "EXTRA")], [
+            ("customers", "id", "int(11)", "NO", "PRI", None, "auto_increment"),
+            ("customers", "region", "char(2)", "NO", "PRI", None, ""),
+            ("customers", "email", "varchar(255)", "YES", "UNI", None, ""),
+            ("orders", "id", "int(11)", "NO", "PRI", None, "auto_increment"),
+            ("orders", "customer_id", "int(11)", "NO", "MUL", None, ""),
+            ("orders", "region", "char(2)", "NO", "", "'EU'", ""),
+        ])
+        self.database.add("FROM information_schema.KEY_COLUMN_USAGE", [(c, VARCHAR) for c in ("TABLE_SCHEMA", "TABLE_NAME", "CONSTRAINT_NAME", "COLUMN_NAME", "REFERENCED_TABLE_SCHEMA", "REFERENCED_TABLE_NAME", "REFERENCED_COLUMN_NAME")], [
+            ("billing", "invoices", "fk_invoice_order", "order_id", "shop", "orders", "id"),
+            ("shop", "customers", "PRIMARY", "id", None, None, None),
+            ("shop", "customers", "PRIMARY", "region", None, None, None),
+            ("shop", "customers", "uq_email", "email", None, None, None),
+            ("shop", "orders", "PRIMARY", "id", None, None, None),
+            ("shop", "orders", "fk_order_customer", "customer_id", "shop", "customers", "id"),
+            ("shop", "orders", "fk_order_customer", "region", "shop", "customers", "region"),
+        ])
+        self.server = make_server(self.database)
+
+    async def test_keys_and_relations(self):
+        tables = await self.server._describe_tables("shop")
+        customers, orders = tables["customers"], tables["orders"]
+        self.assertEqual(customers["primary_key"], ["id", "region"])
+        self.assertEqual(customers["unique_keys"], {"uq_email": ["email"]})
+        self.assertEqual(orders["estimated_rows"], 5000)
+        self.assertEqual(orders["comment"], "customer orders")
+        self.assertIsNone(customers["comment"])
+        self.assertEqual(orders["columns"]["region"], {"type": "char(2)", "nullable": False, "key": "",
+                                                       "default": "'EU'", "extra": ""})
+        self.assertTrue(customers["columns"]["email"]["nullable"])
+        # 복합 외래 키는 컬럼 순서대로 하나의 관계로 묶임
+        self.assertEqual(orders["foreign_keys"], [{
+            "constraint": "fk_order_customer", "columns": ["customer_id", "region"],
+            "referenced_table": "customers", "referenced_columns": ["id", "region"],
+        }])
+        self.assertEqual(customers["referenced_by"], [{
+            "constraint": "fk_order_customer", "table": "orders",
+            "columns": ["customer_id", "region"], "referenced_columns": ["id", "region"],
+        }])
+        # 다른 스키마에서의 참조는 schema.table 로 표시
+        self.assertEqual(orders["referenced_by"], [{
+            "constraint": "fk_invoice_order", "table": "billing.invoices",
+            "columns": ["order_id"], "referenced_columns": ["id"],
+        }])
+        self.assertEqual(customers["foreign_keys"], [])
+
+    async def test_table_filter_and_internal_queries(self):
+        await self.server._describe_tables("shop", table_name="orders")
+        params = [params for sql, params in self.database.executed if "FROM information_schema." in sql]
+        self.assertEqual(params, [("shop", "orders"), ("shop", "orders"), ("shop", "shop")])
+        # 세 쿼리가 하나의 연결을 차례로 사용하고 query_stats에는 기록되지 않음
+        self.assertEqual(self.server.pool.opened, 1)
+        self.assertEqual(len(self.server.query_stats), 0)
+
+
+class TestSwitchDatabase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        self.database.add("FROM t", [("id", INT)], [(1,)])
+        self.server = make_server(self.database)
+
+    def use_statements(self, conn):
+        return [sql for sql in conn.executed if sql.startswith("USE")]
+
+    async def test_use_is_skipped_when_already_on_the_schema(self):
+        await self.server._execute_query_result("SELECT id FROM t", database="shop")
+        await self.server._execute_query_result("SELECT id FROM t", database="shop")
+        [conn] = self.server.pool.free
+        self.assertEqual(self.use_statements(conn), ["USE `shop`"])
+        await self.server._execute_query_result("SELECT id FROM t", database="billing")
+        self.assertEqual(self.use_statements(conn), ["USE `shop`", "USE `billing`"])
+        stats = self.server.get_db_context_stats()
+        self.assertEqual(stats["use_statements_issued"], 2)
+        self.assertEqual(stats["use_statements_skipped"], 1)
+        # 호출마다 SELECT DATABASE() 왕복 하나를 생략
+        self.assertEqual(stats["round_trips_saved"], 3)
+        self.assertFalse(any("DATABASE()" in sql for sql in conn.executed))
+
+    async def test_user_issued_use_resets_the_tracked_schema(self):
+        await self.server._execute_query_result("SELECT id FROM t", database="shop")
+        [conn] = self.server.pool.free
+        await self.server._execute_query_result("USE other")
+        self.assertIsNone(self.server._conn_databases[conn])
+        # 추적 정보가 없으므로 같은 스키마라도 USE를 다시 실행
+        await self.server._execute_query_result("SELECT id FROM t", database="shop")
+        self.assertEqual(self.use_statements(conn), ["USE `shop`", "USE other", "USE `shop`"])
+        self.assertEqual(self.server._conn_databases[conn], "shop")
+
+
+class TestHealthEndpoint(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_health_is_read_off_the_event_loop(self):
+        server = make_server(FakeDatabase())
+        with tempfile.TemporaryDirectory() as tmp:
+            server.worker_health = WorkerHealth(tmp, 0, interval=5)
+            server.expected_workers = 2
+            server.worker_health.write({"pool_ready": True})
+            threads = []
+            aggregate = server.worker_health.aggregate
+
+            def recording_aggregate(expected_workers=None):
+                threads.append(threading.get_ident())
+                return aggregate(expected_workers)
+
+            with patch.object(server.worker_health, "aggregate", recording_aggregate):
+                response = await server._health_endpoint(None)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.body)["status"], "degraded")
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from streams import ResultStream, StreamRegistry
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    async def fetchmany(self, size):
+        return [(1,)] * size
+
+    async def close(self):
+        pass
+
+
+class TestStreamRegistry(unittest.IsolatedAsyncioTestCase):
+    def make_stream(self, released):
+        async def release(conn):
+            released.append(conn)
+        return ResultStream(FakeConnection(), FakeCursor(), release=release)
+
+    async def test_reservations_count_against_the_limit(self):
+        registry = StreamRegistry(idle_timeout=60, max_streams=2)
+        self.assertTrue(registry.reserve())
+        self.assertTrue(registry.reserve())
+        # 두 요청이 아직 연결을 기다리는 중이어도 세 번째는 거부
+        self.assertFalse(registry.reserve())
+        registry.release_reservation()  # 하나는 열기에 실패
+        self.assertTrue(registry.reserve())
+        await registry.close_all()
+
+    async def test_open_and_close_hooks(self):
+        events, released = [], []
+        registry = StreamRegistry(idle_timeout=60, max_streams=2,
+                                  on_open=lambda: events.append("open"), on_close=lambda: events.append("close"))
+        self.assertTrue(registry.reserve())
+        stream = self.make_stream(released)
+        registry.add(stream)
+        registry.release_reservation()
+        self.assertEqual(len(registry), 1)
+        self.assertTrue(await registry.close(stream.token))
+        self.assertFalse(await registry.close(stream.token))
+        self.assertEqual(events, ["open", "close"])
+        self.assertEqual(len(released), 1)
+        self.assertFalse(registry.is_full())
+        await registry.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
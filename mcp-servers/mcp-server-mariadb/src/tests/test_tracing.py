@@ -0,0 +1,71 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from tracing import Tracer, add_span, span
+
+
+async def demo_tool(fail: bool = False):
+    started = time.perf_counter()
+    await asyncio.sleep(0)
+    add_span("acquire", started)
+    with span("execute", rows=2):
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("boom")
+    return "ok"
+
+
+class TestTracer(unittest.IsolatedAsyncioTestCase):
+    async def test_spans_are_recorded_in_order(self):
+        tracer = Tracer(sample_rate=1.0, buffer_size=10)
+        self.assertEqual(await tracer.traced(demo_tool)(), "ok")
+        [trace] = tracer.recent()
+        self.assertEqual(trace["tool"], "demo_tool")
+        self.assertIsNone(trace["error"])
+        self.assertEqual([s["name"] for s in trace["spans"]], ["acquire", "execute"])
+        self.assertEqual(trace["spans"][1]["rows"], 2)
+        self.assertGreaterEqual(trace["duration_ms"], trace["spans"][1]["duration_ms"])
+
+    async def test_error_and_ring_buffer(self):
+        tracer = Tracer(sample_rate=1.0, buffer_size=2)
+        traced = tracer.traced(demo_tool)
+        await traced()
+        await traced()
+        with self.assertRaises(RuntimeError):
+            await traced(fail=True)
+        traces = tracer.recent()
+        self.assertEqual(len(traces), 2)
+        self.assertEqual(traces[0]["error"], "RuntimeError: boom")
+        self.assertEqual(traces[0]["spans"][-1]["error"], "RuntimeError")
+
+    async def test_unsampled_calls_are_not_traced(self):
+        tracer = Tracer(sample_rate=0.0, buffer_size=10)
+        await tracer.traced(demo_tool)()
+        self.assertEqual(tracer.recent(), [])
+        self.assertEqual(tracer.stats["skipped"], 1)
+        # 트레이스 밖에서는 no-op
+        with span("outside") as outside:
+            add_span("outside", time.perf_counter())
+        self.assertFalse(outside.recording)
+
+    async def test_jsonl_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            tracer = Tracer(sample_rate=1.0, buffer_size=10, trace_file=path)
+            await tracer.traced(demo_tool)()
+            await tracer.traced(demo_tool)()
+            # 파일 기록은 이벤트 루프가 아니라 백그라운드 스레드에서
+            self.assertTrue(tracer._writer.is_alive())
+            tracer.close()
+            self.assertIsNone(tracer._writer)
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()
+            self.assertEqual([json.loads(line)["tool"] for line in lines], ["demo_tool", "demo_tool"])
+
+
+if __name__ == "__main__":
+    unittest.main()
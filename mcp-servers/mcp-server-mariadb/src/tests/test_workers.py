@@ -0,0 +1,79 @@
+import unittest
+import json
+import os
+import socket
+import tempfile
+import time
+
+from workers import RestartPolicy, WorkerHealth, create_listen_socket, worker_log_file, worker_pool_size
+
+
+class TestWorkerPoolSize(unittest.TestCase):
+    def test_budget_is_split_evenly(self):
+        self.assertEqual(worker_pool_size(40, 4), 10)
+        self.assertEqual(worker_pool_size(10, 4), 2)
+        self.assertEqual(worker_pool_size(2, 4), 1)
+
+    def test_worker_log_file(self):
+        self.assertEqual(worker_log_file("logs/mcp_server.log", 2), "logs/mcp_server.worker2.log")
+
+
+class TestWorkerHealth(unittest.TestCase):
+    def test_aggregate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            WorkerHealth(tmp, 0, interval=1).write({"pool_ready": True, "pool_in_use": 2, "pool_max": 5})
+            WorkerHealth(tmp, 1, interval=1).write({"pool_ready": False, "pool_in_use": 0, "pool_max": 5})
+            health = WorkerHealth(tmp, 0, interval=1).aggregate(expected_workers=3)
+            self.assertEqual(health["status"], "degraded")
+            self.assertEqual(health["workers_healthy"], 1)
+            self.assertEqual((health["pool_in_use"], health["pool_max"]), (2, 10))
+            self.assertEqual([w["worker"] for w in health["workers"]], [0, 1])
+
+    def test_stale_worker_is_unhealthy(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            reporter = WorkerHealth(tmp, 0, interval=1)
+            reporter.write({"pool_ready": True})
+            self.assertEqual(reporter.aggregate()["status"], "ok")
+            with open(os.path.join(tmp, "worker-0.json"), "w", encoding="utf-8") as f:
+                json.dump({"worker": 0, "pool_ready": True, "updated_at": time.time() - 60}, f)
+            self.assertEqual(reporter.aggregate()["status"], "down")
+
+
+    def test_peer_metrics_excludes_own_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            WorkerHealth(tmp, 0, interval=1).write_metrics([["# TYPE a counter", "# HELP a A.", 'a_total{worker="0"} 1']])
+            WorkerHealth(tmp, 1, interval=1).write_metrics([["# TYPE a counter", "# HELP a A.", 'a_total{worker="1"} 2']])
+            peers = WorkerHealth(tmp, 0, interval=1).peer_metrics()
+            self.assertEqual(peers, [[["# TYPE a counter", "# HELP a A.", 'a_total{worker="1"} 2']]])
+
+
+class TestRestartPolicy(unittest.TestCase):
+    def test_backoff_grows_and_gives_up(self):
+        policy = RestartPolicy(max_fast_failures=4, min_uptime=30, base_delay=1, max_delay=3)
+        # 시작 직후 계속 죽는 워커: 지연이 두 배씩 늘다가 상한에서 멈추고, 4번째에 포기
+        self.assertEqual([policy.record_exit(0, uptime=0.5) for _ in range(4)], [1, 2, 3, None])
+
+    def test_long_uptime_resets_the_count(self):
+        policy = RestartPolicy(max_fast_failures=2, min_uptime=30, base_delay=1)
+        self.assertEqual(policy.record_exit(0, uptime=1), 1)
+        self.assertEqual(policy.record_exit(0, uptime=600), 1)
+        self.assertEqual(policy.record_exit(0, uptime=1), 1)
+        # 워커별로 따로 집계
+        self.assertEqual(policy.record_exit(1, uptime=1), 1)
+        self.assertIsNone(policy.record_exit(0, uptime=1))
+
+
+@unittest.skipUnless(hasattr(socket, "SO_REUSEPORT"), "SO_REUSEPORT not supported")
+class TestListenSocket(unittest.TestCase):
+    def test_two_sockets_share_a_port(self):
+        first = create_listen_socket("127.0.0.1", 0)
+        try:
+            port = first.getsockname()[1]
+            second = create_listen_socket("127.0.0.1", port)
+            second.close()
+        finally:
+            first.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+# tracing.py
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Deque, Dict, List, Optional
+
+from config import logger
+
+
+class Trace:
+    """Phase timings of one tool call. Spans are (name, start offset, duration) relative to the call start."""
+    __slots__ = ("trace_id", "tool", "started_at", "_started", "spans", "duration_ms", "error")
+
+    def __init__(self, tool: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.tool = tool
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def offset_ms(self, at: float) -> float:
+        return round((at - self._started) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "tool": self.tool,
+            "started_at": round(self.started_at, 3),
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "spans": self.spans,
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("mcp_current_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("trace", "name", "attrs", "_started")
+    recording = True
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self._started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        ended = time.perf_counter()
+        span = {"name": self.name, "start_ms": self.trace.offset_ms(self._started),
+                "duration_ms": round((ended - self._started) * 1000, 3)}
+        if self.attrs:
+            span.update(self.attrs)
+        if exc_type is not None:
+            span["error"] = exc_type.__name__
+        self.trace.spans.append(span)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attrs: Any):
+    """Times a phase of the current (sampled) tool call; a shared no-op when the call is not traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name, attrs)
+
+
+def add_span(name: str, started: float, **attrs: Any) -> None:
+    """Records a phase that began at started (time.perf_counter()) and ends now."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    span = {"name": name, "start_ms": trace.offset_ms(started),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+    if attrs:
+        span.update(attrs)
+    trace.spans.append(span)
+
+
+class Tracer:
+    """
+    Samples tool calls and keeps their phase traces in an in-memory ring buffer,
+    optionally appending each finished trace as one JSON line to trace_file.
+    File records are encoded and written on a background thread, never on the event loop.
+    """
+    def __init__(self, sample_rate: float, buffer_size: int, trace_file: Optional[str] = None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self.trace_file = trace_file or None
+        self._file = None
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self.stats = {"sampled": 0, "skipped": 0, "file_errors": 0}
+
+    def traced(self, func):
+        """Decorator that traces a sampled async tool call under the tool's name."""
+        tool = func.__name__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+                self.stats["skipped"] += 1
+                return await func(*args, **kwargs)
+            trace = Trace(tool)
+            token = _current_trace.set(trace)
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                trace.error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                _current_trace.reset(token)
+                self.finish(trace)
+        return wrapper
+
+    def finish(self, trace: Trace) -> None:
+        trace.duration_ms = trace.offset_ms(time.perf_counter())
+        record = trace.to_dict()
+        self.stats["sampled"] += 1
+        self.buffer.append(record)
+        if self.trace_file:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+            self._queue.put(record)
+
+    def _write_loop(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            self._write(record)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        try:
+            if self._file is None:
+                # 줄 단위 버퍼링: 트레이스 한 건당 write 한 번
+                self._file = open(self.trace_file, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            self.stats["file_errors"] += 1
+            if self.stats["file_errors"] == 1:
+                logger.warning(f"⚠️ 트레이스 파일 기록 실패 ({self.trace_file}): {e}")
+
+    def recent(self, limit: int = 20, tool: Optional[str] = None, min_duration_ms: float = 0.0) -> List[Dict[str, Any]]:
+        """Most recent traces first, optionally filtered by tool name and minimum duration."""
+        traces = []
+        for record in reversed(self.buffer):
+            if tool and record["tool"] != tool:
+                continue
+            if (record["duration_ms"] or 0.0) < min_duration_ms:
+                continue
+            traces.append(record)
+            if len(traces) >= limit:
+                break
+        return traces
+
+    def close(self) -> None:
+        """Flushes queued trace records to the file and stops the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
@@ -0,0 +1,265 @@
+# workers.py
+import importlib.util
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from config import LOG_FILE_PATH, logger
+
+# 워커가 상태 파일을 갱신하지 않고 이 배수만큼의 주기가 지나면 비정상으로 간주
+HEALTH_STALE_FACTOR = 3
+# 이 시간(초)보다 빨리 종료된 워커는 연속 실패로 집계 (재시작 지연은 실패마다 두 배, 최대 RESTART_MAX_DELAY)
+RESTART_MIN_UPTIME = 30.0
+RESTART_BASE_DELAY = 1.0
+RESTART_MAX_DELAY = 60.0
+
+
+def worker_pool_size(connection_budget: int, workers: int) -> int:
+    """Per-worker pool size so that all workers together stay within the global connection budget."""
+    return max(1, connection_budget // max(1, workers))
+
+
+def create_listen_socket(host: str, port: int, reuse_port: bool = True, backlog: int = 2048) -> socket.socket:
+    """
+    Binds a listening TCP socket. With reuse_port every worker binds its own socket to the same
+    address and the kernel balances incoming connections between them (SO_REUSEPORT).
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            sock.close()
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform; run with --workers 1.")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def resolve_uvloop(requested: bool) -> bool:
+    """True if uvloop was requested and is installed; warns and falls back to asyncio otherwise."""
+    if requested and importlib.util.find_spec("uvloop") is None:
+        logger.warning("⚠️ uvloop이 설치되어 있지 않아 기본 asyncio 이벤트 루프를 사용합니다.")
+        return False
+    return requested
+
+
+def worker_log_file(base_path: str, index: int) -> str:
+    """logs/mcp_server.log -> logs/mcp_server.worker2.log (processes must not share a rotating file)."""
+    root, ext = os.path.splitext(base_path)
+    return f"{root}.worker{index}{ext or '.log'}"
+
+
+class WorkerHealth:
+    """
+    Per-worker health files in a directory shared by all workers of one supervisor.
+    Each worker rewrites its own file periodically; any worker can aggregate all of them,
+    so a /health request answered by whichever worker the kernel picked covers the whole group.
+    """
+    def __init__(self, state_dir: str, index: int, interval: float):
+        self.state_dir = state_dir
+        self.index = index
+        self.interval = interval
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.state_dir, f"worker-{index}.json")
+
+    def _write_json(self, path: str, data: Any) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        # 읽는 쪽이 절반만 쓰인 파일을 보지 않도록 원자적 교체
+        os.replace(tmp_path, path)
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        record = {"worker": self.index, "pid": os.getpid(), "updated_at": time.time(), **snapshot}
+        self._write_json(self._path(self.index), record)
+
+    def write_metrics(self, families: List[List[str]]) -> None:
+        """Publishes this worker's rendered metric families (labelled worker=<index>) for the other workers."""
+        self._write_json(os.path.join(self.state_dir, f"metrics-{self.index}.json"), families)
+
+    def peer_metrics(self) -> List[List[List[str]]]:
+        """Last published metric families of every other worker."""
+        peers = []
+        for name in sorted(os.listdir(self.state_dir)):
+            if not (name.startswith("metrics-") and name.endswith(".json")) or name == f"metrics-{self.index}.json":
+                continue
+            try:
+                with open(os.path.join(self.state_dir, name), encoding="utf-8") as f:
+                    peers.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return peers
+
+    def aggregate(self, expected_workers: Optional[int] = None) -> Dict[str, Any]:
+        now = time.time()
+        workers: List[Dict[str, Any]] = []
+        for name in sorted(os.listdir(self.state_dir)):
+            if not (name.startswith("worker-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.state_dir, name), encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            age = now - record.get("updated_at", 0)
+            record["age_seconds"] = round(age, 1)
+            record["healthy"] = bool(record.get("pool_ready")) and age <= self.interval * HEALTH_STALE_FACTOR
+            workers.append(record)
+        workers.sort(key=lambda r: r.get("worker", 0))
+        healthy = sum(1 for r in workers if r["healthy"])
+        expected = expected_workers or len(workers)
+        return {
+            "status": "ok" if healthy == expected else ("degraded" if healthy else "down"),
+            "workers_expected": expected,
+            "workers_healthy": healthy,
+            "pool_in_use": sum(r.get("pool_in_use", 0) for r in workers),
+            "pool_max": sum(r.get("pool_max", 0) for r in workers),
+            "workers": workers,
+        }
+
+
+class RestartPolicy:
+    """
+    Restart delays for crashed workers: exponential backoff over consecutive fast failures (exits
+    within min_uptime of starting), reset once a worker stays up. After max_fast_failures in a row
+    the supervisor gives up, since a worker that cannot stay up is usually misconfigured.
+    """
+    def __init__(self, max_fast_failures: int = 5, min_uptime: float = RESTART_MIN_UPTIME,
+                 base_delay: float = RESTART_BASE_DELAY, max_delay: float = RESTART_MAX_DELAY):
+        self.max_fast_failures = max(1, max_fast_failures)
+        self.min_uptime = min_uptime
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._fast_failures: Dict[int, int] = {}
+
+    def record_exit(self, index: int, uptime: float) -> Optional[float]:
+        """Seconds to wait before restarting worker index, or None to give up."""
+        failures = 0 if uptime >= self.min_uptime else self._fast_failures.get(index, 0) + 1
+        self._fast_failures[index] = failures
+        if failures >= self.max_fast_failures:
+            return None
+        return min(self.max_delay, self.base_delay * 2 ** max(0, failures - 1))
+
+
+def _worker_main(index: int, host: str, port: int, transport: str, use_uvloop: bool,
+                 state_dir: str, workers: int, health_interval: float) -> None:
+    """Entry point of one worker process: binds its SO_REUSEPORT socket and serves until terminated."""
+    import anyio
+    from functools import partial
+    from server import MariaDBServer
+
+    sock = create_listen_socket(host, port)
+    server = MariaDBServer()
+    server.worker_health = WorkerHealth(state_dir, index, health_interval)
+    server.expected_workers = workers
+    logger.info(f"👷 워커 {index} 시작 (pid {os.getpid()}, {transport} {host}:{port})")
+    try:
+        anyio.run(partial(server.run_async_server, transport=transport, host=host, port=port, sock=sock),
+                  backend="asyncio", backend_options={"use_uvloop": use_uvloop})
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+def run_workers(workers: int, host: str, port: int, transport: str, connection_budget: int,
+                use_uvloop: bool = False, health_interval: float = 5.0, max_fast_failures: int = 5) -> int:
+    """
+    Starts `workers` server processes that share host:port through SO_REUSEPORT, restarts workers
+    that exit unexpectedly (with backoff, see RestartPolicy), and stops them all on SIGINT/SIGTERM
+    or when a worker keeps crashing. Returns the exit code.
+    """
+    if transport != "streamable-http":
+        # SSE 세션은 프로세스 메모리에 있으므로 다른 워커로 간 POST를 처리할 수 없음
+        raise ValueError("Multiple workers require --transport streamable-http.")
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("SO_REUSEPORT is not supported on this platform; run with --workers 1.")
+    # 워커를 띄우기 전에 주소를 사용할 수 있는지 확인
+    create_listen_socket(host, port).close()
+
+    use_uvloop = resolve_uvloop(use_uvloop)
+    pool_size = worker_pool_size(connection_budget, workers)
+    if connection_budget < workers:
+        logger.warning(f"⚠️ 연결 예산({connection_budget})이 워커 수({workers})보다 작아 워커당 1개로 설정합니다.")
+    logger.info(f"🚀 워커 {workers}개 시작: {transport} {host}:{port}, 워커당 풀 최대 {pool_size}개 "
+                f"(전체 예산 {connection_budget}), uvloop: {use_uvloop}")
+
+    state_dir = tempfile.mkdtemp(prefix="mcp-mariadb-workers-")
+    ctx = multiprocessing.get_context("spawn")
+    processes: Dict[int, multiprocessing.Process] = {}
+    started_at: Dict[int, float] = {}
+    restart_at: Dict[int, float] = {}
+    restart_policy = RestartPolicy(max_fast_failures)
+    stopping = False
+
+    def start(index: int) -> None:
+        # spawn된 프로세스는 시작 시점의 환경 변수로 config를 읽으므로 워커별 값을 여기서 설정
+        overrides = {"MCP_MAX_POOL_SIZE": str(pool_size), "LOG_FILE": worker_log_file(LOG_FILE_PATH, index)}
+        saved = {key: os.environ.get(key) for key in overrides}
+        os.environ.update(overrides)
+        try:
+            process = ctx.Process(target=_worker_main, name=f"mcp-worker-{index}",
+                                  args=(index, host, port, transport, use_uvloop, state_dir, workers, health_interval))
+            process.start()
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        processes[index] = process
+        started_at[index] = time.monotonic()
+
+    def request_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for index in range(workers):
+            start(index)
+        while not stopping:
+            time.sleep(0.5)
+            now = time.monotonic()
+            for index, process in list(processes.items()):
+                if stopping:
+                    break
+                if index in restart_at:
+                    # 대기 중에도 다른 워커 감시와 종료 신호 처리를 막지 않도록 루프에서 시각만 확인
+                    if now >= restart_at[index]:
+                        del restart_at[index]
+                        start(index)
+                    continue
+                if process.is_alive():
+                    continue
+                delay = restart_policy.record_exit(index, now - started_at[index])
+                if delay is None:
+                    logger.critical(f"💥 워커 {index} (pid {process.pid})가 연속 {restart_policy.max_fast_failures}회 "
+                                    f"{restart_policy.min_uptime:g}초 안에 종료됨 (코드 {process.exitcode}), 서버를 중지합니다.")
+                    return 1
+                logger.error(f"❌ 워커 {index} (pid {process.pid}) 종료됨 (코드 {process.exitcode}), "
+                             f"{delay:g}초 후 재시작합니다.")
+                restart_at[index] = now + delay
+        logger.info("🛑 워커 종료 중...")
+        return 0
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        shutil.rmtree(state_dir, ignore_errors=True)